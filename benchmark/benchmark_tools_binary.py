@@ -0,0 +1,103 @@
+"""
+Benchmark module of tools_binary
+
+It compares the load time of the binary collection with the one of the json
+file, for the whole collection and for a single gallery.
+
+Usage: python benchmark/benchmark_tools_binary.py [number_images ...]
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import random
+import tempfile
+import timeit
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools import (
+    load_json_file,
+    save_json_file
+)
+from tools.tools_binary import (
+    BinaryCollection,
+    save_binary_collection
+)
+
+
+#################
+### Constants ###
+#################
+
+
+LIST_NUMBER_IMAGES = [10000, 100000]
+NUMBER_IMAGES_PER_GALLERY = 20
+NUMBER_REPEATS = 5
+
+
+#################
+### Functions ###
+#################
+
+
+def generate_dict_collection(number_images):
+    random.seed(0)
+    dict_collection = {}
+    for counter in range(0, number_images, NUMBER_IMAGES_PER_GALLERY):
+        dict_collection["tram_" + str(counter)] = [{
+            "source": str(random.randint(0, int(1e9))) + ".jpg",
+            "side": random.choice(["left", "right"]),
+            "category": random.choice(["gold", "silver", "bronze"]),
+            "default": False,
+            "plus_plus": random.random() < 0.1
+        } for _ in range(min(NUMBER_IMAGES_PER_GALLERY, number_images - counter))]
+    return dict_collection
+
+
+def load_binary_collection(binary_path):
+    with BinaryCollection(binary_path) as binary_collection:
+        return binary_collection.load_collection()
+
+
+def load_binary_gallery(binary_path):
+    with BinaryCollection(binary_path) as binary_collection:
+        return binary_collection.read_gallery(binary_collection.number_galleries // 2)
+
+
+def measure_time(function, *args):
+    return min(timeit.repeat(lambda: function(*args),
+                             number=1, repeat=NUMBER_REPEATS))
+
+
+def run_benchmark(number_images):
+    dict_collection = generate_dict_collection(number_images)
+    with tempfile.TemporaryDirectory() as folder_path:
+        json_path = os.path.join(folder_path, "collection.json")
+        binary_path = os.path.join(folder_path, "collection.bin")
+        save_json_file(json_path, dict_collection)
+        save_binary_collection(binary_path, dict_collection)
+
+        print(f"Number of images: {number_images}")
+        print(f"  Json file: {os.path.getsize(json_path) / 1024:.0f} kB, "
+              f"binary file: {os.path.getsize(binary_path) / 1024:.0f} kB")
+        print(f"  Json load: "
+              f"{measure_time(load_json_file, json_path) * 1000:.1f} ms")
+        print(f"  Binary load of all galleries: "
+              f"{measure_time(load_binary_collection, binary_path) * 1000:.1f} ms")
+        print(f"  Binary load of one gallery: "
+              f"{measure_time(load_binary_gallery, binary_path) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    for number_images in (map(int, sys.argv[1:]) if len(sys.argv) > 1 else LIST_NUMBER_IMAGES):
+        run_benchmark(number_images)
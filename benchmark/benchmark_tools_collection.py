@@ -0,0 +1,140 @@
+"""
+Benchmark module of tools_collection
+
+It measures the memory used by each image of a large collection, compared
+to the former representation of the images with a dictionary of attributes.
+
+Usage: python benchmark/benchmark_tools_collection.py [number_images]
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import sys
+import random
+import tracemalloc
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools import PATH_TRAMWAY_IMAGES
+from tools.tools_collection import (
+    TramwayImage,
+    Gallery
+)
+
+
+#################
+### Constants ###
+#################
+
+
+NUMBER_IMAGES = 100000
+NUMBER_IMAGES_PER_GALLERY = 20
+
+
+###############
+### Classes ###
+###############
+
+
+class LegacyTramwayImage():
+    """
+    Former representation of the images, with a dictionary of attributes.
+    """
+
+    def __init__(self, source, side, category, default, plus_plus) -> None:
+        self.source = source
+        self.side = side
+        self.category = category
+        self.default = default
+        self.plus_plus = plus_plus
+
+
+#################
+### Functions ###
+#################
+
+
+def generate_dict_images(number_images):
+    random.seed(0)
+    return [{
+        "source": str(random.randint(0, int(1e9))) + ".jpg",
+        "side": random.choice(["left", "right"]),
+        "category": random.choice(["gold", "silver", "bronze"]),
+        "default": False,
+        "plus_plus": random.random() < 0.1
+    } for _ in range(number_images)]
+
+
+def create_legacy_images(list_dict_images):
+    # The strings are copied as if they were read from the json file
+    return [LegacyTramwayImage(
+        source=PATH_TRAMWAY_IMAGES + dict_image["source"],
+        side="".join(dict_image["side"]),
+        category="".join(dict_image["category"]),
+        default=dict_image["default"],
+        plus_plus=dict_image["plus_plus"]
+    ) for dict_image in list_dict_images]
+
+
+def create_images(list_dict_images):
+    return [TramwayImage(
+        image_name="".join(dict_image["source"]),
+        side=dict_image["side"],
+        category=dict_image["category"],
+        default=dict_image["default"],
+        plus_plus=dict_image["plus_plus"]
+    ) for dict_image in list_dict_images]
+
+
+def create_galleries(list_images):
+    return [Gallery(name=str(counter), list_images=list_images[
+        counter:counter + NUMBER_IMAGES_PER_GALLERY])
+        for counter in range(0, len(list_images), NUMBER_IMAGES_PER_GALLERY)]
+
+
+def measure_memory(function, *args):
+    """
+    Measure the memory allocated by a function and kept by its result.
+
+    Parameters
+    ----------
+    function : Callable
+        Function to call.
+
+    Returns
+    -------
+    tuple
+        Result of the function and number of bytes allocated.
+    """
+    tracemalloc.start()
+    result = function(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def run_benchmark(number_images=NUMBER_IMAGES):
+    list_dict_images = generate_dict_images(number_images)
+    _, legacy_size = measure_memory(create_legacy_images, list_dict_images)
+    list_images, size = measure_memory(create_images, list_dict_images)
+    _, galleries_size = measure_memory(create_galleries, list_images)
+
+    print(f"Number of images: {number_images}")
+    print(f"Former images: {legacy_size / number_images:.1f} bytes per image")
+    print(f"Slotted images: {size / number_images:.1f} bytes per image")
+    print(f"Gallery indexes: {galleries_size / number_images:.1f} bytes per image")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_benchmark(int(sys.argv[1]))
+    else:
+        run_benchmark()
@@ -0,0 +1,94 @@
+"""
+Benchmark module of tools_duplicates
+
+It compares the time to find the images similar to a photo with the
+multi-index hash tables of the hashes and with a comparison to every image,
+depending on the number of images of the collection.
+
+Usage: python benchmark/benchmark_tools_duplicates.py
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(".")
+# Keep Kivy from parsing the arguments of the script
+os.environ["KIVY_NO_ARGS"] = "1"
+
+### Module imports ###
+
+from tools.tools_duplicates import (
+    SIMILARITY_RADIUS,
+    MultiIndexHashTable,
+    get_hash_distance
+)
+
+
+#################
+### Constants ###
+#################
+
+
+LIST_NUMBER_IMAGES = [100, 1000, 10000, 50000]
+# Number of shots of each tramway, whose hashes differ by a few bits
+NUMBER_SHOTS = 5
+NUMBER_QUERIES = 200
+
+
+#################
+### Functions ###
+#################
+
+
+def generate_hashes(number_images):
+    list_hashes = []
+    while len(list_hashes) < number_images:
+        tramway_hash = random.getrandbits(64)
+        for _ in range(NUMBER_SHOTS):
+            shot_hash = tramway_hash
+            for bit in random.sample(range(64), random.randint(0, 6)):
+                shot_hash ^= 1 << bit
+            list_hashes.append(shot_hash)
+    return list_hashes[:number_images]
+
+
+def search_linear(list_hashes, image_hash, radius):
+    return [index for index, other_hash in enumerate(list_hashes)
+            if get_hash_distance(image_hash, other_hash) <= radius]
+
+
+def run_benchmark():
+    random.seed(0)
+    for number_images in LIST_NUMBER_IMAGES:
+        list_hashes = generate_hashes(number_images)
+        table = MultiIndexHashTable()
+        for index, image_hash in enumerate(list_hashes):
+            table.add(image_hash, index)
+        list_queries = random.sample(list_hashes, min(NUMBER_QUERIES, number_images))
+
+        start_time = time.perf_counter()
+        for image_hash in list_queries:
+            search_linear(list_hashes, image_hash, SIMILARITY_RADIUS)
+        linear_duration = (time.perf_counter() - start_time) / len(list_queries)
+
+        start_time = time.perf_counter()
+        for image_hash in list_queries:
+            table.search(image_hash, SIMILARITY_RADIUS)
+        table_duration = (time.perf_counter() - start_time) / len(list_queries)
+
+        print(f"{number_images} images: linear scan {linear_duration * 1000:.2f} ms, "
+              f"hash tables {table_duration * 1000:.2f} ms per photo")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,113 @@
+"""
+Benchmark module of tools_image
+
+It compares the latency and the peak memory of the import of large photos,
+with the full decode and with the reduced decode of the JPEG files. Each
+import runs in its own process to measure its peak resident memory.
+
+Usage: python benchmark/benchmark_tools_image.py
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+
+sys.path.append(".")
+# Keep Kivy from parsing the arguments of the script
+os.environ["KIVY_NO_ARGS"] = "1"
+
+### Module imports ###
+
+from PIL import Image as PIL_Image
+
+from tools.tools_image import (
+    IMAGE_REDUCING_GAP,
+    open_image,
+    open_image_reduced,
+    crop_image_to_square
+)
+
+
+#################
+### Constants ###
+#################
+
+
+# Sizes of the generated photos: 12 MP, 48 MP and a panorama
+LIST_IMAGE_SIZES = [(4000, 3000), (8000, 6000), (16000, 3000)]
+NUMBER_REPEATS = 3
+
+
+#################
+### Functions ###
+#################
+
+
+def generate_image(file_path, size):
+    # Noise on a gradient, so that the file is compressed like a photo
+    gradient = PIL_Image.linear_gradient("L").resize(size)
+    noise = PIL_Image.effect_noise(size, 40)
+    PIL_Image.merge("RGB", (gradient, noise, gradient.transpose(
+        PIL_Image.Transpose.FLIP_LEFT_RIGHT))).save(file_path, quality=90)
+
+
+def import_image(file_path, fast):
+    if fast:
+        image = open_image_reduced(file_path)
+        return crop_image_to_square(image, reducing_gap=IMAGE_REDUCING_GAP)
+    image = open_image(file_path)
+    return crop_image_to_square(image)
+
+
+def run_import(file_path, fast):
+    # Run in a child process, the peak memory is in kB on Linux
+    list_times = []
+    for _ in range(NUMBER_REPEATS):
+        start_time = time.perf_counter()
+        import_image(file_path, fast)
+        list_times.append(time.perf_counter() - start_time)
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(min(list_times), peak_memory)
+
+
+def measure_import(file_path, fast):
+    result = subprocess.run(
+        [sys.executable, __file__, "--run", file_path, str(int(fast))],
+        capture_output=True, text=True, check=True)
+    duration, peak_memory = result.stdout.split()[-2:]
+    return float(duration), int(peak_memory)
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as folder_path:
+        for size in LIST_IMAGE_SIZES:
+            file_path = os.path.join(folder_path, "image.jpg")
+            # The peak memory is inherited by the child processes, so the
+            # image is generated in its own process
+            subprocess.run([sys.executable, __file__, "--generate", file_path,
+                            str(size[0]), str(size[1])], check=True)
+            print(f"Image of {size[0]}x{size[1]} pixels:")
+            for fast, label in [(False, "Full decode"), (True, "Reduced decode")]:
+                duration, peak_memory = measure_import(file_path, fast)
+                print(f"  {label}: {duration * 1000:.0f} ms, "
+                      f"peak RSS {peak_memory / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run_import(sys.argv[2], bool(int(sys.argv[3])))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--generate":
+        generate_image(sys.argv[2], (int(sys.argv[3]), int(sys.argv[4])))
+    else:
+        run_benchmark()
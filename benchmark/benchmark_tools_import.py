@@ -0,0 +1,76 @@
+"""
+Benchmark module of tools_import
+
+It measures the throughput of the import of several photos depending on the
+number of workers of the import.
+
+Usage: python benchmark/benchmark_tools_import.py
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(".")
+# Keep Kivy from parsing the arguments of the script
+os.environ["KIVY_NO_ARGS"] = "1"
+
+### Module imports ###
+
+from PIL import Image as PIL_Image
+
+from tools.tools_image import (
+    IMAGE_EXT,
+    delete_stored_image
+)
+from tools.tools_import import import_images
+
+
+#################
+### Constants ###
+#################
+
+
+NUMBER_IMAGES = 24
+IMAGE_SIZE = (4000, 3000)
+
+
+#################
+### Functions ###
+#################
+
+
+def generate_images(folder_path):
+    gradient = PIL_Image.linear_gradient("L").resize(IMAGE_SIZE)
+    for index in range(NUMBER_IMAGES):
+        # Each photo has its own noise, so that they are all stored
+        noise = PIL_Image.effect_noise(IMAGE_SIZE, 40 + index)
+        PIL_Image.merge("RGB", (gradient, noise, gradient)).save(
+            os.path.join(folder_path, str(index) + IMAGE_EXT), quality=90)
+
+
+def run_benchmark():
+    number_cores = os.cpu_count() or 1
+    list_workers = sorted({1, 2, 4, number_cores})
+    with tempfile.TemporaryDirectory() as folder_path:
+        generate_images(folder_path)
+        for max_workers in list_workers:
+            start_time = time.perf_counter()
+            list_image_names, _ = import_images([folder_path], max_workers=max_workers)
+            duration = time.perf_counter() - start_time
+            print(f"{max_workers} workers: {NUMBER_IMAGES / duration:.1f} photos/s")
+            for image_name in set(list_image_names):
+                delete_stored_image(image_name[:-len(IMAGE_EXT)])
+
+
+if __name__ == "__main__":
+    run_benchmark()
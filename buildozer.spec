@@ -22,7 +22,7 @@ source.include_exts = py,png,jpg,kv,atlas,json,txt,ttf,wav,ico,ogg,otf
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-source.exclude_dirs = test, bin, .buildozer, data/collection, data/collection_copy, venv, PlayStore, reports
+source.exclude_dirs = test, bin, .buildozer, data/collection, data/collection_copy, venv, PlayStore, reports, benchmark, resources/images_application
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -37,7 +37,7 @@ version = 1.2.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,pillow,androidstorage4kivy
+requirements = python3,kivy,pillow,numpy,sqlite3,androidstorage4kivy
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
@@ -17,9 +17,10 @@ import os
 from kivy.config import Config
 Config.set('kivy', 'exit_on_escape', '0')
 from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.screenmanager import ScreenManager, NoTransition, Screen
 from kivy.lang import Builder
+from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.uix.widget import Widget
 from kivy.app import App
 
@@ -30,7 +31,19 @@ from tools.tools import (
     PATH_KIVY_FOLDER,
     MOBILE_MODE
 )
-from tools.tools_collection import clean_unused_images
+from tools.tools_collection import (
+    image_collector,
+    image_reencoder,
+    image_hash_index,
+    collection_saver,
+    get_unhashed_images,
+    start_image_reencoding,
+    finish_image_reencoding
+)
+from tools.tools_duplicates import compute_stored_image_hashes
+from tools.tools_tasks import collection_worker
+from tools.tools_saver import flush_all_savers
+from tools.tools_textures import texture_cache
 from tools.tools_kivy import (
     highlight_text_color,
     pink_color,
@@ -84,33 +97,6 @@ class TopMenuLayout(FloatLayout):
         self.parent.manager.init_screen("menu")
 
 
-class MyScrollViewLayout(GridLayout):
-    """
-    Class corresponding to the layout inside the scroll view
-    """
-
-    def __init__(self, **kwargs):
-        super(MyScrollViewLayout, self).__init__(**kwargs)
-        self.size_hint_y = None
-        self.bind(minimum_height=self.setter('height'))
-
-    def reset_screen(self):
-        """
-        Removes all widgets from the scrollview.
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        -------
-        None
-        """
-        list_widgets = self.children[:]
-        for element in list_widgets:
-            self.remove_widget(element)
-
-
 ###############
 ### General ###
 ###############
@@ -192,8 +178,62 @@ class MainApp(App, Widget):
 
     def on_start(self):
         self.root_window.children[0].init_screen("menu")
+
+        # Re-encode the stored images before deleting the unused ones, since
+        # the re-encoded images are not referenced until the end
+        if start_image_reencoding():
+            Clock.schedule_interval(self.reencode_images, 0.1)
+        else:
+            self.start_image_collection()
         return super().on_start()
 
+    def start_image_collection(self):
+        # Hash the images stored before the index of the hashes existed
+        list_image_names = get_unhashed_images()
+        if list_image_names:
+            collection_worker.submit(
+                compute_stored_image_hashes,
+                list_image_names,
+                on_done=image_hash_index.add_images
+            )
+
+        # Delete the unused images a little at each frame
+        image_collector.start()
+        Clock.schedule_interval(self.collect_unused_images, 0)
+
+    def reencode_images(self, *args):
+        if not image_reencoder.poll():
+            return True
+        dict_report = finish_image_reencoding()
+        Logger.info("Reencoding: %d images re-encoded, %d bytes saved",
+                    dict_report["number_reencoded"], dict_report["saved_size"])
+        if dict_report["list_failed_images"]:
+            Logger.warning("Reencoding: images not re-encoded: %s",
+                           ", ".join(dict_report["list_failed_images"]))
+        # The collection refers to the new files on the disk before the
+        # collector deletes the former ones
+        collection_saver.flush()
+        self.start_image_collection()
+        return False
+
+    def collect_unused_images(self, *args):
+        # Returning False unschedules the callback at the end of the sweep
+        return not image_collector.step()
+
+    def on_pause(self):
+        # Write the pending saves, the application may be killed in background
+        flush_all_savers()
+        # Free the memory of the textures, they are loaded again on the next screen
+        texture_cache.clear()
+        return True
+
+    def on_stop(self):
+        # Keep the progress of the re-encoding for the next start
+        if image_reencoder is not None:
+            image_reencoder.stop()
+        flush_all_savers()
+        return super().on_stop()
+
     def key_input(self, window, key, scancode, codepoint, modifier):
         """
         Take into account the back arrow in Android, corresponding to the key 27 (escape).
@@ -231,5 +271,3 @@ if __name__ == "__main__":
         if file_name.endswith(".kv"):
             Builder.load_file(PATH_KIVY_FOLDER + file_name, encoding="utf-8")
     MainApp().run()
-
-clean_unused_images()
@@ -14,38 +14,102 @@ CollectionWindow : content of the collection screen.
 ### Python imports ###
 
 from functools import partial
+from typing import Union
 
 ### Kivy imports ###
 
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.relativelayout import RelativeLayout
+from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.screenmanager import Screen
-from kivy.uix.image import Image
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from kivy.properties import StringProperty
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import StringProperty, ObjectProperty, NumericProperty
 
 ### Module imports ###
 
 from tools.tools import (
     ADD_IMAGE_SOURCE,
     EMPTY_IMAGE_SOURCE,
-    FRAME_IMAGE_SOURCE,
     my_language
 )
 from tools.tools_kivy import (
     global_spacing,
     window_size,
+    color_label,
     scale_image
 )
+from tools.tools_textures import release_screen_textures
 from tools.tools_collection import (
     Gallery,
-    TramwayImage
+    TramwayImage,
+    CollectionChanges
 )
 from screens.components import BadgedImage
 from screens.menu_window import my_collection
 
 
+#################
+### Constants ###
+#################
+
+
+LABEL_HEIGHT = 40 * scale_image
+SPACING = global_spacing["horizontal"]
+PADDING = global_spacing["horizontal"] * 2
+IMAGE_HEIGHT = (window_size[0] - LABEL_HEIGHT) / 3
+
+
+############
+### Rows ###
+############
+
+
+class GalleryRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    Row of a gallery in the collection, with its name, its default images
+    on each side and a button to add an image.
+
+    The rows are recycled by the list of the collection, only the visible ones exist.
+    """
+
+    gallery_name = StringProperty("")
+    font = StringProperty("Roboto")
+    left_image = ObjectProperty(None, allownone=True)
+    right_image = ObjectProperty(None, allownone=True)
+    pixel_size = NumericProperty(None, allownone=True)
+    open_function = ObjectProperty(None)
+    add_function = ObjectProperty(None)
+    label_height = LABEL_HEIGHT
+    spacing_images = SPACING
+    padding_images = PADDING
+    color_label = color_label
+    add_image_source = ADD_IMAGE_SOURCE
+
+    def refresh_view_attrs(self, rv, index, data):
+        super().refresh_view_attrs(rv, index, data)
+        list_cells = [
+            (self.ids.left_image, self.left_image),
+            (self.ids.right_image, self.right_image)
+        ]
+        badged_image: BadgedImage
+        for badged_image, tramway_image in list_cells:
+            badged_image.set_tramway_image(tramway_image, self.pixel_size)
+            if tramway_image is not None:
+                badged_image.assign_function(
+                    function=partial(self.open_function, tramway_image))
+
+
+class AddGalleryRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    Last row of the collection, to create a new gallery.
+    """
+
+    text = StringProperty("")
+    font = StringProperty("Roboto")
+    add_function = ObjectProperty(None)
+    label_height = LABEL_HEIGHT
+    color_label = color_label
+    add_image_source = ADD_IMAGE_SOURCE
+
+
 #######################
 ### Collection menu ###
 #######################
@@ -74,11 +138,14 @@ class CollectionWindow(Screen):
     init_screen
         Initialize the screen for the display.
 
-    build_image
-        Create a single image on the screen.
+    get_default_image
+        Get the default image of a side of a gallery.
 
-    build_scrollview
-        Build the scrollview with all images.
+    build_scroll_view
+        Build the data of the rows of the collection.
+
+    update_scroll_view
+        Update the rows of the galleries modified since the last display.
 
     add_image
         Open the image edition screen.
@@ -93,11 +160,18 @@ class CollectionWindow(Screen):
         None
         """
         super().__init__(**kw)
+        # Modifications of the collection since the last display of the rows
+        self.collection_changes = CollectionChanges(
+            collection=my_collection,
+            list_structural_operations=["add_gallery", "delete_gallery"])
+        self.displayed_language = None
+        self.dict_gallery_indexes = {}
 
     font = StringProperty("Roboto")
-    label_height = 40 * scale_image
-    spacing = global_spacing["horizontal"]
-    padding = global_spacing["horizontal"] * 2
+    label_height = LABEL_HEIGHT
+    spacing = SPACING
+    padding = PADDING
+    row_height = LABEL_HEIGHT + IMAGE_HEIGHT
 
     def init_screen(self):
         """
@@ -111,55 +185,51 @@ class CollectionWindow(Screen):
         -------
         None
         """
-        self.ids.my_sv_layout.reset_screen()
         self.ids.top_menu_layout.ids.return_button.on_release = \
             self.ids.top_menu_layout.back_to_general
         self.font = my_language.font
-        self.build_scroll_view()
+        self.update_scroll_view()
+
+    def on_leave(self, *args):
+        release_screen_textures()
 
-    def build_image(self, gallery: Gallery, side, height):
+    def get_default_image(self, gallery: Gallery, side) -> Union[TramwayImage, None]:
         """
-        Load a single image from a gallery to display it on the screen.
+        Get the default image of a side of a gallery, if the side has images.
 
         Parameters
         ----------
         gallery : Gallery
-            Gallery containing the image to load
+            Gallery containing the image
 
         side : str
             Side of the image
 
-        height : int
-            Height of the image
-
         Returns
         -------
-        image : Image from kivy.uix.image
-            Widget of the image
+        TramwayImage | None
+            Default image, None if the side has no image
         """
         tramway_image: TramwayImage = gallery.get_default_image(side)
         if tramway_image.source != EMPTY_IMAGE_SOURCE:
-            image = BadgedImage(
-                size_hint_y=None,
-                height=height,
-                tramway_image=tramway_image
-            )
-            image.assign_function(
-                function=partial(self.manager.init_screen,
-                                 "image_edition", gallery, tramway_image)
-            )
-            return image
-        image = Image(
-            size_hint_y=None,
-            height=height,
-            allow_stretch=True,
-            source=FRAME_IMAGE_SOURCE
-        )
-        return image
+            return tramway_image
+        return None
+
+    def get_row_data(self, gallery: Gallery) -> dict:
+        return {
+            "gallery_name": gallery.name,
+            "left_image": self.get_default_image(gallery, "left"),
+            "right_image": self.get_default_image(gallery, "right"),
+            "pixel_size": IMAGE_HEIGHT,
+            "font": self.font,
+            "open_function": partial(self.open_image, gallery),
+            "add_function": partial(self.add_image, gallery)
+        }
 
     def build_scroll_view(self):
         """
-        Build the scrollview containing the images to display them on the screen.
+        Build the data of the rows of the collection, the list creating the
+        widgets of the visible rows only.
 
         Parameters
         ----------
@@ -169,99 +239,51 @@ class CollectionWindow(Screen):
         -------
         None
         """
-        grid_layout_width = window_size[0]
-        height = (grid_layout_width - self.label_height) / 3
-        for gallery in my_collection.list_galleries:
-            # Label for the name of the gallery
-            name_label = Label(
-                size_hint_y=None,
-                height=self.label_height,
-                color=self.manager.color_label,
-                text=gallery.name,
-                font_name=self.font
-            )
-            self.ids.my_sv_layout.add_widget(name_label)
-
-            # Grid layout for the three images
-            grid_layout = GridLayout(
-                cols=3,
-                size_hint_y=None,
-                padding=[self.padding, 0, self.padding, 0],
-                spacing=[self.spacing, 0],
-                width=grid_layout_width
-            )
-            grid_layout.height = height
-
-            # Left image
-            left_image = self.build_image(
-                gallery, "left", height)
-            grid_layout.add_widget(left_image)
-
-            # Right image
-            right_image = self.build_image(
-                gallery, "right", height)
-            grid_layout.add_widget(right_image)
-
-            # Add image
-            add_image_layout = RelativeLayout(
-                size_hint_y=None,
-                height=height
-            )
-            add_image = Image(
-                size_hint_y=None,
-                height=height / 2,
-                pos_hint={"center_x": 0.5, "center_y": 0.5},
-                source=ADD_IMAGE_SOURCE,
-                allow_stretch=True
-            )
-            add_image_layout.add_widget(add_image)
-            add_button = Button(
-                size_hint_y=None,
-                height=height / 2,
-                pos_hint={"center_x": 0.5, "center_y": 0.5},
-                background_color=(0, 0, 0, 0)
-            )
-            add_button.on_release = partial(self.add_image, gallery)
-            add_image_layout.add_widget(add_button)
-            grid_layout.add_widget(add_image_layout)
-
-            self.ids.my_sv_layout.add_widget(grid_layout)
+        list_data = [self.get_row_data(gallery)
+                     for gallery in my_collection.list_galleries]
 
         # Add gallery
+        list_data.append({
+            "viewclass": "AddGalleryRow",
+            "text": my_language.dict_language["collection"]["new_gallery"],
+            "font": self.font,
+            "add_function": self.add_new_gallery
+        })
+        self.ids.recycle_view.data = list_data
+        self.dict_gallery_indexes = {
+            gallery: index for index, gallery in enumerate(my_collection.list_galleries)}
+        self.displayed_language = my_language.code_language
+        self.collection_changes.set_displayed()
+
+    def update_scroll_view(self):
+        """
+        Update the rows of the galleries modified since the last display,
+        and rebuild all the rows after a structural modification.
+
+        Parameters
+        ----------
+        None
 
-        # Empty label for spacing
-        add_gallery_label = Label(
-            size_hint_y=None,
-            height=self.label_height,
-            color=self.manager.color_label,
-            text=my_language.dict_language["collection"]["new_gallery"],
-            font_name=self.font
-        )
-        self.ids.my_sv_layout.add_widget(add_gallery_label)
-
-        # Add button
-        add_galery_layout = RelativeLayout(
-            size_hint_y=None,
-            height=height
-        )
-        add_gallery_image = Image(
-            size_hint_y=None,
-            height=height / 1.5,
-            pos_hint={"center_x": 0.5, "center_y": 0.5},
-            source=ADD_IMAGE_SOURCE,
-            allow_stretch=True
-        )
-        add_galery_layout.add_widget(add_gallery_image)
-        add_gallery_button = Button(
-            size_hint_y=None,
-            height=height / 1.5,
-            pos_hint={"center_x": 0.5, "center_y": 0.5},
-            background_color=(0, 0, 0, 0)
-        )
-        add_gallery_button.on_release = partial(
-            self.add_image, Gallery())
-        add_galery_layout.add_widget(add_gallery_button)
-        self.ids.my_sv_layout.add_widget(add_galery_layout)
+        Returns
+        -------
+        None
+        """
+        if self.displayed_language != my_language.code_language or \
+                not self.collection_changes.check_can_update():
+            self.build_scroll_view()
+            return
+        if self.collection_changes.check_is_displayed():
+            return
+        data = self.ids.recycle_view.data
+        for gallery in self.collection_changes.set_changed_galleries:
+            data[self.dict_gallery_indexes[gallery]] = self.get_row_data(gallery)
+        self.collection_changes.set_displayed()
+
+    def open_image(self, gallery: Gallery, tramway_image: TramwayImage):
+        self.manager.init_screen("image_edition", gallery, tramway_image)
+
+    def add_new_gallery(self):
+        self.add_image(Gallery())
 
     def add_image(self, gallery: Gallery):
         """
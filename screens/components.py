@@ -8,6 +8,7 @@ Module to create components useful for the display of the other screens.
 
 ### Python imports ###
 import os
+from typing import Union
 
 
 ### Kivy imports ###
@@ -16,7 +17,7 @@ from kivy.uix.relativelayout import RelativeLayout
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.image import Image
 from kivy.uix.button import Button
-from kivy.properties import StringProperty, ObjectProperty, ListProperty
+from kivy.properties import StringProperty, ObjectProperty, ListProperty, BooleanProperty
 
 ### Module imports ###
 
@@ -34,6 +35,7 @@ from tools.tools import (
 from tools.tools_kivy import (
     pink_color
 )
+from tools.tools_textures import texture_cache
 
 if MOBILE_MODE:
     from android.storage import primary_external_storage_path  # pylint: disable=import-error # type: ignore
@@ -49,44 +51,72 @@ else:
 class BadgedImage(RelativeLayout):
     """
     Class corresponding to the image with the badges and the button to edit it
+
+    The image can be replaced, for instance when the widget is recycled to
+    display another image. Without image, only the frame is displayed.
     """
 
-    def __init__(self, tramway_image: TramwayImage, **kw):
+    def __init__(self, tramway_image: Union[TramwayImage, None] = None, pixel_size=None, **kw):
         super().__init__(**kw)
-        self.tramway_image = tramway_image
-        if tramway_image.default:
-            frame_source = FRAME_DEFAULT_IMAGE_SOURCE
-        else:
-            frame_source = FRAME_IMAGE_SOURCE
-        image = ImageWithFrame(
+        self.image = ImageWithFrame(
             size_hint=(1, 1),
-            source=tramway_image.source,
-            frame_source=frame_source,
             allow_stretch=True
         )
-        self.add_widget(image)
+        self.add_widget(self.image)
         self.image_button = Button(
             size_hint=(1, 1),
             background_color=(0, 0, 0, 0)
         )
         self.add_widget(self.image_button)
-        if tramway_image.plus_plus:
-            # Plus plus badge
-            plus_plus_image = Image(
-                size_hint=(0.15, 0.15),
-                pos_hint={"x": 0.1, "y": 0.12},
-                source=tramway_image.get_plus_plus_badge(),
-                allow_stretch=True
-            )
-            self.add_widget(plus_plus_image)
+        # Plus plus badge
+        self.plus_plus_image = Image(
+            size_hint=(0.15, 0.15),
+            pos_hint={"x": 0.1, "y": 0.12},
+            allow_stretch=True
+        )
+        self.add_widget(self.plus_plus_image)
         # Category badge
-        category_badge = Image(
+        self.category_badge = Image(
             size_hint=(0.3, 0.3),
             pos_hint={"x": 0.8, "y": 0.75},
-            source=DICT_CATEGORY_IMAGES[tramway_image.category],
             allow_stretch=True
         )
-        self.add_widget(category_badge)
+        self.add_widget(self.category_badge)
+        self.set_tramway_image(tramway_image, pixel_size)
+
+    def set_tramway_image(self, tramway_image: Union[TramwayImage, None], pixel_size=None):
+        """
+        Display an image with its badges.
+
+        Parameters
+        ----------
+        tramway_image : TramwayImage | None
+            Image to display, None to display the frame only.
+
+        pixel_size : float, optional (default is None)
+            Size in pixels of the widget, to load the smallest variant of the image.
+        """
+        self.tramway_image = tramway_image
+        if tramway_image is None:
+            self.image.source = None
+            self.image.frame_source = FRAME_IMAGE_SOURCE
+            self.image_button.disabled = True
+            self.plus_plus_image.opacity = 0
+            self.category_badge.opacity = 0
+            return
+        if tramway_image.default:
+            self.image.frame_source = FRAME_DEFAULT_IMAGE_SOURCE
+        else:
+            self.image.frame_source = FRAME_IMAGE_SOURCE
+        self.image.source = tramway_image.get_source(pixel_size)
+        self.image_button.disabled = False
+        if tramway_image.plus_plus:
+            self.plus_plus_image.source = tramway_image.get_plus_plus_badge()
+            self.plus_plus_image.opacity = 1
+        else:
+            self.plus_plus_image.opacity = 0
+        self.category_badge.source = DICT_CATEGORY_IMAGES[tramway_image.category]
+        self.category_badge.opacity = 1
 
     def assign_function(self, function):
         """
@@ -120,6 +150,8 @@ class LoadDialog(FloatLayout):
     font = StringProperty("Roboto")
     default_path = StringProperty("")
     filters_list = ListProperty([])
+    multiselect = BooleanProperty(False)
+    dirselect = BooleanProperty(False)
     load = ObjectProperty(None)
     cancel = ObjectProperty(None)
     pink_color = pink_color
@@ -145,23 +177,44 @@ class ImageWithFrame(RelativeLayout):
     Class to create kivy images with a frame attached.
 
     Two sources are specified, one for the image and one for the frame.
+    The texture of the image is taken from the texture cache, the frame
+    comes from the atlas of the application. The sources can be changed,
+    for instance when the widget is recycled to display another gallery.
     """
 
-    def __init__(self,
-                 source=None,
-                 frame_source=FRAME_IMAGE_SOURCE,
-                 size_hint=(None, None),
-                 allow_stretch=False,
-                 **kwargs):
+    source = StringProperty(None, allownone=True)
+    frame_source = StringProperty(FRAME_IMAGE_SOURCE)
+    allow_stretch = BooleanProperty(False)
+
+    def __init__(self, size_hint=(None, None), **kwargs):
         super().__init__(size_hint=size_hint, **kwargs)
         self.image = Image(
-            source=source,
             size_hint=(0.85, 0.85),
             pos_hint={"x": 0.075, "y": 0.075},
-            allow_stretch=allow_stretch)
+            allow_stretch=self.allow_stretch)
         self.add_widget(self.image)
         self.frame = Image(
-            source=frame_source,
-            allow_stretch=allow_stretch,
+            source=self.frame_source,
+            allow_stretch=self.allow_stretch,
             size_hint=(1, 1))
         self.add_widget(self.frame)
+        self.update_image()
+        self.bind(
+            source=self.update_image,
+            frame_source=self.frame.setter("source"),
+            allow_stretch=self.image.setter("allow_stretch"))
+        self.bind(allow_stretch=self.frame.setter("allow_stretch"))
+
+    def update_image(self, *args):
+        if not self.source:
+            # Only the frame is displayed
+            self.image.source = ""
+            self.image.texture = None
+            return
+        texture = texture_cache.get(self.source)
+        if texture is None:
+            # Let Kivy report the images which cannot be loaded
+            self.image.source = self.source
+            return
+        self.image.source = ""
+        self.image.texture = texture
@@ -14,22 +14,19 @@ GalleryWindow : content of the gallery screen.
 ### Python imports ###
 
 from functools import partial
-from math import ceil
 
 ### Kivy imports ###
 
+from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.relativelayout import RelativeLayout
-from kivy.uix.stacklayout import StackLayout
 from kivy.uix.screenmanager import Screen
-from kivy.uix.image import Image
-from kivy.uix.label import Label
-from kivy.properties import StringProperty
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import StringProperty, ObjectProperty, NumericProperty
 
 ### Module imports ###
 
 from tools.tools import (
     ADD_IMAGE_SOURCE,
-    PATH_APP_IMAGES,
     DICT_CATEGORY_IMAGES,
     my_language
 )
@@ -40,14 +37,85 @@ from tools.tools_kivy import (
     create_standard_popup,
     scale_image
 )
+from tools.tools_textures import release_screen_textures
 from tools.tools_collection import (
     Gallery,
+    CollectionChanges,
     save_collection
 )
 from screens.components import BadgedImage
 from screens.collection_window import my_collection
 
 
+#################
+### Constants ###
+#################
+
+
+NUMBER_COLS = 3
+LABEL_HEIGHT = 60 * scale_image
+SPACING = global_spacing["horizontal"]
+PADDING = 0.05 * window_size[0]
+IMAGE_WIDTH = (window_size[0] - 2 * PADDING - SPACING * (NUMBER_COLS - 1)) / NUMBER_COLS
+IMAGE_HEIGHT = (window_size[0] - LABEL_HEIGHT) / NUMBER_COLS
+# Ratio between the height of the header of a side and the size of its badges
+BADGE_RATIO = 1.3
+
+
+############
+### Rows ###
+############
+
+
+class SideHeader(RecycleDataViewBehavior, RelativeLayout):
+    """
+    Header of a side of the gallery, with two badges of its best category.
+    """
+
+    text = StringProperty("")
+    font = StringProperty("Roboto")
+    badge_source = StringProperty("")
+    color_label = color_label
+    badge_ratio = BADGE_RATIO
+
+
+class ImageRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    Row of NUMBER_COLS images of a side of the gallery, the last row of a
+    side being completed by empty cells.
+
+    The rows are recycled by the grid of the gallery, only the visible ones exist.
+    """
+
+    list_images = ObjectProperty([])
+    pixel_size = NumericProperty(None, allownone=True)
+    open_function = ObjectProperty(None)
+    spacing_images = SPACING
+    padding_images = PADDING
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.list_cells = []
+        for _ in range(NUMBER_COLS):
+            badged_image = BadgedImage()
+            self.add_widget(badged_image)
+            self.list_cells.append(badged_image)
+
+    def refresh_view_attrs(self, rv, index, data):
+        super().refresh_view_attrs(rv, index, data)
+        badged_image: BadgedImage
+        for index_cell, badged_image in enumerate(self.list_cells):
+            if index_cell >= len(self.list_images):
+                badged_image.set_tramway_image(None)
+                badged_image.opacity = 0
+                continue
+            tramway_image = self.list_images[index_cell]
+            badged_image.set_tramway_image(tramway_image, self.pixel_size)
+            badged_image.opacity = 1
+            badged_image.assign_function(
+                function=partial(self.open_function, tramway_image))
+
+
 ####################
 ### Gallery menu ###
 ####################
@@ -74,13 +142,25 @@ class GalleryWindow(Screen):
 
     def __init__(self, **kw):
         super().__init__(**kw)
+        # Modifications of the collection since the last display of the gallery
+        self.collection_changes = CollectionChanges(
+            collection=my_collection,
+            list_structural_operations=["add_image", "delete_image"])
+        self.gallery = None
+        self.displayed_version = None
+        self.displayed_language = None
+        self.list_displayed_images = []
+        self.list_best_categories = []
+        self.list_row_versions = []
 
     font = StringProperty("Roboto")
-    label_height = 60 * scale_image
-    spacing = global_spacing["horizontal"]
+    label_height = LABEL_HEIGHT
+    spacing = SPACING
+    padding = PADDING
+    image_height = IMAGE_HEIGHT
     add_image_image = ADD_IMAGE_SOURCE
     gallery_name = StringProperty("")
-    number_cols = 3
+    number_cols = NUMBER_COLS
     gallery_name_hint_text = StringProperty("")
 
     def init_screen(self, gallery: Gallery):
@@ -95,97 +175,92 @@ class GalleryWindow(Screen):
         # Set the function to the return button
         self.ids.top_menu_layout.ids.return_button.on_release = partial(
             self.go_to_next_screen, "menu")
-        self.gallery = gallery
         self.gallery_name = gallery.name
-        self.ids.my_sv_layout.reset_screen()
-        self.build_scroll_view()
+        if gallery is not self.gallery or \
+                self.displayed_language != my_language.code_language or \
+                not self.collection_changes.check_can_update(gallery):
+            self.gallery = gallery
+            self.build_scroll_view()
+        elif gallery.version != self.displayed_version:
+            self.update_scroll_view()
 
-    def build_side_layout(self, label_text, side):
+    def on_leave(self, *args):
+        release_screen_textures()
+
+    def get_side_data(self, label_text, side):
         """
-        Build the display associated to one side during the screen initialisation.
+        Build the data of the header and of the rows of images of one side.
         """
+        best_category = self.gallery.get_best_category_name(side)
+        self.list_best_categories.append(best_category)
+        self.list_row_versions.append(None)
+        list_data = [{
+            "viewclass": "SideHeader",
+            "height": self.label_height,
+            "text": label_text,
+            "font": self.font,
+            "badge_source": "" if best_category is None else DICT_CATEGORY_IMAGES[best_category]
+        }]
 
-        # Label with the two badges
-        best_category, _ = self.gallery.get_best_category(
-            side=side)
-        relative_layout = RelativeLayout(
-            height=self.label_height,
-            size_hint=(1, None)
-        )
-        label = Label(
-            text=label_text,
-            color=color_label,
-            height=relative_layout.height,
-            font_name=self.font
-        )
-        relative_layout.add_widget(label)
-        badge_ratio = 1.3
-        # Two badges to indicate the best category
-        if best_category is not None:
-            left_badge = Image(
-                source=PATH_APP_IMAGES + best_category + ".png",
-                size_hint=(None, None),
-                height=relative_layout.height / badge_ratio,
-                width=relative_layout.height / badge_ratio,
-                pos_hint={"x": 0.2, "y": 0.1},
-                allow_stretch=True
-            )
-            relative_layout.add_widget(left_badge)
-            right_badge = Image(
-                source=PATH_APP_IMAGES + best_category + ".png",
-                size_hint=(None, None),
-                height=relative_layout.height / badge_ratio,
-                width=relative_layout.height / badge_ratio,
-                pos_hint={"right": 0.8, "y": 0.1},
-                allow_stretch=True
-            )
-            relative_layout.add_widget(right_badge)
-        self.ids.my_sv_layout.add_widget(relative_layout)
-
-        # Layout with all images
-        list_images = self.gallery.get_list_side_images(side=side)
-        number_images = len(list_images)
-        height = (window_size[0] - self.label_height) / self.number_cols
-        padding_side = 0.05 * window_size[0]
-        stack_layout = StackLayout(
-            spacing=self.spacing,
-            padding=[padding_side, 0, padding_side, 0],
-            size_hint_y=None,
-            height=height * ceil(number_images / self.number_cols)
-        )
-
-        # Sort list per category
-        order = {key: i for i, key in enumerate(
-            list(DICT_CATEGORY_IMAGES.keys()))}
-        list_images.sort(key=lambda image: order[image.category])
-
-        # Display all badged images
-        for tramway_image in list_images:
-            badged_image = BadgedImage(
-                size_hint=(None, None),
-                width=(window_size[0] - padding_side * 2 - self.spacing *
-                       (self.number_cols - 1)) / self.number_cols,
-                height=height,
-                tramway_image=tramway_image
-            )
-            badged_image.assign_function(
-                function=partial(self.go_to_next_screen,
-                                 "image_edition",
-                                 tramway_image)
-            )
-            stack_layout.add_widget(badged_image)
-        self.ids.my_sv_layout.add_widget(stack_layout)
+        # The images are already sorted per category by the gallery
+        list_images = self.gallery.get_sorted_side_images(side)
+        self.list_displayed_images += list_images
+        open_function = partial(self.go_to_next_screen, "image_edition")
+        pixel_size = max(IMAGE_WIDTH, IMAGE_HEIGHT)
+        for index in range(0, len(list_images), self.number_cols):
+            list_row_images = list_images[index:index + self.number_cols]
+            list_data.append({
+                "list_images": list_row_images,
+                "pixel_size": pixel_size,
+                "open_function": open_function
+            })
+            self.list_row_versions.append(
+                [tramway_image.version for tramway_image in list_row_images])
+        return list_data
 
     def build_scroll_view(self):
         """
-        Build the scrollview containing the images for the display.
+        Build the data of the grid containing the images, the grid creates the visible rows.
         """
-        self.build_side_layout(
+        self.list_displayed_images = []
+        self.list_best_categories = []
+        self.list_row_versions = []
+        self.ids.recycle_view.data = self.get_side_data(
             my_language.dict_language["image_edition"]["left_side"],
-            "left")
-        self.build_side_layout(
+            "left") + self.get_side_data(
             my_language.dict_language["image_edition"]["right_side"],
             "right")
+        self.set_displayed()
+
+    def set_displayed(self):
+        self.displayed_version = self.gallery.version
+        self.displayed_language = my_language.code_language
+        self.collection_changes.set_displayed()
+
+    def update_scroll_view(self):
+        """
+        Update the rows containing the images modified since the last display,
+        and rebuild the grid if the order of the images or the headers change.
+        """
+        list_images = self.gallery.get_sorted_side_images("left") + \
+            self.gallery.get_sorted_side_images("right")
+        list_best_categories = [self.gallery.get_best_category_name(side)
+                                for side in ["left", "right"]]
+        if list_images != self.list_displayed_images or \
+                list_best_categories != self.list_best_categories:
+            self.build_scroll_view()
+            return
+        data = self.ids.recycle_view.data
+        for index, list_versions in enumerate(self.list_row_versions):
+            if list_versions is None:
+                continue
+            list_new_versions = [tramway_image.version
+                                 for tramway_image in data[index]["list_images"]]
+            if list_new_versions != list_versions:
+                # Assigning the row refreshes its widgets if it is visible
+                data[index] = dict(data[index])
+                self.list_row_versions[index] = list_new_versions
+        self.set_displayed()
 
     def go_to_next_screen(self, next_screen="menu", tramway_image=None):
         """
@@ -21,17 +21,17 @@ import time
 
 from kivy.uix.screenmanager import Screen
 from kivy.uix.popup import Popup
-from kivy.properties import StringProperty, BooleanProperty
+from kivy.properties import StringProperty, BooleanProperty, ObjectProperty
 from kivy.clock import Clock
+from kivy.graphics.texture import Texture
 
 ### Module imports ###
 
 from tools.tools import (
     EMPTY_IMAGE_SOURCE,
     DICT_CATEGORY_IMAGES,
-    PATH_APP_IMAGES,
+    DICT_CATEGORY_OFF_IMAGES,
     DICT_BADGES_IMAGES,
-    PATH_TRAMWAY_IMAGES,
     PATH_TEMP_IMAGE,
     MOBILE_MODE,
     my_language,
@@ -40,18 +40,22 @@ from tools.tools import (
 from tools.tools_collection import (
     Gallery,
     TramwayImage,
-    save_collection
+    image_hash_index,
+    image_collector,
+    save_collection,
+    add_imported_images
 )
 from tools.tools_kivy import (
     ImprovedPopup,
     create_standard_popup
 )
 from tools.tools_image import (
-    IMAGE_EXT,
-    copy_as_square,
-    transfer_temp_image,
-    create_new_image_name
+    prepare_square_image,
+    store_image
 )
+from tools.tools_import import BulkImport
+from tools.tools_duplicates import compute_image_hash
+from tools.tools_tasks import image_worker
 from screens.gallery_window import my_collection
 from screens.components import LoadDialog
 
@@ -72,6 +76,8 @@ class ImageEditionWindow(Screen):
 
     def __init__(self, **kw):
         super().__init__(**kw)
+        # Stored images kept from the collection of unused images until they are added
+        self.set_pending_images = set()
 
     gallery_name = StringProperty("")
     path_preview_image = StringProperty(EMPTY_IMAGE_SOURCE)
@@ -79,20 +85,23 @@ class ImageEditionWindow(Screen):
     is_new_gallery = BooleanProperty(True)
     category = StringProperty("")
     dict_category_images = {
-        "gold": [DICT_CATEGORY_IMAGES["gold"], PATH_APP_IMAGES + "gold_off.png"],
-        "silver": [DICT_CATEGORY_IMAGES["silver"], PATH_APP_IMAGES + "silver_off.png"],
-        "bronze": [DICT_CATEGORY_IMAGES["bronze"], PATH_APP_IMAGES + "bronze_off.png"]
+        "gold": [DICT_CATEGORY_IMAGES["gold"], DICT_CATEGORY_OFF_IMAGES["gold"]],
+        "silver": [DICT_CATEGORY_IMAGES["silver"], DICT_CATEGORY_OFF_IMAGES["silver"]],
+        "bronze": [DICT_CATEGORY_IMAGES["bronze"], DICT_CATEGORY_OFF_IMAGES["bronze"]]
     }
     side_tramway = StringProperty("")
     bool_default = BooleanProperty(False)
     plus_plus_images = DICT_BADGES_IMAGES["plus_plus"]
     bool_plus_plus = BooleanProperty(False)
+    is_processing = BooleanProperty(False)
+    preview_texture = ObjectProperty(None, allownone=True)
 
     # Language variables
     font = StringProperty("Roboto")
     gallery_name_hint_text = StringProperty("")
     browse_button_text = StringProperty("")
     delete_button_text = StringProperty("")
+    bulk_import_button_text = StringProperty("")
     left_side_label = StringProperty("")
     right_side_label = StringProperty("")
     on_label = StringProperty("")
@@ -100,6 +109,7 @@ class ImageEditionWindow(Screen):
     default_label = StringProperty("")
     add_button_text = StringProperty("")
     modify_button_text = StringProperty("")
+    processing_label = StringProperty("")
 
     def init_screen(self, gallery: Gallery, tramway_image=None):
         """
@@ -112,6 +122,8 @@ class ImageEditionWindow(Screen):
             "image_edition"]["browse_button"]
         self.delete_button_text = my_language.dict_language[
             "image_edition"]["delete_button"]
+        self.bulk_import_button_text = my_language.dict_language[
+            "image_edition"]["bulk_import_button"]
         self.left_side_label = my_language.dict_language[
             "image_edition"]["left_side"]
         self.right_side_label = my_language.dict_language[
@@ -126,6 +138,8 @@ class ImageEditionWindow(Screen):
             "image_edition"]["add_button"]
         self.modify_button_text = my_language.dict_language[
             "image_edition"]["modify_button"]
+        self.processing_label = my_language.dict_language[
+            "image_edition"]["processing"]
         self.font = my_language.font
 
         # Set the function to the return button
@@ -158,6 +172,8 @@ class ImageEditionWindow(Screen):
             tramway_image = TramwayImage(default=False)
 
         self.tramway_image = tramway_image
+        self.square_image = None
+        self.preview_texture = None
         self.path_preview_image = tramway_image.source
         self.category = str(tramway_image.category)
         self.side_tramway = str(tramway_image.side)
@@ -190,23 +206,26 @@ class ImageEditionWindow(Screen):
     def dismiss_popup(self):
         self.file_chooser.dismiss()
 
-    def wait_for_image(self, *args):
-        if self.choosed_status != "Done":
-            Clock.schedule_once(self.wait_for_image, 0.05)
-        else:
-            # Load the image for preview in the temp folder
-            copy_as_square(self.private_files[0], temp=True)
-            self.path_preview_image = PATH_TEMP_IMAGE
-            self.ids.preview_image.reload()
-            self.load_image(None, self.private_files)
-            self.choosed_status = "None"
+    def on_leave(self, *args):
+        # Drop the processing of the image, its result is not needed anymore
+        image_worker.cancel()
+        self.is_processing = False
+        self.release_pending_images()
+
+    def hold_pending_images(self, list_image_names):
+        list_new_names = [image_name for image_name in set(list_image_names)
+                          if image_name not in self.set_pending_images]
+        image_collector.add_pending_images(list_new_names)
+        self.set_pending_images.update(list_new_names)
+
+    def release_pending_images(self):
+        image_collector.remove_pending_images(list(self.set_pending_images))
+        self.set_pending_images.clear()
 
     def show_load(self):
         if MOBILE_MODE:
-            self.choosed_status = "None"
-            self.chooser = Chooser(self.chooser_callback)
+            self.chooser = Chooser(partial(self.chooser_callback, self.load_image))
             self.chooser.choose_content("image/*")
-            self.wait_for_image()
 
         else:
             content = LoadDialog(load=self.load_image,
@@ -220,31 +239,58 @@ class ImageEditionWindow(Screen):
                 title_font=self.font)
             self.file_chooser.open()
 
-    def chooser_callback(self, shared_file_list):
-        self.private_files = []
+    def chooser_callback(self, load_function, shared_file_list):
+        # The chooser calls it outside of the main thread once the files are chosen
+        private_files = []
         ss = SharedStorage()
         for shared_file in shared_file_list:
-            self.private_files.append(ss.copy_from_shared(shared_file))
-        # while not os.path.exists(self.private_files[0]):
-        #     time.sleep(0.1)
-        # self.load_image(None, self.private_files)
-        self.choosed_status = "Done"
+            private_files.append(ss.copy_from_shared(shared_file))
+        Clock.schedule_once(partial(load_function, None, private_files))
 
-    def load_image(self, path, filename):
+    def load_image(self, path, filename, *args):
         if not MOBILE_MODE:
             self.dismiss_popup()
 
-            # Load the image for preview in the temp folder
-            copy_as_square(filename[0], temp=True)
-            self.path_preview_image = PATH_TEMP_IMAGE
-            self.ids.preview_image.reload()
-
-        # Disable the add button
-        self.ids.add_button.disabled = False
+        # Crop the image in memory, in the background
+        self.is_processing = True
+        self.ids.add_button.disabled = True
+        image_worker.submit(
+            prepare_square_image,
+            filename[0],
+            on_done=self.display_preview,
+            on_error=self.stop_processing
+        )
 
         # Update default path in the settings
         update_settings("default_path_images", os.path.dirname(filename[0]))
 
+    def display_preview(self, square_image):
+        # Upload the pixels directly to the texture of the preview, without any file
+        self.square_image = square_image
+        texture = Texture.create(size=square_image.size, colorfmt="rgb")
+        texture.blit_buffer(square_image.tobytes(), colorfmt="rgb", bufferfmt="ubyte")
+        # The rows of Pillow start at the top, the ones of OpenGL at the bottom
+        texture.flip_vertical()
+        self.preview_texture = texture
+
+        # Hash the image to look for similar images when it is added
+        image_worker.submit(
+            compute_image_hash,
+            square_image,
+            on_done=self.set_image_hash,
+            on_error=self.stop_processing
+        )
+
+    def set_image_hash(self, image_hash):
+        self.image_hash = image_hash
+
+        # Enable the add button
+        self.ids.add_button.disabled = False
+        self.stop_processing()
+
+    def stop_processing(self, *args):
+        self.is_processing = image_worker.check_is_busy()
+
     def delete_image(self, popup: ImprovedPopup):
         # Delete the image in the gallery
         self.gallery.delete_image(tramway_image=self.tramway_image)
@@ -274,15 +320,22 @@ class ImageEditionWindow(Screen):
             self.manager.init_screen("gallery", gallery=self.gallery)
 
     def create_popup_delete_confirmation(self):
+        self.create_popup_confirmation("delete_confirmation", self.delete_image)
+
+    def create_popup_confirmation(self, message_key, yes_function, no_function=None):
         # Create the popup
         popup = ImprovedPopup(
-            title=my_language.dict_messages["delete_confirmation"][0],
+            title=my_language.dict_messages[message_key][0],
             add_content=[],
             font=self.font)
+        if no_function is None:
+            no_function = popup.dismiss
+        else:
+            no_function = partial(no_function, popup)
 
-        # Add the label, the progress bar and the button to close the window
+        # Add the label and the buttons to answer
         popup.add_label(
-            text=my_language.dict_messages["delete_confirmation"][1],
+            text=my_language.dict_messages[message_key][1],
             pos_hint={"x": 0.1, "y": 0.6},
             size_hint=(0.8, 0.15),
             font_name=self.font
@@ -291,18 +344,18 @@ class ImageEditionWindow(Screen):
             text=my_language.dict_buttons["yes"],
             pos_hint={"x": 0.1, "y": 0.25},
             size_hint=(0.35, 0.15),
-            on_release=partial(self.delete_image, popup),
+            on_release=partial(yes_function, popup),
             font_name=self.font
         )
         popup.add_button(
             text=my_language.dict_buttons["no"],
             pos_hint={"x": 0.55, "y": 0.25},
             size_hint=(0.35, 0.15),
-            on_release=popup.dismiss,
+            on_release=no_function,
             font_name=self.font
         )
 
-    def add_image(self):
+    def check_image_attributes(self) -> bool:
 
         # Check that the name of the gallery is not empty
         if self.ids.name_gallery_input.text == "":
@@ -311,7 +364,7 @@ class ImageEditionWindow(Screen):
                 message=my_language.dict_messages["error_gallery_name"][1],
                 button_message=my_language.dict_buttons["close"]
             )
-            return
+            return False
 
         # Check that a side has been selected
         if self.side_tramway == "None":
@@ -320,7 +373,7 @@ class ImageEditionWindow(Screen):
                 message=my_language.dict_messages["error_no_side"][1],
                 button_message=my_language.dict_buttons["close"]
             )
-            return
+            return False
 
         # Check that a category has been selected
         if self.category == "None":
@@ -329,35 +382,197 @@ class ImageEditionWindow(Screen):
                 message=my_language.dict_messages["error_no_category"][1],
                 button_message=my_language.dict_buttons["close"]
             )
+            return False
+
+        return True
+
+    def add_gallery(self) -> bool:
+        self.gallery.name = self.ids.name_gallery_input.text
+        try:
+            my_collection.add_gallery(gallery=self.gallery)
+        except ValueError:
+            create_standard_popup(
+                title_popup=my_language.dict_messages["error_gallery_name"][0],
+                message=my_language.dict_messages["error_gallery_name"][1],
+                button_message=my_language.dict_buttons["close"]
+            )
+            return False
+        self.is_new_gallery = False
+        return True
+
+    def show_bulk_load(self):
+        if not self.check_image_attributes():
             return
 
+        if MOBILE_MODE:
+            self.chooser = Chooser(partial(self.chooser_callback, self.load_bulk_images))
+            self.chooser.choose_content("image/*", multiple=True)
+
+        else:
+            content = LoadDialog(load=self.load_bulk_images,
+                                 cancel=self.dismiss_popup,
+                                 filters_list=['*.png', '*.jpeg', '*.jpg', '*.PNG', '*.JPEG', '*.JPG'],
+                                 multiselect=True,
+                                 dirselect=True)
+            self.file_chooser = Popup(
+                title=my_language.dict_language[
+                    "image_edition"]["load_images"],
+                content=content,
+                size_hint=(0.9, 0.9),
+                title_font=self.font)
+            self.file_chooser.open()
+
+    def load_bulk_images(self, path, filename, *args):
+        if not MOBILE_MODE:
+            self.dismiss_popup()
+            update_settings("default_path_images", path)
+
+        # Import the whole folder when nothing is selected
+        list_paths = filename if filename else [path]
+        self.start_bulk_import(list_paths)
+
+    def start_bulk_import(self, list_paths):
+        self.bulk_import = BulkImport(list_paths)
+        if self.bulk_import.number_images == 0:
+            return
+        self.bulk_import.start()
+        self.is_bulk_import_cancelled = False
+
+        # Create the popup displaying the progress of the import
+        self.bulk_import_popup = ImprovedPopup(
+            title=my_language.dict_messages["bulk_import"][0],
+            add_content=[],
+            font=self.font)
+        self.bulk_import_popup.add_label(
+            text=my_language.dict_messages["bulk_import"][1],
+            pos_hint={"x": 0.1, "y": 0.6},
+            size_hint=(0.8, 0.15),
+            font_name=self.font
+        )
+        self.bulk_import_popup.add_progress_bar(
+            max=self.bulk_import.number_images,
+            pos_hint={"center_x": 0.5, "y": 0.3},
+            size_hint=(0.8, 0.15)
+        )
+        self.bulk_import_popup.bind(on_dismiss=self.cancel_bulk_import)
+        Clock.schedule_interval(self.update_bulk_import, 0.1)
+
+    def cancel_bulk_import(self, *args):
+        # The images already stored are deleted by the next collection of unused images
+        self.bulk_import.cancel()
+        self.is_bulk_import_cancelled = True
+
+    def update_bulk_import(self, *args):
+        is_finished = self.bulk_import.poll()
+        self.bulk_import_popup.progress_bar.value = self.bulk_import.number_done
+        self.hold_pending_images(self.bulk_import.get_stored_image_names())
+        if not is_finished:
+            return True
+
+        if self.is_bulk_import_cancelled:
+            self.release_pending_images()
+            return False
+        self.bulk_import_popup.unbind(on_dismiss=self.cancel_bulk_import)
+        self.bulk_import_popup.dismiss()
+        list_image_names = self.bulk_import.list_image_names
+        if not list_image_names:
+            self.release_pending_images()
+            return False
+
+        # Ask whether to keep the photos looking like other images
+        list_new_images, list_similar_images = image_hash_index.split_similar_images(
+            list_image_names, self.bulk_import.dict_image_hashes)
+        image_hash_index.add_images(self.bulk_import.dict_image_hashes)
+        if list_similar_images:
+            self.create_popup_confirmation(
+                "similar_images",
+                yes_function=partial(self.add_bulk_images, list_image_names),
+                no_function=partial(self.add_bulk_images, list_new_images)
+            )
+        else:
+            self.add_bulk_images(list_image_names)
+        return False
+
+    def add_bulk_images(self, list_image_names, popup=None):
+        if popup is not None:
+            popup.dismiss()
+        if not list_image_names:
+            self.release_pending_images()
+            return
+
+        # Add the new gallery in the collection, the images stay pending until it is added
+        if self.is_new_gallery and not self.add_gallery():
+            return
+
+        # Add all the images with a single save of the collection
+        add_imported_images(
+            gallery=self.gallery,
+            list_image_names=list_image_names,
+            side=self.side_tramway,
+            category=self.category,
+            plus_plus=self.bool_plus_plus
+        )
+        # The images added are referenced and the dropped ones can be deleted
+        self.release_pending_images()
+        self.back_to_gallery()
+
+    def add_image(self):
+        if not self.check_image_attributes():
+            return
+
+        if not self.is_new_image:
+            self.save_image()
+            return
+
+        # Ask whether to keep a photo looking like an image of the collection
+        if image_hash_index.find_similar_images(self.image_hash):
+            self.create_popup_confirmation("similar_image", self.store_new_image)
+            return
+        self.store_new_image()
+
+    def store_new_image(self, popup=None):
+        if popup is not None:
+            popup.dismiss()
+
+        # Encode the new image once, directly into the collection, in the background
+        self.is_processing = True
+        self.ids.add_button.disabled = True
+        image_worker.submit(
+            store_image,
+            self.square_image,
+            PATH_TEMP_IMAGE,
+            on_done=self.save_image,
+            on_error=self.stop_saving
+        )
+
+    def stop_saving(self, *args):
+        self.ids.add_button.disabled = False
+        self.stop_processing()
+
+    def save_image(self, image_file_name=None):
+        self.stop_processing()
+
         # Save the parameters of the image
-        if self.is_new_image:
-            new_image_name = create_new_image_name()
-            transfer_temp_image(new_image_name)
-            path = PATH_TRAMWAY_IMAGES + new_image_name + IMAGE_EXT
-            self.tramway_image.source = path
-
-        self.tramway_image.side = self.side_tramway
-        self.tramway_image.category = self.category
-        self.tramway_image.plus_plus = self.bool_plus_plus
+        if image_file_name is not None:
+            self.hold_pending_images([image_file_name])
+            self.tramway_image.image_name = image_file_name
+            image_hash_index.add_image(image_file_name, self.image_hash)
+
+        self.gallery.edit_image(
+            tramway_image=self.tramway_image,
+            side=self.side_tramway,
+            category=self.category,
+            plus_plus=self.bool_plus_plus
+        )
         if self.bool_default or self.tramway_image.default:
             self.gallery.update_default_image(
                 tramway_image=self.tramway_image
             )
 
         # Add the new gallery in the collection
-        if self.is_new_gallery:
-            self.gallery.name = self.ids.name_gallery_input.text
-            try:
-                my_collection.add_gallery(gallery=self.gallery)
-            except ValueError:
-                create_standard_popup(
-                    title_popup=my_language.dict_messages["error_gallery_name"][0],
-                    message=my_language.dict_messages["error_gallery_name"][1],
-                    button_message=my_language.dict_buttons["close"]
-                )
-                return
+        if self.is_new_gallery and not self.add_gallery():
+            self.ids.add_button.disabled = False
+            return
 
         # Add the new image in the gallery
         if self.is_new_image:
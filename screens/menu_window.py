@@ -10,16 +10,11 @@ from functools import partial
 
 from kivy.uix.relativelayout import RelativeLayout
 from kivy.uix.screenmanager import Screen
-from kivy.uix.image import Image
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from kivy.properties import StringProperty
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import StringProperty, ObjectProperty, NumericProperty
 
 ### Module imports ###
 
-from screens.components import (
-    ImageWithFrame
-)
 from tools.tools import (
     PATH_RESOURCES_FOLDER,
     ADD_IMAGE_SOURCE,
@@ -29,13 +24,66 @@ from tools.tools import (
 from tools.tools_kivy import (
     global_spacing,
     window_size,
+    color_label,
     scale_image
 )
+from tools.tools_textures import release_screen_textures
 from tools.tools_collection import (
     my_collection,
-    Gallery
+    Gallery,
+    CollectionChanges
 )
 
+#################
+### Constants ###
+#################
+
+
+NUMBER_COLS = 3
+SPACING = global_spacing["horizontal"]
+LABEL_HEIGHT = 40 * scale_image
+PADDING = [0.05 * window_size[0], 0, 0.05 * window_size[0], 0]
+TILE_WIDTH = (window_size[0] - 2 * PADDING[0] - SPACING * (NUMBER_COLS - 1)) / NUMBER_COLS
+
+
+#############
+### Tiles ###
+#############
+
+
+class GalleryTile(RecycleDataViewBehavior, RelativeLayout):
+    """
+    Tile of a gallery in the main menu, with its name and one of its images.
+
+    The tiles are recycled by the grid of the menu, only the visible ones exist.
+    """
+
+    gallery_name = StringProperty("")
+    image_source = StringProperty("")
+    tramway_image = ObjectProperty(None, allownone=True)
+    pixel_size = NumericProperty(None, allownone=True)
+    font = StringProperty("Roboto")
+    open_function = ObjectProperty(None)
+    frame_source = FRAME_IMAGE_SOURCE
+    label_height = LABEL_HEIGHT
+    color_label = color_label
+
+    def refresh_view_attrs(self, rv, index, data):
+        super().refresh_view_attrs(rv, index, data)
+        # The source is only looked for when the tile becomes visible
+        self.image_source = self.tramway_image.get_source(self.pixel_size)
+
+
+class AddGalleryTile(RecycleDataViewBehavior, RelativeLayout):
+    """
+    Last tile of the main menu, to create a new gallery.
+    """
+
+    open_function = ObjectProperty(None)
+    add_image_source = ADD_IMAGE_SOURCE
+    label_height = LABEL_HEIGHT
+
+
 #################
 ### Main menu ###
 #################
@@ -48,95 +96,72 @@ class MenuWindow(Screen):
 
     def __init__(self, **kw):
         super().__init__(**kw)
+        # Modifications of the collection since the last display of the tiles
+        self.collection_changes = CollectionChanges(
+            collection=my_collection,
+            list_structural_operations=["add_gallery", "delete_gallery"])
+        self.displayed_language = None
+        self.dict_gallery_indexes = {}
 
     font = StringProperty("Roboto")
     path_resources = PATH_RESOURCES_FOLDER
-    number_cols = 3
-    spacing = global_spacing["horizontal"]
-    label_height = 40 * scale_image
-    padding = [0.05 * window_size[0], 0, 0.05 * window_size[0], 0]
+    number_cols = NUMBER_COLS
+    spacing = SPACING
+    label_height = LABEL_HEIGHT
+    padding = PADDING
+    tile_width = TILE_WIDTH
 
     def init_screen(self):
-        self.ids.my_sv_layout.reset_screen()
         self.font = my_language.font
-        self.build_scroll_view()
+        self.update_scroll_view()
+
+    def on_leave(self, *args):
+        release_screen_textures()
+
+    def get_tile_data(self, gallery: Gallery):
+        return {
+            "gallery_name": gallery.name,
+            "tramway_image": gallery.get_random_image(),
+            "pixel_size": self.tile_width,
+            "font": self.font,
+            "open_function": partial(self.open_gallery, gallery.name)
+        }
 
     def build_scroll_view(self):
-        simple_collection = my_collection.get_simple_collection()
-        image_dimension = (window_size[0] - 2 * self.padding[0] - self.spacing * (
-            self.number_cols - 1)) / self.number_cols
-        height_layout = image_dimension + self.label_height
-        for dict_simple_gallery in simple_collection:
-            relative_layout = RelativeLayout(
-                size_hint=(None, None),
-                height=height_layout,
-                width=image_dimension
-            )
-            # Label for the name of the gallery
-            name_label = Label(
-                size_hint=(None, None),
-                width=image_dimension,
-                height=self.label_height,
-                color=self.manager.color_label,
-                text=dict_simple_gallery["name"],
-                pos_hint={"x": 0, "y": 0},
-                font_name=self.font
-            )
-            relative_layout.add_widget(name_label)
-            # Image
-            image = ImageWithFrame(
-                size_hint=(None, None),
-                width=image_dimension,
-                height=image_dimension,
-                source=dict_simple_gallery["image"],
-                allow_stretch=True,
-                y=self.label_height,
-                frame_source=FRAME_IMAGE_SOURCE
-            )
-            relative_layout.add_widget(image)
-            # Button to click on the image
-            button = Button(
-                size_hint=(None, None),
-                width=image_dimension,
-                height=image_dimension,
-                background_color=(0, 0, 0, 0),
-                y=self.label_height
-            )
-            button.on_release = partial(self.open_gallery, dict_simple_gallery)
-            relative_layout.add_widget(button)
-            self.ids.my_sv_layout.add_widget(relative_layout)
-
-        # Add gallery
-        relative_layout = RelativeLayout(
-            size_hint=(None, None),
-            height=height_layout,
-            width=image_dimension
-        )
-        image = Image(
-            size_hint_y=None,
-            height=image_dimension / 1.5,
-            pos_hint={"center_x": 0.5},
-            y=image_dimension / 3 + self.label_height / 2,
-            source=ADD_IMAGE_SOURCE,
-            allow_stretch=True
-        )
-        relative_layout.add_widget(image)
-        button = Button(
-            size_hint=(None, None),
-            height=image_dimension / 1.5,
-            width=image_dimension / 1.5,
-            pos_hint={"center_x": 0.5},
-            y=image_dimension / 3 + self.label_height / 2,
-            background_color=(0, 0, 0, 0)
-        )
-        button.on_release = self.add_gallery
-        relative_layout.add_widget(button)
-        self.ids.my_sv_layout.add_widget(relative_layout)
+        # Only the data of the tiles is built, the grid creates the visible
+        # tiles and looks for the sources of their images
+        list_data = [self.get_tile_data(gallery)
+                     for gallery in my_collection.list_galleries]
+        list_data.append({
+            "viewclass": "AddGalleryTile",
+            "open_function": self.add_gallery
+        })
+        self.ids.recycle_view.data = list_data
+        self.dict_gallery_indexes = {
+            gallery: index for index, gallery in enumerate(my_collection.list_galleries)}
+        self.displayed_language = my_language.code_language
+        self.collection_changes.set_displayed()
+
+    def update_scroll_view(self):
+        """
+        Update the tiles of the galleries modified since the last display,
+        and rebuild all the tiles after a structural modification.
+        """
+        if self.displayed_language != my_language.code_language or \
+                not self.collection_changes.check_can_update():
+            self.build_scroll_view()
+            return
+        if self.collection_changes.check_is_displayed():
+            return
+        data = self.ids.recycle_view.data
+        for gallery in self.collection_changes.set_changed_galleries:
+            data[self.dict_gallery_indexes[gallery]] = self.get_tile_data(gallery)
+        self.collection_changes.set_displayed()
 
     def add_gallery(self):
         new_gallery = Gallery(name="", list_images=[])
         self.manager.init_screen("image_edition", gallery=new_gallery)
 
-    def open_gallery(self, dict_simple_gallery):
-        gallery = my_collection.get_gallery(dict_simple_gallery["name"])
+    def open_gallery(self, gallery_name):
+        gallery = my_collection.get_gallery(gallery_name)
         self.manager.init_screen("gallery", gallery=gallery)
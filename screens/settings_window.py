@@ -41,7 +41,15 @@ from tools.tools_kivy import (
     TutorialPopup,
     create_standard_popup
 )
-from tools.tools_collection import update_collection
+from tools.tools_collection import (
+    image_hash_index,
+    update_collection,
+    prepare_collection_export,
+    close_collection_storage,
+    get_unhashed_images
+)
+from tools.tools_duplicates import compute_stored_image_hashes
+from tools.tools_tasks import collection_worker
 from screens.image_edition_window import my_collection
 from screens.components import LoadDialog
 
@@ -199,14 +207,27 @@ class SettingsWindow(Screen):
         if not MOBILE_MODE:
             self.dismiss_popup()
 
-        # Delete the previous collection
+        # Stop the tasks on the previous collection and delete it
+        close_collection_storage()
         shutil.rmtree(PATH_TRAMWAY_IMAGES)
 
-        # Unpack the archive
+        # Unpack the archive, the images of the archives in the former flat
+        # layout are moved into their folders when the collection is loaded
         shutil.unpack_archive(filename[0], PATH_TRAMWAY_IMAGES)
         update_collection()
         self.init_screen()
 
+        # Load the hashes of the archive, and compute the missing ones in the background
+        collection_worker.cancel()
+        image_hash_index.reload()
+        list_image_names = get_unhashed_images()
+        if list_image_names:
+            collection_worker.submit(
+                compute_stored_image_hashes,
+                list_image_names,
+                on_done=image_hash_index.add_images
+            )
+
         # Display a completion popup
         create_standard_popup(
             title_popup=my_language.dict_messages["import_completed"][0],
@@ -221,6 +242,7 @@ class SettingsWindow(Screen):
             self.dismiss_popup()
 
         # Zip the collection
+        prepare_collection_export()
         if MOBILE_MODE:
             # Create the zip file
             shutil.make_archive(PATH_DATA_APP_FOLDER +
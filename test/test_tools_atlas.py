@@ -0,0 +1,84 @@
+"""
+Test module of tools_atlas
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import re
+import sys
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools import (
+    PATH_APP_IMAGES,
+    PATH_ATLAS_FOLDER,
+    APP_ATLAS_NAME,
+    PATH_APP_ATLAS,
+    ADD_IMAGE_SOURCE,
+    FRAME_IMAGE_SOURCE,
+    FRAME_DEFAULT_IMAGE_SOURCE,
+    DICT_CATEGORY_IMAGES,
+    DICT_CATEGORY_OFF_IMAGES,
+    DICT_BADGES_IMAGES
+)
+from tools.tools_atlas import (
+    ATLAS_EXT,
+    load_atlas_regions,
+    check_atlas_source
+)
+
+
+#############
+### Tests ###
+#############
+
+
+atlas_path = PATH_ATLAS_FOLDER + APP_ATLAS_NAME + ATLAS_EXT
+
+
+def test_atlas_regions():
+    # All the images of the application are packed on a single page
+    dict_pages = load_atlas_regions(atlas_path)
+    assert len(dict_pages) == 1
+    list_image_ids = sorted(
+        os.path.splitext(file_name)[0] for file_name in os.listdir(PATH_APP_IMAGES))
+    assert sorted(list(dict_pages.values())[0]) == list_image_ids
+    for page_name in dict_pages:
+        assert os.path.exists(os.path.join(PATH_ATLAS_FOLDER, page_name))
+
+
+def test_check_atlas_source():
+    list_sources = [ADD_IMAGE_SOURCE, FRAME_IMAGE_SOURCE, FRAME_DEFAULT_IMAGE_SOURCE]
+    list_sources += list(DICT_CATEGORY_IMAGES.values())
+    list_sources += list(DICT_CATEGORY_OFF_IMAGES.values())
+    for list_badges in DICT_BADGES_IMAGES.values():
+        list_sources += list_badges
+    for source in list_sources:
+        assert check_atlas_source(source), source
+    assert not check_atlas_source(PATH_APP_ATLAS + "tramway")
+    assert not check_atlas_source(PATH_APP_IMAGES + "gold.png")
+
+
+def test_atlas_references():
+    # The screens only refer to the images of the application through the atlas
+    list_paths = ["main.kv"]
+    for folder_path in ["screens", "resources/kivy"]:
+        list_paths += [os.path.join(folder_path, file_name)
+                       for file_name in os.listdir(folder_path)
+                       if file_name.endswith((".py", ".kv"))]
+    for file_path in list_paths:
+        with open(file_path, "r", encoding="utf-8") as file:
+            content = file.read()
+        assert "PATH_APP_IMAGES" not in content, file_path
+        assert "images_application/" not in content, file_path
+        for image_id in re.findall(r'PATH_APP_ATLAS \+ "(\w+)"', content):
+            assert check_atlas_source(PATH_APP_ATLAS + image_id), image_id
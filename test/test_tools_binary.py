@@ -0,0 +1,91 @@
+"""
+Test module of tools_binary
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools import (
+    load_json_file,
+    save_json_file
+)
+from tools.tools_binary import (
+    BinaryCollection,
+    save_binary_collection,
+    convert_json_to_binary,
+    convert_binary_to_json
+)
+
+
+#############
+### Tests ###
+#############
+
+
+DICT_COLLECTION = {
+    "tram": [
+        {"source": "1.jpg", "side": "left", "category": "gold",
+         "default": True, "plus_plus": False},
+        {"source": "2.jpg", "side": "right", "category": "bronze",
+         "default": False, "plus_plus": True}
+    ],
+    "empty": [],
+    "tramway é": [
+        {"source": "3.jpg", "side": None, "category": None,
+         "default": True, "plus_plus": False}
+    ]
+}
+
+
+def test_binary_collection():
+    with tempfile.TemporaryDirectory() as folder_path:
+        binary_path = os.path.join(folder_path, "collection.bin")
+        save_binary_collection(binary_path, DICT_COLLECTION)
+
+        with BinaryCollection(binary_path) as binary_collection:
+            assert binary_collection.number_galleries == 3
+            assert binary_collection.number_images == 3
+
+            # The galleries are decoded on demand
+            assert binary_collection.get_gallery_name(2) == "tramway é"
+            assert binary_collection.read_gallery(2) == DICT_COLLECTION["tramway é"]
+            assert binary_collection.read_gallery(1) == []
+            assert binary_collection.load_collection() == DICT_COLLECTION
+            assert list(binary_collection.load_collection()) == list(DICT_COLLECTION)
+
+
+def test_binary_converters():
+    with tempfile.TemporaryDirectory() as folder_path:
+        json_path = os.path.join(folder_path, "collection.json")
+        binary_path = os.path.join(folder_path, "collection.bin")
+        save_json_file(json_path, DICT_COLLECTION)
+        convert_json_to_binary(json_path, binary_path)
+        os.remove(json_path)
+        convert_binary_to_json(binary_path, json_path)
+        assert load_json_file(json_path) == DICT_COLLECTION
+
+
+def test_binary_invalid_file():
+    with tempfile.TemporaryDirectory() as folder_path:
+        file_path = os.path.join(folder_path, "collection.bin")
+        with open(file_path, "wb") as file:
+            file.write(b"{\"tram\": []}" * 10)
+        binary_collection = BinaryCollection(file_path)
+        try:
+            binary_collection.open()
+            assert False
+        except ValueError:
+            assert binary_collection.buffer is None
@@ -10,20 +10,35 @@ Test module of tools_collection
 
 ### Python imports ###
 
+import os
 import sys
+import random
+import shutil
+import tempfile
 
 sys.path.append(".")
 
 ### Module imports ###
 
 from tools.tools import (
-    PATH_APP_IMAGES,
-    EMPTY_IMAGE_SOURCE
+    PATH_APP_ATLAS,
+    PATH_TRAMWAY_IMAGES,
+    EMPTY_IMAGE_SOURCE,
+    LIST_CATEGORIES
 )
+import tools.tools_collection
 from tools.tools_collection import (
     TramwayImage,
     Gallery,
-    Collection
+    Collection,
+    CollectionChanges,
+    migrate_image_names,
+    finish_image_migration
+)
+from tools.tools_image import (
+    IMAGE_EXT,
+    get_image_hash,
+    get_image_path
 )
 
 
@@ -63,13 +78,10 @@ def test_collection():
         plus_plus=False
     )
 
-    assert my_tramway_left_1.get_default_badge() == PATH_APP_IMAGES + "default.png"
-    assert my_tramway_left_2.get_default_badge() == PATH_APP_IMAGES + \
-        "default_off.png"
-    assert my_tramway_left_1.get_plus_plus_badge() == PATH_APP_IMAGES + \
-        "plus_plus.png"
-    assert my_tramway_left_2.get_plus_plus_badge() == PATH_APP_IMAGES + \
-        "plus_plus_off.png"
+    assert my_tramway_left_1.get_default_badge() == PATH_APP_ATLAS + "default"
+    assert my_tramway_left_2.get_default_badge() == PATH_APP_ATLAS + "default_off"
+    assert my_tramway_left_1.get_plus_plus_badge() == PATH_APP_ATLAS + "plus_plus"
+    assert my_tramway_left_2.get_plus_plus_badge() == PATH_APP_ATLAS + "plus_plus_off"
 
     ### Test functions for the Gallery class ###
     my_gallery_1 = Gallery(
@@ -176,3 +188,223 @@ def test_collection():
         "silver": [0, 0],
         "bronze": [0, 1]
     }
+
+
+def test_tramway_image_slots():
+    stored_image = TramwayImage(
+        source=PATH_TRAMWAY_IMAGES + "1.jpg", side="left", category="gold")
+    named_image = TramwayImage(
+        image_name="1.jpg", side="right", category="bronze", default=False, plus_plus=True)
+    empty_image = TramwayImage()
+
+    # The source is rebuilt from the name of the image
+    assert stored_image.source == named_image.source == PATH_TRAMWAY_IMAGES + "1./jp/1.jpg"
+    assert stored_image.image_name is named_image.image_name
+    stored_image.source = named_image.source
+    assert stored_image.image_name == "1.jpg"
+    assert empty_image.source == EMPTY_IMAGE_SOURCE
+    assert empty_image.side is None and empty_image.category is None
+
+    # The flags are independent
+    assert (named_image.default, named_image.plus_plus) == (False, True)
+    named_image.default = True
+    named_image.plus_plus = False
+    assert (named_image.default, named_image.plus_plus) == (True, False)
+    assert not hasattr(named_image, "__dict__")
+
+
+def test_image_references():
+    image_1 = TramwayImage(image_name="1.jpg", side="left", category="gold")
+    image_2 = TramwayImage(image_name="1.jpg", side="right", category="gold")
+    gallery_1 = Gallery(name="tram_1", list_images=[image_1, TramwayImage()])
+    gallery_2 = Gallery(name="tram_2", list_images=[])
+    my_collection = Collection(list_galleries=[gallery_1])
+    my_collection.add_gallery(gallery_2)
+    assert my_collection.dict_image_references == {"1.jpg": 1}
+
+    # The same file is referenced by two images
+    gallery_2.add_image(image_2)
+    assert my_collection.get_number_references("1.jpg") == 2
+    my_collection.delete_gallery(gallery_1)
+    assert my_collection.get_number_references("1.jpg") == 1
+    gallery_2.delete_image(image_2)
+    assert my_collection.get_number_references("1.jpg") == 0
+    assert my_collection.dict_image_references == {}
+
+
+def test_collection_index():
+    gallery_1 = Gallery(name="tram_1", list_images=[])
+    gallery_2 = Gallery(name="tram_2", list_images=[])
+    my_collection = Collection(list_galleries=[gallery_1])
+    my_collection.add_gallery(gallery_2)
+
+    # Duplicate names are refused
+    try:
+        my_collection.add_gallery(Gallery(name="tram_1", list_images=[]))
+        assert False
+    except ValueError:
+        assert True
+    try:
+        my_collection.change_name_gallery(gallery_2, "tram_1")
+        assert False
+    except ValueError:
+        assert True
+
+    # The index follows the renames and the deletions
+    my_collection.change_name_gallery(gallery_1, "tram_3")
+    assert my_collection.get_gallery("tram_3") == gallery_1
+    my_collection.add_gallery(Gallery(name="tram_1", list_images=[]))
+    my_collection.delete_gallery(gallery_2)
+    assert [gallery.name for gallery in my_collection.list_galleries] == [
+        "tram_3", "tram_1"]
+    assert set(my_collection.dict_galleries.keys()) == {"tram_3", "tram_1"}
+
+
+def test_gallery_indexes():
+    list_images = [
+        TramwayImage(side="left", category="bronze", default=True),
+        TramwayImage(side="left", category="silver", default=False),
+        TramwayImage(side="right", category="silver", default=True),
+        TramwayImage(side="right", category="gold", default=False)
+    ]
+    gallery = Gallery(name="tram", list_images=list_images)
+
+    def check_indexes():
+        for side in ["left", "right"]:
+            list_side_images = [
+                image for image in gallery.list_images if image.side == side]
+            assert gallery.get_list_side_images(side) == list_side_images
+            assert gallery.get_sorted_side_images(side) == sorted(
+                list_side_images, key=lambda image: LIST_CATEGORIES.index(image.category))
+            list_default_images = [
+                image for image in list_side_images if image.default]
+            if list_default_images:
+                assert gallery.get_default_image(side) == list_default_images[0]
+            else:
+                assert gallery.get_default_image(side).source == EMPTY_IMAGE_SOURCE
+            for category in ["gold", "silver", "bronze"]:
+                if any(image.category == category for image in list_side_images):
+                    assert gallery.get_best_category(side)[0] == category
+                    break
+
+    check_indexes()
+    assert gallery.get_best_category() == ("gold", [list_images[3]])
+    assert gallery.get_best_category("left") == ("silver", [list_images[1]])
+
+    # The indexes follow the modifications of the attributes
+    list_images[3].category = "bronze"
+    list_images[0].default = False
+    check_indexes()
+    assert gallery.get_best_category()[0] == "silver"
+    list_images[1].side = "right"
+    check_indexes()
+    gallery.update_default_image(list_images[1])
+    check_indexes()
+    assert list_images[2].default == False
+    gallery.delete_image(list_images[1])
+    check_indexes()
+    gallery.add_image(TramwayImage(side="left", category="gold", default=False))
+    check_indexes()
+    assert gallery.get_best_category("left")[0] == "gold"
+
+
+def test_collection_versions():
+    image_1 = TramwayImage(side="left", category="gold")
+    image_2 = TramwayImage(side="right", category="silver", default=False)
+    gallery_1 = Gallery(name="tram_1", list_images=[image_1])
+    gallery_2 = Gallery(name="tram_2", list_images=[image_2])
+    my_collection = Collection(list_galleries=[gallery_1, gallery_2])
+    collection_changes = CollectionChanges(
+        collection=my_collection, list_structural_operations=["add_gallery", "delete_gallery"])
+    collection_changes.set_displayed()
+    assert collection_changes.check_is_displayed()
+
+    # The modification of an image increases the versions of its gallery and its collection
+    list_versions = [image_1.version, gallery_1.version, my_collection.version]
+    version_2 = image_2.version
+    image_1.plus_plus = True
+    assert all(version > old_version for version, old_version in zip(
+        [image_1.version, gallery_1.version, my_collection.version], list_versions))
+    assert image_2.version == version_2 and gallery_2.version == 0
+
+    # The modifications which are not notified require to rebuild the display
+    assert not collection_changes.check_is_displayed()
+    assert not collection_changes.check_can_update()
+
+    # The notified modifications only update their galleries
+    gallery_1.edit_image(image_1, side="left", category="silver", plus_plus=True)
+    assert collection_changes.check_can_update()
+    assert collection_changes.set_changed_galleries == {gallery_1}
+    collection_changes.set_displayed()
+    my_collection.change_name_gallery(gallery_2, "tram_3")
+    assert collection_changes.check_can_update()
+    assert collection_changes.set_changed_galleries == {gallery_2}
+
+    # The structural operations require to rebuild the display
+    my_collection.delete_gallery(gallery_2)
+    assert not collection_changes.check_can_update()
+    assert collection_changes.check_can_update(gallery_1)
+    collection_changes.set_displayed()
+    my_collection.set_galleries([Gallery(name="tram_4", list_images=[])])
+    assert not collection_changes.check_can_update()
+
+
+def test_collection_statistics():
+    random.seed(0)
+    my_collection = Collection(list_galleries=[
+        Gallery(name="tram_0", list_images=[
+            TramwayImage(side="left", category="silver")])
+    ])
+    assert my_collection.check_statistics()
+
+    for counter in range(300):
+        operation = random.choice(
+            ["add_gallery", "delete_gallery", "add_image", "delete_image", "edit_image"])
+        if operation == "add_gallery" or not my_collection.list_galleries:
+            my_collection.add_gallery(Gallery(
+                name="tram_" + str(counter + 1), list_images=[]))
+            continue
+        gallery: Gallery = random.choice(my_collection.list_galleries)
+        if operation == "delete_gallery":
+            my_collection.delete_gallery(gallery)
+        elif operation == "add_image" or gallery.check_is_empty():
+            gallery.add_image(TramwayImage(
+                side=random.choice(["left", "right"]),
+                category=random.choice(["gold", "silver", "bronze"])))
+        elif operation == "delete_image":
+            gallery.delete_image(random.choice(gallery.list_images))
+        else:
+            gallery.edit_image(
+                random.choice(gallery.list_images),
+                side=random.choice(["left", "right"]),
+                category=random.choice(["gold", "silver", "bronze"]),
+                plus_plus=False)
+        assert my_collection.check_statistics()
+
+
+def test_migrate_image_names(monkeypatch):
+    with tempfile.TemporaryDirectory() as folder_path:
+        layout_path = os.path.join(folder_path, "layout.json")
+        monkeypatch.setattr(tools.tools_collection, "PATH_IMAGE_LAYOUT", layout_path)
+        image_path = "./test/test_data/test_image.jpg"
+        image_hash = get_image_hash(image_path)
+        shutil.copy(image_path, PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+        tramway_image = TramwayImage(side="left", category="gold", image_name="123" + IMAGE_EXT)
+        list_galleries = [Gallery(name="tram_1", list_images=[tramway_image])]
+
+        # The image is renamed before its file is moved
+        assert migrate_image_names(list_galleries)
+        assert tramway_image.image_name == image_hash + IMAGE_EXT
+        assert os.path.exists(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+
+        # The file is moved once and the images are not checked anymore
+        finish_image_migration()
+        assert os.path.exists(get_image_path(image_hash + IMAGE_EXT))
+        assert os.path.exists(layout_path)
+        tramway_image.image_name = "123" + IMAGE_EXT
+        shutil.copy(image_path, PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+        assert not migrate_image_names(list_galleries)
+        finish_image_migration()
+        assert os.path.exists(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+        os.remove(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+        os.remove(get_image_path(image_hash + IMAGE_EXT))
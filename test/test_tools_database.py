@@ -0,0 +1,133 @@
+"""
+Test module of tools_database
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools_collection import (
+    TramwayImage,
+    Gallery,
+    get_dict_image
+)
+from tools.tools_database import CollectionDatabase
+
+
+#############
+### Tests ###
+#############
+
+
+dict_collection = {
+    "tram_1": [
+        {"source": "1.jpg", "side": "left", "category": "gold",
+            "default": True, "plus_plus": False},
+        {"source": "2.jpg", "side": "right", "category": "bronze",
+            "default": True, "plus_plus": True}
+    ],
+    "tram_2": [
+        {"source": "3.jpg", "side": "left", "category": "silver",
+            "default": True, "plus_plus": False}
+    ]
+}
+
+
+def create_galleries(dict_collection: dict):
+    list_galleries = []
+    for gallery_name in dict_collection:
+        list_images = [TramwayImage(**dict_image)
+                       for dict_image in dict_collection[gallery_name]]
+        list_galleries.append(Gallery(name=gallery_name, list_images=list_images))
+    return list_galleries
+
+
+def test_collection_database():
+    with tempfile.TemporaryDirectory() as folder_path:
+        database = CollectionDatabase(os.path.join(folder_path, "test.db"))
+        assert database.connect()
+
+        ### Migration from the json structure ###
+        database.migrate_json_collection(dict_collection)
+        assert database.load_collection() == dict_collection
+        database.close()
+
+        ### Load in a new connection ###
+        assert not database.connect()
+        list_galleries = create_galleries(database.load_collection())
+        database.register_galleries(list_galleries, get_dict_image)
+        assert database.save_galleries(list_galleries, get_dict_image) == 0
+
+        ### Only the modified rows are written ###
+        list_galleries[0].list_images[1].plus_plus = False
+        assert database.save_galleries(list_galleries, get_dict_image) == 1
+
+        list_galleries[1].name = "tram_3"
+        assert database.save_galleries(list_galleries, get_dict_image) == 1
+
+        list_galleries[0].delete_image(list_galleries[0].list_images[0])
+        database.save_galleries(list_galleries, get_dict_image)
+        del list_galleries[1]
+        list_galleries.append(Gallery(name="tram_4", list_images=[
+            TramwayImage(source="4.jpg", side="right", category="gold")]))
+        database.save_galleries(list_galleries, get_dict_image)
+        database.close()
+
+        ### The database contains the final collection ###
+        database.connect()
+        assert database.load_collection() == {
+            "tram_1": [
+                {"source": "2.jpg", "side": "right", "category": "bronze",
+                    "default": True, "plus_plus": False}
+            ],
+            "tram_4": [
+                {"source": "4.jpg", "side": "right", "category": "gold",
+                    "default": True, "plus_plus": False}
+            ]
+        }
+        database.close()
+
+
+def test_save_dirty_galleries():
+    with tempfile.TemporaryDirectory() as folder_path:
+        database = CollectionDatabase(os.path.join(folder_path, "test.db"))
+        database.connect()
+        database.migrate_json_collection(dict_collection)
+        list_galleries = create_galleries(database.load_collection())
+        database.register_galleries(list_galleries, get_dict_image)
+
+        ### Only the galleries marked as dirty are saved ###
+        list_galleries[0].list_images[0].plus_plus = True
+        list_galleries[1].list_images[0].plus_plus = True
+        database.mark_gallery_dirty(list_galleries[1])
+        assert database.save_dirty_galleries(get_dict_image) == 1
+        assert database.save_dirty_galleries(get_dict_image) == 0
+
+        ### The deleted galleries are removed with their images ###
+        database.delete_gallery(list_galleries[1])
+        new_gallery = Gallery(name="tram_3", list_images=[
+            TramwayImage(source="4.jpg", side="right", category="gold")])
+        database.mark_gallery_dirty(new_gallery)
+        database.save_dirty_galleries(get_dict_image)
+        database.close()
+        database.connect()
+        assert database.load_collection() == {
+            "tram_1": dict_collection["tram_1"],
+            "tram_3": [
+                {"source": "4.jpg", "side": "right", "category": "gold",
+                    "default": True, "plus_plus": False}
+            ]
+        }
+        database.close()
@@ -0,0 +1,127 @@
+"""
+Test module of tools_duplicates
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import json
+import sys
+import random
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+from PIL import ImageEnhance
+
+from tools.tools_image import (
+    open_image,
+    crop_image_to_square
+)
+from tools.tools_duplicates import (
+    SIMILARITY_RADIUS,
+    HASH_INDEX_VERSION,
+    MultiIndexHashTable,
+    ImageHashIndex,
+    compute_image_hash,
+    get_hash_distance
+)
+
+
+#############
+### Tests ###
+#############
+
+
+image_path = "./test/test_data/test_image.jpg"
+
+
+def test_compute_image_hash():
+    image = crop_image_to_square(open_image(image_path))
+    image_hash = compute_image_hash(image)
+    assert 0 < image_hash < 2 ** 64
+
+    # The hash resists to a change of size and of brightness, not to a rotation
+    similar_image = ImageEnhance.Brightness(image.resize((200, 200))).enhance(1.2)
+    assert get_hash_distance(image_hash, compute_image_hash(similar_image)) <= SIMILARITY_RADIUS
+    assert get_hash_distance(image_hash, compute_image_hash(image.rotate(90))) > SIMILARITY_RADIUS
+
+
+def test_multi_index_hash_table():
+    random.seed(0)
+    list_hashes = [random.getrandbits(64) for _ in range(500)]
+    # Hashes close to the first one
+    list_hashes += [list_hashes[0] ^ (1 << bit) ^ (1 << (bit + 10)) for bit in range(20)]
+    table = MultiIndexHashTable()
+    for index, image_hash in enumerate(list_hashes):
+        table.add(image_hash, str(index))
+    table.add(list_hashes[0], "copy")
+    assert len(table.dict_names) == len(set(list_hashes))
+
+    # The search finds the same images as a comparison with every hash
+    for image_hash in list_hashes[:50]:
+        for radius in [0, 4, 12]:
+            list_expected = sorted(
+                (get_hash_distance(image_hash, other_hash), str(index))
+                for index, other_hash in enumerate(list_hashes)
+                if get_hash_distance(image_hash, other_hash) <= radius)
+            list_results = [result for result in table.search(image_hash, radius)
+                            if result[1] != "copy"]
+            assert list_results == list_expected
+    assert table.search(list_hashes[0], 0) == [(0, "0"), (0, "copy")]
+    assert MultiIndexHashTable().search(0, 10) == []
+
+
+def test_image_hash_index():
+    set_referenced_images = {"a.jpg", "b.jpg", "c.jpg"}
+    hash_a = 0xFFFF
+    hash_b = 0xFFFF << 48
+    hash_e = 0xFFFF << 24
+    with tempfile.TemporaryDirectory() as folder_path:
+        file_path = os.path.join(folder_path, "hashes.json")
+        index = ImageHashIndex(file_path, set_referenced_images.__contains__, delay=0)
+        index.add_images({"a.jpg": hash_a, "b.jpg": hash_b})
+        assert index.get_missing_images(["a.jpg", "b.jpg", "c.jpg"]) == ["c.jpg"]
+
+        # Only the images of the collection are found
+        index.add_image("d.jpg", hash_a ^ 0b1)
+        assert index.find_similar_images(hash_a ^ 0b11) == ["a.jpg"]
+        assert index.find_similar_images(hash_e, radius=1) == []
+
+        # The imported images are compared to the collection and to each other
+        assert index.split_similar_images(
+            ["c.jpg", "e.jpg", "f.jpg"],
+            {"c.jpg": hash_a ^ 0b1111, "e.jpg": hash_e, "f.jpg": hash_e ^ 0b1}) == \
+            (["e.jpg"], ["c.jpg", "f.jpg"])
+
+        # The hashes follow the renamed images
+        set_referenced_images.add("a.webp")
+        index.rename_images({"a.jpg": "a.webp"})
+        assert index.find_similar_images(hash_a, radius=0) == ["a.jpg", "a.webp"]
+
+        # The hashes of the images not used anymore are dropped at the next start
+        index.saver.flush()
+        set_referenced_images.remove("a.jpg")
+        index = ImageHashIndex(file_path, set_referenced_images.__contains__)
+        assert index.dict_hashes == {"a.webp": hash_a, "b.jpg": hash_b}
+
+        # The hashes of an imported collection replace the pending ones
+        index.add_image("c.jpg", hash_e)
+        set_referenced_images.update({"g.jpg"})
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump({"version": HASH_INDEX_VERSION, "hashes": {"g.jpg": "1f"}}, file)
+        index.find_similar_images(hash_a)
+        index.reload()
+        assert index.dict_hashes == {"g.jpg": 0x1f}
+        assert index.find_similar_images(0x1f, radius=0) == ["g.jpg"]
+        index.saver.flush()
+        with open(file_path, "r", encoding="utf-8") as file:
+            assert json.load(file)["hashes"] == {"g.jpg": "1f"}
@@ -0,0 +1,105 @@
+"""
+Test module of tools_gc
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools_gc import ImageGarbageCollector
+
+
+#############
+### Tests ###
+#############
+
+
+def create_image(folder_path, image_path, age=3600):
+    image_path = os.path.join(folder_path, image_path)
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    with open(image_path, "wb") as file:
+        file.write(b"image")
+    os.utime(image_path, (os.path.getmtime(image_path) - age,) * 2)
+    return image_path
+
+
+def test_image_garbage_collector():
+    with tempfile.TemporaryDirectory() as folder_path:
+        set_referenced_images = {"abcd.jpg", "ab00.jpg"}
+        create_image(folder_path, "ab/cd/abcd.jpg")
+        thumbnail_path = create_image(folder_path, "ab/cd/abcd_128.jpg")
+        create_image(folder_path, "ab/00/ab00.jpg")
+        unused_path = create_image(folder_path, "ab/cd/abce.jpg")
+        flat_path = create_image(folder_path, "123.jpg")
+        pending_path = create_image(folder_path, "ab/cd/abd0.jpg")
+        recent_path = create_image(folder_path, "ab/cd/abcf.jpg", age=0)
+        create_image(folder_path, "collection.json")
+        collector = ImageGarbageCollector(
+            folder_path=folder_path,
+            check_is_referenced=set_referenced_images.__contains__
+        )
+
+        # The pending images are kept whatever their age, until all their holders release them
+        collector.add_pending_images(["abd0.jpg", "abd0.jpg"])
+        collector.remove_pending_images(["abd0.jpg"])
+
+        # The dry run only reports the unused images
+        dict_report = collector.sweep(dry_run=True)
+        assert dict_report["number_images"] == 7
+        assert sorted(dict_report["list_unused_images"]) == ["123.jpg", "abce.jpg"]
+        assert dict_report["unused_size"] == 10
+        assert os.path.exists(unused_path) and os.path.exists(flat_path)
+
+        # The sweep is spread over one step per image and a last one ending it
+        collector.start()
+        number_steps = 1
+        while not collector.step(time_budget=0):
+            number_steps += 1
+        assert number_steps == 8
+        assert not os.path.exists(unused_path) and not os.path.exists(flat_path)
+        assert os.path.exists(thumbnail_path)
+        assert os.path.exists(recent_path) and os.path.exists(pending_path)
+        assert collector.step()
+
+        # The released images are deleted by the next sweep
+        collector.remove_pending_images(["abd0.jpg"])
+        assert collector.sweep()["list_unused_images"] == ["abd0.jpg"]
+        assert not os.path.exists(pending_path)
+
+
+def test_image_garbage_collector_deleted_folder():
+    with tempfile.TemporaryDirectory() as folder_path:
+        for image_name in ["abc0.jpg", "abc1.jpg", "abd0.jpg"]:
+            create_image(folder_path, os.path.join("ab", image_name[2:4], image_name))
+        collector = ImageGarbageCollector(
+            folder_path=folder_path,
+            check_is_referenced=lambda image_name: False
+        )
+
+        # The sweep ends without error when the folder is deleted meanwhile
+        collector.start()
+        assert not collector.step(time_budget=0)
+        shutil.rmtree(os.path.join(folder_path, "ab"))
+        while not collector.step(time_budget=0):
+            pass
+        assert collector.dict_report["number_images"] <= 2
+
+        # A stopped sweep is finished
+        create_image(folder_path, "ab/c0/abc0.jpg")
+        collector.start()
+        collector.stop()
+        assert collector.step()
+        assert os.path.exists(os.path.join(folder_path, "ab/c0/abc0.jpg"))
@@ -4,15 +4,36 @@
 
 import os
 import sys
+import shutil
+import tempfile
 
 sys.path.append(".")
 
 from tools.tools_image import (
     PATH_TEMP_IMAGE,
+    PATH_TRAMWAY_IMAGES,
+    IMAGE_EXT,
+    IMAGE_BASE_SIZE,
+    IMAGE_REDUCING_GAP,
     open_image,
+    open_image_reduced,
     crop_image_to_square,
     save_temp_image,
-    save_image
+    save_image,
+    get_image_hash,
+    check_is_hash_name,
+    prepare_square_image,
+    store_image,
+    get_migrated_image_name,
+    migrate_image_name,
+    migrate_flat_images,
+    get_image_path,
+    list_stored_images,
+    get_thumbnail_path,
+    get_original_image_name,
+    get_image_source,
+    request_thumbnails,
+    delete_stored_image
 )
 
 #############
@@ -40,6 +61,25 @@ def test_crop_image_to_square():
 
 test_crop_image_to_square()
 
+### Test open image reduced ###
+
+def test_open_image_reduced():
+    with tempfile.TemporaryDirectory() as folder_path:
+        large_image_path = os.path.join(folder_path, "large_image.jpg")
+        open_image(image_path).resize((4000, 3000)).save(large_image_path)
+
+        # The image is decoded at a quarter of its size
+        image = open_image_reduced(large_image_path)
+        assert image.size == (1000, 750)
+        image = crop_image_to_square(image, reducing_gap=IMAGE_REDUCING_GAP)
+        assert image.size == IMAGE_BASE_SIZE
+
+        # The small images are decoded at their full size
+        assert open_image_reduced(image_path).size == open_image(image_path).size
+
+
+test_open_image_reduced()
+
 ### Test save temp image ###
 
 def test_save_temp_image():
@@ -60,3 +100,97 @@ def test_save_image():
 
 
 test_save_image()
+
+### Test store image ###
+
+def test_store_image():
+    image = prepare_square_image(image_path)
+    assert image.size == IMAGE_BASE_SIZE and image.mode == "RGB"
+    image_file_name = store_image(image, PATH_TEMP_IMAGE)
+    image_name = image_file_name[:-len(IMAGE_EXT)]
+    assert check_is_hash_name(image_name)
+    assert not os.path.exists(PATH_TEMP_IMAGE)
+
+    # The same image is stored only once, with the age of a new file
+    stored_image_path = get_image_path(image_file_name)
+    os.utime(stored_image_path, (0, 0))
+    assert store_image(image, PATH_TEMP_IMAGE) == image_file_name
+    assert not os.path.exists(PATH_TEMP_IMAGE)
+    assert os.path.getmtime(stored_image_path) > 0
+    assert stored_image_path == PATH_TRAMWAY_IMAGES + image_name[:2] + "/" + \
+        image_name[2:4] + "/" + image_file_name
+    assert image_name == get_image_hash(stored_image_path)
+    assert image_file_name in list_stored_images()
+    assert os.path.exists(get_thumbnail_path(image_file_name, 128))
+    delete_stored_image(image_name)
+    assert not os.path.exists(get_thumbnail_path(image_file_name, 128))
+
+
+test_store_image()
+
+### Test migrate image name ###
+
+def test_migrate_image_name():
+    image_hash = get_image_hash(image_path)
+    shutil.copy(image_path, PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+    shutil.copy(image_path, PATH_TRAMWAY_IMAGES + "456" + IMAGE_EXT)
+
+    # The duplicates are merged into the same file, moved into its folders
+    assert migrate_image_name("123" + IMAGE_EXT) == image_hash + IMAGE_EXT
+    assert migrate_image_name("456" + IMAGE_EXT) == image_hash + IMAGE_EXT
+    assert migrate_image_name(image_hash + IMAGE_EXT) == image_hash + IMAGE_EXT
+    assert not os.path.exists(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+    assert not os.path.exists(PATH_TRAMWAY_IMAGES + "456" + IMAGE_EXT)
+    os.remove(get_image_path(image_hash + IMAGE_EXT))
+
+    # An image named after its hash is only moved
+    shutil.copy(image_path, PATH_TRAMWAY_IMAGES + image_hash + IMAGE_EXT)
+    assert migrate_image_name(image_hash + IMAGE_EXT) == image_hash + IMAGE_EXT
+    assert os.path.exists(get_image_path(image_hash + IMAGE_EXT))
+    os.remove(get_image_path(image_hash + IMAGE_EXT))
+
+
+test_migrate_image_name()
+
+def test_migrate_flat_images():
+    image_hash = get_image_hash(image_path)
+    shutil.copy(image_path, PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+
+    # The new name is known before the image is moved
+    assert get_migrated_image_name("123" + IMAGE_EXT) == image_hash + IMAGE_EXT
+    assert os.path.exists(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+
+    # All the images of the flat layout are moved, whatever the collection
+    assert migrate_flat_images() >= 1
+    assert not os.path.exists(PATH_TRAMWAY_IMAGES + "123" + IMAGE_EXT)
+    assert os.path.exists(get_image_path(image_hash + IMAGE_EXT))
+    assert get_migrated_image_name("123" + IMAGE_EXT) == "123" + IMAGE_EXT
+    os.remove(get_image_path(image_hash + IMAGE_EXT))
+
+
+test_migrate_flat_images()
+
+### Test get image source ###
+
+def test_get_image_source():
+    image_hash = get_image_hash(image_path)
+    image_file_name = image_hash + IMAGE_EXT
+    os.makedirs(os.path.dirname(get_image_path(image_file_name)), exist_ok=True)
+    shutil.copy(image_path, get_image_path(image_file_name))
+
+    # The full image is displayed while the variants are created in the background
+    assert get_image_source(image_file_name) == get_image_path(image_file_name)
+    assert get_image_source(image_file_name, 200) == get_image_path(image_file_name)
+    request_thumbnails(image_file_name).result()
+
+    # The smallest variant covering the size is then displayed
+    assert get_image_source(image_file_name, 200) == get_thumbnail_path(image_file_name, 256)
+    assert open_image(get_thumbnail_path(image_file_name, 256)).size == (256, 256)
+    assert get_image_source(image_file_name, 100) == get_thumbnail_path(image_file_name, 128)
+    assert get_image_source(image_file_name, 300) == get_image_path(image_file_name)
+    assert get_original_image_name(image_hash + "_128" + IMAGE_EXT) == image_file_name
+    assert get_original_image_name(image_file_name) == image_file_name
+    delete_stored_image(image_hash)
+
+
+test_get_image_source()
@@ -0,0 +1,139 @@
+"""
+Test module of tools_import
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import multiprocessing
+import os
+import sys
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(".")
+
+### Module imports ###
+
+import tools.tools_collection
+from tools.tools import SETTINGS
+from tools.tools_collection import (
+    Gallery,
+    Collection,
+    add_imported_images,
+    record_shard_operation
+)
+from tools.tools_image import (
+    IMAGE_EXT,
+    IMAGE_BASE_SIZE,
+    open_image,
+    get_image_path,
+    get_thumbnail_path,
+    delete_stored_image
+)
+from tools.tools_shards import ShardedCollection
+from tools.tools_import import (
+    BulkImport,
+    create_executor,
+    list_image_files,
+    import_images
+)
+
+
+#############
+### Tests ###
+#############
+
+
+image_path = "./test/test_data/test_image.jpg"
+
+
+def create_import_folder(folder_path):
+    shutil.copy(image_path, os.path.join(folder_path, "b.JPG"))
+    shutil.copy(image_path, os.path.join(folder_path, "a.jpg"))
+    open_image(image_path).rotate(90).save(os.path.join(folder_path, "c.png"))
+    with open(os.path.join(folder_path, "d.jpg"), "wb") as file:
+        file.write(b"not an image")
+    with open(os.path.join(folder_path, "notes.txt"), "w") as file:
+        file.write("notes")
+    os.mkdir(os.path.join(folder_path, "folder"))
+
+
+def test_list_image_files():
+    with tempfile.TemporaryDirectory() as folder_path:
+        create_import_folder(folder_path)
+        # The photos selected twice are listed once
+        assert list_image_files([folder_path, os.path.join(folder_path, "a.jpg")]) == [
+            os.path.join(folder_path, file_name) for file_name in ["a.jpg", "b.JPG", "c.png", "d.jpg"]]
+
+
+def test_import_images(monkeypatch):
+    with tempfile.TemporaryDirectory() as folder_path:
+        create_import_folder(folder_path)
+        list_progress = []
+        list_image_names, list_failed_paths = import_images(
+            [folder_path],
+            progress_callback=lambda number_done, number_images: list_progress.append(
+                (number_done, number_images)),
+            max_workers=2
+        )
+        assert list_failed_paths == [os.path.join(folder_path, "d.jpg")]
+        assert len(list_progress) == 4 and list_progress[-1] == (4, 4)
+
+        # The identical photos are stored once
+        assert len(list_image_names) == 3
+        assert list_image_names[0] == list_image_names[1] != list_image_names[2]
+        for image_name in list_image_names[1:]:
+            assert open_image(get_image_path(image_name)).size == IMAGE_BASE_SIZE
+            assert open_image(get_thumbnail_path(image_name, 128)).size == (128, 128)
+
+        # The staging slots are removed at the end of the import
+        assert not any(file_name.startswith("import_")
+                       for file_name in os.listdir(tools.tools_collection.PATH_TEMP_FOLDER))
+
+        # The images are added to the gallery with a single save
+        collection_shards = ShardedCollection(
+            folder_path=os.path.join(folder_path, "shards"),
+            manifest_path=os.path.join(folder_path, "manifest.json")
+        )
+        collection_shards.write_collection({})
+        collection = Collection(list_galleries=[])
+        collection.add_observer(record_shard_operation)
+        monkeypatch.setitem(SETTINGS, "collection_backend", "sharded")
+        monkeypatch.setattr(tools.tools_collection, "collection_shards", collection_shards)
+        monkeypatch.setattr(tools.tools_collection, "my_collection", collection)
+        gallery = Gallery(name="tram_1", list_images=[])
+        collection.add_gallery(gallery)
+        add_imported_images(gallery, list_image_names, side="left", category="gold")
+        assert len(gallery.list_images) == 3
+        assert gallery.get_default_image("left").image_name in list_image_names
+        assert collection.get_number_references(list_image_names[0]) == 2
+        assert not collection_shards.set_dirty_galleries
+        list_dict_images = collection_shards.load_collection()["tram_1"]
+        assert [dict_image["source"] for dict_image in list_dict_images] == list_image_names
+        for image_name in list_image_names[1:]:
+            delete_stored_image(image_name[:-len(IMAGE_EXT)])
+
+
+def test_bulk_import_empty():
+    with tempfile.TemporaryDirectory() as folder_path:
+        bulk_import = BulkImport([folder_path])
+        bulk_import.start()
+        assert bulk_import.poll()
+        assert bulk_import.list_image_names == [] and bulk_import.list_failed_paths == []
+        assert bulk_import.get_stored_image_names() == []
+
+
+def test_create_executor(monkeypatch):
+    monkeypatch.setattr(multiprocessing, "get_start_method", lambda: "spawn")
+    with create_executor(max_workers=1) as executor:
+        assert isinstance(executor, ThreadPoolExecutor)
+    monkeypatch.setattr(multiprocessing, "get_start_method", lambda: "fork")
+    with create_executor(max_workers=1) as executor:
+        assert isinstance(executor, ProcessPoolExecutor)
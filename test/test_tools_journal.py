@@ -0,0 +1,129 @@
+"""
+Test module of tools_journal
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+import tools.tools_collection
+from tools.tools import SETTINGS
+from tools.tools_collection import (
+    TramwayImage,
+    Gallery,
+    Collection,
+    get_dict_image,
+    record_journal_operation
+)
+from tools.tools_journal import (
+    CollectionJournal,
+    apply_record,
+    append_lines
+)
+
+
+#############
+### Tests ###
+#############
+
+
+def get_dict_collection(collection: Collection):
+    return {gallery.name: [get_dict_image(tramway_image) for tramway_image in gallery.list_images]
+            for gallery in collection.list_galleries}
+
+
+def create_journal(folder_path, compaction_threshold=1024):
+    snapshot_path = os.path.join(folder_path, "collection.json")
+    with open(snapshot_path, "w", encoding="utf-8") as file:
+        json.dump({}, file)
+    return CollectionJournal(
+        snapshot_path=snapshot_path,
+        journal_path=os.path.join(folder_path, "collection.journal"),
+        compaction_threshold=compaction_threshold
+    )
+
+
+def test_apply_record():
+    dict_collection = {"a": [], "b": []}
+    dict_collection = apply_record(dict_collection, {
+        "operation": "rename_gallery", "gallery": "a", "new_name": "c"})
+    assert list(dict_collection.keys()) == ["c", "b"]
+    dict_collection = apply_record(dict_collection, {
+        "operation": "delete_gallery", "gallery": "c"})
+    assert dict_collection == {"b": []}
+
+
+def test_journal_replay(monkeypatch):
+    with tempfile.TemporaryDirectory() as folder_path:
+        journal = create_journal(folder_path)
+        monkeypatch.setitem(SETTINGS, "collection_backend", "journal")
+        monkeypatch.setattr(tools.tools_collection, "collection_journal", journal)
+
+        # Modify the collection
+        collection = Collection(list_galleries=[])
+        collection.add_observer(record_journal_operation)
+        image_1 = TramwayImage(source="1.jpg", side="left", category="gold")
+        image_2 = TramwayImage(source="2.jpg", side="left",
+                               category="silver", default=False)
+        gallery = Gallery(name="tram", list_images=[image_1])
+        collection.add_gallery(gallery)
+        gallery.update_default_image(image_2)
+        gallery.add_image(image_2)
+        gallery.edit_image(image_1, side="right",
+                           category="bronze", plus_plus=True)
+        collection.change_name_gallery(gallery, "new_tram")
+        collection.add_gallery(Gallery(name="other", list_images=[
+            TramwayImage(source="3.jpg", side="left", category="gold")]))
+        gallery.delete_image(image_2)
+        assert journal.write_records() == 7
+
+        # The replay gives the same collection
+        assert journal.load_collection() == get_dict_collection(collection)
+
+        # The compaction folds the journal in the snapshot
+        journal.compact(get_dict_collection(collection), wait=True)
+        assert not os.path.exists(journal.journal_path)
+        assert not os.path.exists(journal.old_journal_path)
+        assert journal.load_collection() == get_dict_collection(collection)
+
+
+def test_journal_recovery():
+    with tempfile.TemporaryDirectory() as folder_path:
+        journal = create_journal(folder_path)
+        record = {"operation": "add_gallery", "gallery": "tram", "images": []}
+
+        # Crash before the end of the compaction: the old journal is replayed
+        append_lines(journal.old_journal_path, [json.dumps(record)])
+        append_lines(journal.journal_path, ["{\"operation\": \"delete_gal"])
+        assert journal.load_collection() == {"tram": []}
+        assert not os.path.exists(journal.old_journal_path)
+
+        # Crash after the snapshot has been replaced: nothing is replayed twice
+        dict_image = {"source": "1.jpg", "side": "left", "category": "gold",
+                      "default": True, "plus_plus": False}
+        content = json.dumps({"tram": [dict_image]})
+        with open(journal.snapshot_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        append_lines(journal.old_journal_path, [
+            json.dumps({"operation": "add_image",
+                       "gallery": "tram", "image": dict_image}),
+            json.dumps({"operation": "compacted", "gallery": None,
+                       "snapshot": hashlib.sha1(content.encode("utf-8")).hexdigest()})
+        ])
+        os.remove(journal.journal_path)
+        assert journal.load_collection() == {"tram": [dict_image]}
+        assert not os.path.exists(journal.old_journal_path)
@@ -0,0 +1,157 @@
+"""
+Test module of tools_reencode
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+import tools.tools_collection
+from tools.tools import SETTINGS
+from tools.tools_collection import (
+    TramwayImage,
+    Gallery,
+    Collection,
+    record_shard_operation,
+    rename_stored_images
+)
+from tools.tools_image import (
+    IMAGE_BASE_SIZE,
+    open_image,
+    crop_image_to_square,
+    store_image,
+    get_image_path,
+    get_thumbnail_path,
+    get_original_image_name
+)
+from tools.tools_reencode import (
+    ImageReencoder,
+    get_profile_options,
+    reencode_image,
+    reencode_images
+)
+from tools.tools_shards import ShardedCollection
+
+
+#############
+### Tests ###
+#############
+
+
+image_path = "./test/test_data/test_image.jpg"
+
+
+def store_test_images(folder_path):
+    image = crop_image_to_square(open_image(image_path))
+    return [store_image(image.rotate(angle), os.path.join(folder_path, str(angle) + ".jpg"))
+            for angle in [0, 90]]
+
+
+def delete_image_files(image_name):
+    for file_path in [get_image_path(image_name), get_thumbnail_path(image_name, 128),
+                      get_thumbnail_path(image_name, 256)]:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def test_get_profile_options():
+    assert get_profile_options("webp", quality=60)["quality"] == 60
+    assert get_profile_options("jpeg")["progressive"]
+    try:
+        get_profile_options("gif")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_image_reencoder(monkeypatch):
+    with tempfile.TemporaryDirectory() as folder_path:
+        list_image_names = store_test_images(folder_path)
+        manifest_path = os.path.join(folder_path, "reencoding.json")
+
+        # The first image is re-encoded, then the run is resumed with both
+        reencoder = ImageReencoder(manifest_path, profile="webp", max_workers=1)
+        dict_report = reencode_images(reencoder, list_image_names[:1])
+        assert dict_report["number_reencoded"] == 1
+        reencoder = ImageReencoder(manifest_path, profile="webp", max_workers=1)
+        list_progress = []
+        dict_report = reencode_images(
+            reencoder, list_image_names,
+            progress_callback=lambda number_done, number_images: list_progress.append(number_images))
+        assert set(list_progress) <= {1}
+        assert dict_report["number_images"] == 1
+        assert dict_report["number_reencoded"] == 2
+        assert dict_report["saved_size"] == dict_report["original_size"] - dict_report["new_size"] > 0
+
+        # The re-encoded images and their thumbnails are stored in the new format
+        dict_new_names = reencoder.dict_new_names
+        for image_name in list_image_names:
+            new_image_name = dict_new_names[image_name]
+            assert new_image_name.endswith(".webp")
+            assert open_image(get_image_path(new_image_name)).format == "WEBP"
+            assert open_image(get_image_path(new_image_name)).size == IMAGE_BASE_SIZE
+            assert open_image(get_thumbnail_path(new_image_name, 128)).size == (128, 128)
+            assert get_original_image_name(
+                os.path.basename(get_thumbnail_path(new_image_name, 128))) == new_image_name
+
+        # Another profile starts a new run
+        reencoder = ImageReencoder(manifest_path, profile="webp", quality=50, max_workers=1)
+        assert reencoder.start(list(dict_new_names.values())) == 2
+        reencoder.stop()
+        list_stopped_names = list(reencoder.dict_new_names.values())
+
+        # The collection refers to the re-encoded images
+        collection_shards = ShardedCollection(
+            folder_path=os.path.join(folder_path, "shards"),
+            manifest_path=os.path.join(folder_path, "manifest.json")
+        )
+        collection_shards.write_collection({})
+        collection = Collection(list_galleries=[])
+        collection.add_observer(record_shard_operation)
+        monkeypatch.setitem(SETTINGS, "collection_backend", "sharded")
+        monkeypatch.setattr(tools.tools_collection, "collection_shards", collection_shards)
+        monkeypatch.setattr(tools.tools_collection, "my_collection", collection)
+        gallery = Gallery(name="tram_1", list_images=[
+            TramwayImage(image_name=image_name, side="left", category="gold")
+            for image_name in list_image_names])
+        collection.add_gallery(gallery)
+        assert rename_stored_images(dict_new_names) == 2
+        assert [tramway_image.image_name for tramway_image in gallery.list_images] == \
+            [dict_new_names[image_name] for image_name in list_image_names]
+        assert not collection.check_is_referenced(list_image_names[0])
+        assert collection.check_is_referenced(dict_new_names[list_image_names[0]])
+        assert [dict_image["source"] for dict_image in collection_shards.load_collection()["tram_1"]] == \
+            [dict_new_names[image_name] for image_name in list_image_names]
+
+        for image_name in list_image_names + list(dict_new_names.values()) + list_stopped_names:
+            delete_image_files(image_name)
+
+
+def test_reencode_image_not_smaller():
+    with tempfile.TemporaryDirectory() as folder_path:
+        list_image_names = store_test_images(folder_path)
+        staging_path = os.path.join(folder_path, "staging.jpg")
+
+        # A re-encoding with a higher quality is not smaller and leaves no file
+        image_folder = os.path.dirname(get_image_path(list_image_names[0]))
+        list_files = sorted(os.listdir(image_folder))
+        image_name, original_size, new_size = reencode_image(
+            list_image_names[0], staging_path, {"quality": 100, "subsampling": 0})
+        assert image_name == list_image_names[0] and original_size == new_size
+        assert os.listdir(folder_path) == []
+        assert sorted(os.listdir(image_folder)) == list_files
+
+        for image_name in list_image_names:
+            delete_image_files(image_name)
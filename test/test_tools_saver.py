@@ -0,0 +1,113 @@
+"""
+Test module of tools_saver
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools import (
+    load_json_file,
+    save_json_file_atomic
+)
+from tools.tools_saver import WriteBehindSaver
+
+
+#############
+### Tests ###
+#############
+
+
+def test_write_behind_saver():
+    list_callbacks = []
+    list_saved_values = []
+    list_values = []
+    saver = WriteBehindSaver(
+        save_function=lambda: list_saved_values.append(list(list_values)),
+        delay=0.2,
+        schedule=lambda callback, delay: list_callbacks.append(callback)
+    )
+
+    # The modifications made during the window are grouped
+    for value in range(10):
+        list_values.append(value)
+        saver.mark_dirty()
+    assert len(list_callbacks) == 1 and saver.number_saves == 0
+    list_callbacks.pop()()
+    time.sleep(0.1)
+    assert list_saved_values == [list(range(10))]
+
+    # The flush saves immediately
+    list_values.append(10)
+    saver.mark_dirty()
+    saver.flush()
+    assert list_saved_values[-1] == list(range(11))
+    list_callbacks.pop()()
+    time.sleep(0.1)
+    assert saver.number_saves == 2
+
+    # The cancel forgets the modifications
+    saver.mark_dirty()
+    saver.cancel()
+    saver.flush()
+    list_callbacks.pop()()
+    time.sleep(0.1)
+    assert saver.number_saves == 2
+
+
+def test_write_behind_saver_snapshot():
+    list_callbacks = []
+    list_saved_values = []
+    list_snapshots = []
+    list_values = []
+
+    def take_snapshot():
+        list_snapshots.append(list(list_values))
+        return list_snapshots[-1]
+
+    saver = WriteBehindSaver(
+        save_function=list_saved_values.append,
+        delay=0.2,
+        snapshot_function=take_snapshot,
+        schedule=lambda callback, delay: list_callbacks.append(callback)
+    )
+
+    # A single snapshot is taken when the window closes
+    for value in range(10):
+        list_values.append(value)
+        saver.mark_dirty()
+    assert list_snapshots == []
+    list_callbacks.pop()()
+    list_values.append(10)
+    time.sleep(0.1)
+    assert list_snapshots == list_saved_values == [list(range(10))]
+
+    # The flush takes the snapshot of the current window
+    saver.mark_dirty()
+    list_values.append(11)
+    saver.flush()
+    assert list_saved_values[-1] == list(range(12))
+    list_callbacks.pop()()
+    time.sleep(0.1)
+    assert saver.number_saves == 2 and len(list_snapshots) == 2
+
+
+def test_save_json_file_atomic():
+    with tempfile.TemporaryDirectory() as folder_path:
+        file_path = os.path.join(folder_path, "test.json")
+        save_json_file_atomic(file_path, {"key": "value"})
+        assert load_json_file(file_path) == {"key": "value"}
+        assert os.listdir(folder_path) == ["test.json"]
@@ -0,0 +1,104 @@
+"""
+Test module of tools_shards
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import os
+import sys
+import tempfile
+
+sys.path.append(".")
+
+### Module imports ###
+
+import tools.tools_collection
+from tools.tools import SETTINGS
+from tools.tools_collection import (
+    TramwayImage,
+    Gallery,
+    Collection,
+    get_dict_image,
+    record_shard_operation
+)
+from tools.tools_shards import ShardedCollection
+
+
+#############
+### Tests ###
+#############
+
+
+def get_dict_collection(collection: Collection):
+    return {gallery.name: [get_dict_image(tramway_image) for tramway_image in gallery.list_images]
+            for gallery in collection.list_galleries}
+
+
+def create_sharded_collection(folder_path):
+    return ShardedCollection(
+        folder_path=os.path.join(folder_path, "shards"),
+        manifest_path=os.path.join(folder_path, "manifest.json")
+    )
+
+
+def test_sharded_collection():
+    with tempfile.TemporaryDirectory() as folder_path:
+        collection_shards = create_sharded_collection(folder_path)
+        dict_image = {"source": "1.jpg", "side": "left", "category": "gold",
+                      "default": True, "plus_plus": False}
+        dict_collection = {"tram_1": [dict_image], "tram_2": [], "tram_3": []}
+        collection_shards.write_collection(dict_collection)
+        assert create_sharded_collection(folder_path).load_collection() == dict_collection
+        assert len(os.listdir(collection_shards.folder_path)) == 3
+
+        # The renames and the deletions only rewrite the manifest
+        collection_shards.rename_gallery("tram_1", "tram_4")
+        collection_shards.delete_gallery("tram_2")
+        assert collection_shards.save(lambda gallery_name: None) == 0
+        assert create_sharded_collection(folder_path).load_collection() == {
+            "tram_4": [dict_image], "tram_3": []}
+        assert len(os.listdir(collection_shards.folder_path)) == 2
+
+        # A new migration replaces all the shards
+        collection_shards.write_collection({"tram_5": []})
+        assert create_sharded_collection(folder_path).load_collection() == {"tram_5": []}
+        assert len(os.listdir(collection_shards.folder_path)) == 1
+
+
+def test_sharded_collection_save(monkeypatch):
+    with tempfile.TemporaryDirectory() as folder_path:
+        collection_shards = create_sharded_collection(folder_path)
+        collection_shards.write_collection({})
+        monkeypatch.setitem(SETTINGS, "collection_backend", "sharded")
+        monkeypatch.setattr(tools.tools_collection, "collection_shards", collection_shards)
+
+        collection = Collection(list_galleries=[])
+        collection.add_observer(record_shard_operation)
+
+        def get_list_dict_images(gallery_name):
+            return [get_dict_image(tramway_image) for tramway_image
+                    in collection.get_gallery(gallery_name).list_images]
+
+        gallery_1 = Gallery(name="tram_1", list_images=[])
+        gallery_2 = Gallery(name="tram_2", list_images=[])
+        collection.add_gallery(gallery_1)
+        collection.add_gallery(gallery_2)
+        assert collection_shards.save(get_list_dict_images) == 2
+
+        # Only the shard of the modified gallery is written
+        gallery_2.add_image(TramwayImage(source="1.jpg", side="left", category="gold"))
+        collection.change_name_gallery(gallery_1, "tram_3")
+        assert collection_shards.save(get_list_dict_images) == 1
+        assert create_sharded_collection(folder_path).load_collection() == \
+            get_dict_collection(collection)
+
+        collection.delete_gallery(gallery_2)
+        assert collection_shards.save(get_list_dict_images) == 0
+        assert create_sharded_collection(folder_path).load_collection() == \
+            get_dict_collection(collection)
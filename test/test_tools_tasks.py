@@ -0,0 +1,60 @@
+"""
+Test module of tools_tasks
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import sys
+import threading
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools_tasks import BackgroundWorker
+
+
+#############
+### Tests ###
+#############
+
+
+def test_background_worker():
+    list_callbacks = []
+    list_results = []
+    list_errors = []
+    worker = BackgroundWorker(schedule=list_callbacks.append)
+
+    def run_callbacks():
+        worker.executor.submit(lambda: None).result()
+        for callback in list_callbacks:
+            callback(0)
+        list_callbacks.clear()
+
+    # The function runs in another thread and its result is given back by the schedule
+    worker.submit(threading.get_ident, on_done=list_results.append)
+    assert worker.check_is_busy()
+    run_callbacks()
+    assert list_results and list_results[0] != threading.get_ident()
+    assert not worker.check_is_busy()
+
+    # The errors are given to their own callback
+    worker.submit(int, "tramway", on_done=list_results.append, on_error=list_errors.append)
+    run_callbacks()
+    assert len(list_results) == 1 and isinstance(list_errors[0], ValueError)
+
+    # The results of the cancelled tasks are dropped
+    event = threading.Event()
+    worker.submit(event.wait, on_done=list_results.append)
+    worker.submit(int, "1", on_done=list_results.append)
+    worker.cancel()
+    assert not worker.check_is_busy()
+    event.set()
+    run_callbacks()
+    assert len(list_results) == 1
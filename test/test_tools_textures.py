@@ -0,0 +1,89 @@
+"""
+Test module of tools_textures
+"""
+
+
+###############
+### Imports ###
+###############
+
+
+### Python imports ###
+
+import sys
+
+sys.path.append(".")
+
+### Module imports ###
+
+from tools.tools_textures import (
+    TextureCache,
+    get_texture_size
+)
+
+
+#############
+### Tests ###
+#############
+
+
+class FakeTexture():
+    def __init__(self, size, colorfmt="rgb"):
+        self.size = size
+        self.colorfmt = colorfmt
+
+
+def test_get_texture_size():
+    assert get_texture_size(FakeTexture((256, 256))) == 256 * 256 * 3
+    assert get_texture_size(FakeTexture((128, 64), "rgba")) == 128 * 64 * 4
+
+
+def test_texture_cache():
+    list_loaded_sources = []
+
+    def load_function(source):
+        list_loaded_sources.append(source)
+        if source == "missing.jpg":
+            return None
+        return FakeTexture((10, 10))
+
+    # Three textures of 300 bytes fit in the budget
+    texture_cache = TextureCache(max_size=900, load_function=load_function)
+    for source in ["a.jpg", "b.jpg", "c.jpg"]:
+        texture_cache.get(source)
+    assert texture_cache.get("a.jpg") is texture_cache.get("a.jpg")
+    assert texture_cache.size == 900
+
+    # The least recently used texture is evicted first
+    texture_cache.get("d.jpg")
+    assert list(texture_cache.dict_textures) == ["c.jpg", "a.jpg", "d.jpg"]
+    assert texture_cache.get_stats() == {
+        "number_textures": 3,
+        "size": 900,
+        "max_size": 900,
+        "number_hits": 2,
+        "number_misses": 4,
+        "number_evictions": 1
+    }
+    texture_cache.get("b.jpg")
+    assert list_loaded_sources.count("b.jpg") == 2
+
+    # The images which cannot be loaded are not cached
+    assert texture_cache.get("missing.jpg") is None
+    assert "missing.jpg" not in texture_cache.dict_textures
+
+    # A texture larger than the budget is kept alone
+    texture_cache.load_function = lambda source: FakeTexture((20, 20))
+    texture_cache.get("large.jpg")
+    assert list(texture_cache.dict_textures) == ["large.jpg"]
+
+    # Eviction hooks
+    assert texture_cache.evict("large.jpg")
+    assert not texture_cache.evict("large.jpg")
+    texture_cache.load_function = load_function
+    for source in ["a.jpg", "b.jpg"]:
+        texture_cache.get(source)
+    assert texture_cache.trim(450) == 1
+    assert list(texture_cache.dict_textures) == ["b.jpg"]
+    assert texture_cache.clear() == 1
+    assert texture_cache.size == 0
@@ -8,9 +8,15 @@ Module tools of Tramway Collector
 
 
 import os
+import copy
 import json
 from kivy import platform
 
+from tools.tools_saver import (
+    SAVE_DELAY,
+    WriteBehindSaver
+)
+
 
 #################
 ### Constants ###
@@ -60,11 +66,23 @@ elif not MOBILE_MODE and not os.path.exists(PATH_SETTINGS):
 PATH_LANGUAGE = PATH_RESOURCES_FOLDER + "languages/"
 PATH_COLLECTION = PATH_DATA_APP_FOLDER + "collection/collection.json"
 PATH_TRAMWAY_IMAGES = PATH_DATA_APP_FOLDER + "collection/"
+PATH_COLLECTION_DATABASE = PATH_TRAMWAY_IMAGES + "collection.db"
+PATH_COLLECTION_JOURNAL = PATH_TRAMWAY_IMAGES + "collection.journal"
+PATH_COLLECTION_BINARY = PATH_TRAMWAY_IMAGES + "collection.bin"
+PATH_COLLECTION_MANIFEST = PATH_TRAMWAY_IMAGES + "manifest.json"
+PATH_COLLECTION_SHARDS = PATH_TRAMWAY_IMAGES + "shards/"
+PATH_REENCODING_MANIFEST = PATH_TRAMWAY_IMAGES + "reencoding.json"
+PATH_IMAGE_HASHES = PATH_TRAMWAY_IMAGES + "hashes.json"
+PATH_IMAGE_LAYOUT = PATH_TRAMWAY_IMAGES + "layout.json"
 PATH_APP_IMAGES = PATH_RESOURCES_FOLDER + "images_application/"
+PATH_ATLAS_FOLDER = PATH_RESOURCES_FOLDER + "atlas/"
+APP_ATLAS_NAME = "images_application"
+# The images of the application are read from their atlas, built from PATH_APP_IMAGES
+PATH_APP_ATLAS = "atlas://" + PATH_ATLAS_FOLDER + APP_ATLAS_NAME + "/"
 PATH_KIVY_FOLDER = PATH_RESOURCES_FOLDER + "kivy/"
-ADD_IMAGE_SOURCE = PATH_APP_IMAGES + "add_image.png"
-FRAME_IMAGE_SOURCE = PATH_APP_IMAGES + "frame_image.png"
-FRAME_DEFAULT_IMAGE_SOURCE = PATH_APP_IMAGES + "frame_default_image.png"
+ADD_IMAGE_SOURCE = PATH_APP_ATLAS + "add_image"
+FRAME_IMAGE_SOURCE = PATH_APP_ATLAS + "frame_image"
+FRAME_DEFAULT_IMAGE_SOURCE = PATH_APP_ATLAS + "frame_default_image"
 EMPTY_IMAGE_SOURCE = PATH_RESOURCES_FOLDER + "logo_1024.png"
 BLANK_IMAGE_SOURCE = ""
 
@@ -87,26 +105,40 @@ DICT_LANGUAGE_IMAGES_TUTORIAL = {
     "japanese": "english"
 }
 
+# Storage backends of the collection
+LIST_COLLECTION_BACKENDS = ["json", "sqlite", "journal", "binary", "sharded"]
+DEFAULT_COLLECTION_BACKEND = "json"
+
 # Extensions for the file chooser
 ALLOWED_PICTURES_EXTENSIONS = [".png", ".jpg", ".jpeg"]
 
 ### Global variables ###
 
+# Sides of the tramways and categories of the images, from the best to the worst
+LIST_SIDES = ["left", "right"]
+LIST_CATEGORIES = ["gold", "silver", "bronze"]
+
 DICT_CATEGORY_IMAGES = {
-    "gold": PATH_APP_IMAGES + "gold.png",
-    "silver": PATH_APP_IMAGES + "silver.png",
-    "bronze": PATH_APP_IMAGES + "bronze.png",
+    "gold": PATH_APP_ATLAS + "gold",
+    "silver": PATH_APP_ATLAS + "silver",
+    "bronze": PATH_APP_ATLAS + "bronze",
     "none": ADD_IMAGE_SOURCE
 }
 
+DICT_CATEGORY_OFF_IMAGES = {
+    "gold": PATH_APP_ATLAS + "gold_off",
+    "silver": PATH_APP_ATLAS + "silver_off",
+    "bronze": PATH_APP_ATLAS + "bronze_off"
+}
+
 DICT_BADGES_IMAGES = {
     "plus_plus": [
-        PATH_APP_IMAGES + "plus_plus.png",
-        PATH_APP_IMAGES + "plus_plus_off.png"
+        PATH_APP_ATLAS + "plus_plus",
+        PATH_APP_ATLAS + "plus_plus_off"
     ],
     "default": [
-        PATH_APP_IMAGES + "default.png",
-        PATH_APP_IMAGES + "default_off.png"
+        PATH_APP_ATLAS + "default",
+        PATH_APP_ATLAS + "default_off"
     ]
 }
 
@@ -229,6 +261,32 @@ def save_json_file(file_path: str, dict_to_save: dict) -> None:
         json.dump(dict_to_save, file)
 
 
+def save_json_file_atomic(file_path: str, dict_to_save: dict) -> None:
+    """
+    Save the content of the given dictionnary inside the specified json file.
+    The content is written in a temporary file which then replaces the json
+    file, so that a crash during the writing never leaves a truncated file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the json file.
+
+    dict_to_save : dict
+        Dictionnary to save
+
+    Returns
+    -------
+    None
+    """
+    temp_file_path = file_path + ".tmp"
+    with open(temp_file_path, "w", encoding="utf-8") as file:
+        json.dump(dict_to_save, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file_path, file_path)
+
+
 def detect_single_multiple_galleries(number):
     dict_language_statistics = my_language.dict_language["settings"]["statistics"]
     if number > 1:
@@ -236,10 +294,25 @@ def detect_single_multiple_galleries(number):
     return dict_language_statistics["gallery"]
 
 
-def check_if_name_exists(list_galleries, new_name):
-    for gallery in list_galleries:
-        if gallery.name == new_name:
-            raise ValueError()
+def check_if_name_exists(dict_galleries, new_name):
+    """
+    Check that no gallery already has the given name.
+
+    Parameters
+    ----------
+    dict_galleries : dict
+        Galleries indexed by their name.
+
+    new_name : str
+        Name to check.
+
+    Returns
+    -------
+    bool
+        True if the name is available, a ValueError is raised otherwise.
+    """
+    if new_name in dict_galleries:
+        raise ValueError()
     return True
 
 
@@ -314,9 +387,36 @@ def update_settings(key, value):
     None
     """
     SETTINGS[key] = value
-    save_json_file(PATH_SETTINGS, SETTINGS)
+    settings_saver.mark_dirty()
+
+
+def get_dict_settings() -> dict:
+    return copy.deepcopy(SETTINGS)
+
+
+def save_settings(dict_settings: dict):
+    """
+    Save the settings in their json file.
+    It is called by the saver of the settings in a background thread, with
+    the copy of the settings made in the main thread.
+
+    Parameters
+    ----------
+    dict_settings : dict
+        Copy of the settings
+
+    Returns
+    -------
+    None
+    """
+    save_json_file_atomic(PATH_SETTINGS, dict_settings)
 
 
 # Load the settings and the language
 SETTINGS = load_json_file(PATH_SETTINGS)
+settings_saver = WriteBehindSaver(
+    save_function=save_settings,
+    delay=SETTINGS.get("save_delay", SAVE_DELAY),
+    snapshot_function=get_dict_settings
+)
 my_language = Language(SETTINGS["language"])
@@ -0,0 +1,149 @@
+"""
+Module tools atlas of Tramway Collector
+
+It packs the images of the application, such as the badges and the frames
+of the images, into a single Kivy atlas, so that all of them are drawn from
+one texture. The atlas is built before packaging the application with:
+
+    python -m tools.tools_atlas
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import json
+import tempfile
+from typing import (
+    Dict,
+    List
+)
+
+from PIL import Image as PIL_Image
+
+from tools.tools import (
+    PATH_APP_IMAGES,
+    PATH_ATLAS_FOLDER,
+    APP_ATLAS_NAME
+)
+
+
+#################
+### Constants ###
+#################
+
+
+ATLAS_PREFIX = "atlas://"
+ATLAS_EXT = ".atlas"
+# Size of the texture of the atlas, containing all the images on a single page
+ATLAS_SIZE = (2048, 1024)
+# Size of the images in the atlas, with a padding of 2 pixels around them
+ATLAS_IMAGE_SIZE = 254
+# Images displayed at the size of the tiles of the collection
+DICT_ATLAS_IMAGE_SIZES = {
+    "add_image": 510,
+    "frame_image": 510,
+    "frame_default_image": 510
+}
+
+
+#################
+### Functions ###
+#################
+
+
+def build_atlas(source_folder=PATH_APP_IMAGES, atlas_folder=PATH_ATLAS_FOLDER,
+                atlas_name=APP_ATLAS_NAME) -> str:
+    """
+    Pack the images of the application into an atlas, reduced to the size
+    at which they are displayed.
+
+    Parameters
+    ----------
+    source_folder : str, optional (default is PATH_APP_IMAGES)
+        Folder of the images of the application.
+
+    atlas_folder : str, optional (default is PATH_ATLAS_FOLDER)
+        Folder of the atlas.
+
+    atlas_name : str, optional (default is APP_ATLAS_NAME)
+        Name of the atlas.
+
+    Returns
+    -------
+    str
+        Path of the atlas file.
+    """
+    # Imported here, to read the atlas without loading Kivy
+    from kivy.atlas import Atlas
+
+    os.makedirs(atlas_folder, exist_ok=True)
+    with tempfile.TemporaryDirectory() as temp_folder:
+        list_image_paths = []
+        for file_name in sorted(os.listdir(source_folder)):
+            image_id, ext = os.path.splitext(file_name)
+            if ext != ".png":
+                continue
+            image = PIL_Image.open(os.path.join(source_folder, file_name))
+            size = DICT_ATLAS_IMAGE_SIZES.get(image_id, ATLAS_IMAGE_SIZE)
+            if max(image.size) > size:
+                image = image.resize((size, size), resample=PIL_Image.LANCZOS)
+            image_path = os.path.join(temp_folder, file_name)
+            image.save(image_path)
+            list_image_paths.append(image_path)
+        atlas_path, _ = Atlas.create(
+            os.path.join(atlas_folder, atlas_name), list_image_paths, ATLAS_SIZE)
+    return atlas_path
+
+
+def load_atlas_regions(atlas_path: str) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Load the regions of each page of an atlas, without creating its textures.
+
+    Parameters
+    ----------
+    atlas_path : str
+        Path of the atlas file.
+
+    Returns
+    -------
+    Dict[str, Dict[str, List[int]]]
+        Position and size of each image, for each page of the atlas.
+    """
+    with open(atlas_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def check_atlas_source(source: str) -> bool:
+    """
+    Check that a source of the form atlas://<path of the atlas>/<image id>
+    refers to an image of an existing atlas.
+
+    Parameters
+    ----------
+    source : str
+        Source of an image.
+
+    Returns
+    -------
+    bool
+        Whether the image is in the atlas.
+    """
+    if not source.startswith(ATLAS_PREFIX):
+        return False
+    atlas_path, _, image_id = source[len(ATLAS_PREFIX):].rpartition("/")
+    if not os.path.exists(atlas_path + ATLAS_EXT):
+        return False
+    dict_pages = load_atlas_regions(atlas_path + ATLAS_EXT)
+    return any(image_id in dict_regions for dict_regions in dict_pages.values())
+
+
+###############
+### Process ###
+###############
+
+
+if __name__ == "__main__":
+    print(build_atlas())
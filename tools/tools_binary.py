@@ -0,0 +1,340 @@
+"""
+Module tools binary of Tramway Collector
+
+It stores the collection in a compact binary file, as an alternative to the
+json file for very large collections. The file is opened with mmap and the
+galleries are decoded on demand instead of parsing the whole file.
+
+Layout of the file, in little-endian:
+- header: magic, version, number of galleries, strings and images, and
+  offsets of the string table, the gallery table and the image records
+- string table: offsets of the strings followed by their utf-8 bytes,
+  containing the names of the galleries and of the images
+- gallery table: for each gallery, the index of its name, the index of its
+  first image and its number of images
+- image records: for each image, the index of its name, its side and
+  category codes and its flags
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import mmap
+import struct
+from typing import (
+    Dict,
+    List
+)
+
+from tools.tools import (
+    LIST_SIDES,
+    LIST_CATEGORIES,
+    load_json_file,
+    save_json_file
+)
+
+
+#################
+### Constants ###
+#################
+
+
+BINARY_MAGIC = b"TCOL"
+BINARY_VERSION = 1
+
+HEADER_STRUCT = struct.Struct("<4sHHIIIQQQ")
+STRING_OFFSET_STRUCT = struct.Struct("<I")
+GALLERY_STRUCT = struct.Struct("<III")
+IMAGE_STRUCT = struct.Struct("<IBBBx")
+
+# Codes of the sides and categories, 0 standing for None
+LIST_SIDE_NAMES = [None] + LIST_SIDES
+LIST_CATEGORY_NAMES = [None] + LIST_CATEGORIES
+DICT_SIDE_CODES = {side: code for code, side in enumerate(LIST_SIDE_NAMES)}
+DICT_CATEGORY_CODES = {
+    category: code for code, category in enumerate(LIST_CATEGORY_NAMES)}
+
+FLAG_DEFAULT = 1
+FLAG_PLUS_PLUS = 2
+
+
+#################
+### Functions ###
+#################
+
+
+def encode_binary_collection(dict_collection: Dict[str, List[dict]]) -> bytes:
+    """
+    Encode the collection in the binary format.
+
+    Parameters
+    ----------
+    dict_collection : Dict[str, List[dict]]
+        Collection with the same structure as in the json file.
+
+    Returns
+    -------
+    bytes
+        Content of the binary file.
+    """
+    list_strings = []
+    dict_string_indexes = {}
+
+    def get_string_index(string: str) -> int:
+        if string not in dict_string_indexes:
+            dict_string_indexes[string] = len(list_strings)
+            list_strings.append(string)
+        return dict_string_indexes[string]
+
+    gallery_table = bytearray()
+    image_records = bytearray()
+    number_images = 0
+    for gallery_name, list_dict_images in dict_collection.items():
+        gallery_table += GALLERY_STRUCT.pack(
+            get_string_index(gallery_name), number_images, len(list_dict_images))
+        for dict_image in list_dict_images:
+            flags = (FLAG_DEFAULT if dict_image["default"] else 0) | \
+                (FLAG_PLUS_PLUS if dict_image["plus_plus"] else 0)
+            image_records += IMAGE_STRUCT.pack(
+                get_string_index(dict_image["source"]),
+                DICT_SIDE_CODES[dict_image["side"]],
+                DICT_CATEGORY_CODES[dict_image["category"]],
+                flags)
+        number_images += len(list_dict_images)
+
+    # The last offset gives the end of the last string
+    list_encoded_strings = [string.encode("utf-8") for string in list_strings]
+    string_offsets = bytearray()
+    offset = 0
+    for encoded_string in list_encoded_strings:
+        string_offsets += STRING_OFFSET_STRUCT.pack(offset)
+        offset += len(encoded_string)
+    string_offsets += STRING_OFFSET_STRUCT.pack(offset)
+    string_table = bytes(string_offsets) + b"".join(list_encoded_strings)
+
+    string_table_offset = HEADER_STRUCT.size
+    gallery_table_offset = string_table_offset + len(string_table)
+    image_records_offset = gallery_table_offset + len(gallery_table)
+    header = HEADER_STRUCT.pack(
+        BINARY_MAGIC, BINARY_VERSION, 0,
+        len(dict_collection), len(list_strings), number_images,
+        string_table_offset, gallery_table_offset, image_records_offset)
+    return header + string_table + bytes(gallery_table) + bytes(image_records)
+
+
+def save_binary_collection(file_path: str, dict_collection: Dict[str, List[dict]]) -> None:
+    """
+    Save atomically the collection in a binary file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the binary file.
+
+    dict_collection : Dict[str, List[dict]]
+        Collection with the same structure as in the json file.
+
+    Returns
+    -------
+    None
+    """
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(encode_binary_collection(dict_collection))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, file_path)
+
+
+def convert_json_to_binary(json_path: str, binary_path: str) -> None:
+    save_binary_collection(binary_path, load_json_file(json_path))
+
+
+def convert_binary_to_json(binary_path: str, json_path: str) -> None:
+    with BinaryCollection(binary_path) as binary_collection:
+        save_json_file(json_path, binary_collection.load_collection())
+
+
+###############
+### Classes ###
+###############
+
+
+class BinaryCollection():
+    """
+    Class reading a collection stored in the binary format through mmap.
+
+    The strings are decoded once, when they are accessed for the first time.
+
+    ...
+
+    Attributes
+    ----------
+    file_path : str
+        path of the binary file
+    number_galleries : int
+        number of galleries of the collection
+    number_images : int
+        number of images of the collection
+
+    Methods
+    -------
+    open()
+        map the file and check its header
+    close()
+        unmap the file
+    get_string(index)
+        get a string of the string table
+    get_gallery_name(gallery_index)
+        get the name of a gallery
+    read_gallery(gallery_index)
+        decode the images of a gallery
+    load_collection()
+        decode all the galleries
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.file = None
+        self.buffer = None
+        self.number_galleries = 0
+        self.number_strings = 0
+        self.number_images = 0
+        self.string_table_offset = 0
+        self.gallery_table_offset = 0
+        self.image_records_offset = 0
+        self.list_strings = []
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self) -> None:
+        """
+        Map the binary file in memory and read its header.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the file is not a binary collection or its version is not supported.
+        """
+        self.close()
+        self.file = open(self.file_path, "rb")
+        try:
+            self.buffer = mmap.mmap(
+                self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self.buffer) < HEADER_STRUCT.size:
+                raise ValueError("The file is not a binary collection")
+            magic, version, _, self.number_galleries, self.number_strings, \
+                self.number_images, self.string_table_offset, \
+                self.gallery_table_offset, self.image_records_offset = \
+                HEADER_STRUCT.unpack_from(self.buffer, 0)
+            if magic != BINARY_MAGIC:
+                raise ValueError("The file is not a binary collection")
+            if version != BINARY_VERSION:
+                raise ValueError(
+                    f"The version {version} of the binary collection is not supported")
+        except (ValueError, OSError):
+            self.close()
+            raise
+        self.list_strings = [None] * self.number_strings
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.list_strings = []
+
+    def get_string(self, index: int) -> str:
+        string = self.list_strings[index]
+        if string is None:
+            start, end = struct.unpack_from(
+                "<II", self.buffer,
+                self.string_table_offset + index * STRING_OFFSET_STRUCT.size)
+            strings_offset = self.string_table_offset + \
+                (self.number_strings + 1) * STRING_OFFSET_STRUCT.size
+            string = str(self.buffer[strings_offset + start:strings_offset + end],
+                         "utf-8")
+            self.list_strings[index] = string
+        return string
+
+    def read_gallery_entry(self, gallery_index: int) -> tuple:
+        if not 0 <= gallery_index < self.number_galleries:
+            raise IndexError("Gallery index out of range")
+        return GALLERY_STRUCT.unpack_from(
+            self.buffer, self.gallery_table_offset + gallery_index * GALLERY_STRUCT.size)
+
+    def get_gallery_name(self, gallery_index: int) -> str:
+        name_index, _, _ = self.read_gallery_entry(gallery_index)
+        return self.get_string(name_index)
+
+    def read_gallery(self, gallery_index: int) -> List[dict]:
+        """
+        Decode the images of a gallery, without reading the other galleries.
+
+        Parameters
+        ----------
+        gallery_index : int
+            Index of the gallery in the collection.
+
+        Returns
+        -------
+        List[dict]
+            Images of the gallery, with the same structure as in the json file.
+        """
+        _, first_image, number_images = self.read_gallery_entry(gallery_index)
+        start = self.image_records_offset + first_image * IMAGE_STRUCT.size
+        get_string = self.get_string
+        return [{
+            "source": get_string(name_index),
+            "side": LIST_SIDE_NAMES[side],
+            "category": LIST_CATEGORY_NAMES[category],
+            "default": bool(flags & FLAG_DEFAULT),
+            "plus_plus": bool(flags & FLAG_PLUS_PLUS)
+        } for name_index, side, category, flags in IMAGE_STRUCT.iter_unpack(
+            self.buffer[start:start + number_images * IMAGE_STRUCT.size])]
+
+    def load_collection(self) -> Dict[str, List[dict]]:
+        """
+        Decode all the galleries of the collection.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Dict[str, List[dict]]
+            Collection with the same structure as in the json file.
+        """
+        self.decode_strings()
+        return {self.get_gallery_name(gallery_index): self.read_gallery(gallery_index)
+                for gallery_index in range(self.number_galleries)}
+
+    def decode_strings(self) -> None:
+        # Decode all the strings in a single pass, faster than one by one
+        list_offsets = struct.unpack_from(
+            f"<{self.number_strings + 1}I", self.buffer, self.string_table_offset)
+        strings_offset = self.string_table_offset + \
+            (self.number_strings + 1) * STRING_OFFSET_STRUCT.size
+        strings_bytes = self.buffer[strings_offset:strings_offset + list_offsets[-1]]
+        self.list_strings = [
+            str(strings_bytes[start:end], "utf-8")
+            for start, end in zip(list_offsets, list_offsets[1:])]
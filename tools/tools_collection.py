@@ -9,26 +9,65 @@ Module tools of Tramway Collector
 
 import random
 import os
+import sys
+from enum import IntEnum
 from typing import (
+    Dict,
     List,
     Literal,
+    Set,
+    Tuple,
     Union
 )
 
 from tools.tools import (
     EMPTY_IMAGE_SOURCE,
     DICT_BADGES_IMAGES,
+    LIST_CATEGORIES,
+    LIST_SIDES,
     PATH_COLLECTION,
+    PATH_COLLECTION_DATABASE,
+    PATH_COLLECTION_JOURNAL,
+    PATH_COLLECTION_BINARY,
+    PATH_COLLECTION_MANIFEST,
+    PATH_COLLECTION_SHARDS,
+    PATH_REENCODING_MANIFEST,
+    PATH_IMAGE_HASHES,
+    PATH_IMAGE_LAYOUT,
     PATH_TRAMWAY_IMAGES,
     PATH_TEMP_FOLDER,
+    LIST_COLLECTION_BACKENDS,
+    DEFAULT_COLLECTION_BACKEND,
+    SETTINGS,
     load_json_file,
     save_json_file,
-    check_if_name_exists,
-    extract_filename_from_path
+    save_json_file_atomic,
+    check_if_name_exists
 )
 
 from tools.tools_image import (
-    delete_stored_image
+    get_image_path,
+    get_image_source,
+    get_migrated_image_name,
+    migrate_flat_images
+)
+from tools.tools_gc import ImageGarbageCollector
+from tools.tools_binary import (
+    BinaryCollection,
+    convert_json_to_binary,
+    save_binary_collection
+)
+from tools.tools_database import CollectionDatabase
+from tools.tools_journal import CollectionJournal
+from tools.tools_shards import ShardedCollection
+from tools.tools_reencode import (
+    DICT_IMAGE_PROFILES,
+    ImageReencoder
+)
+from tools.tools_duplicates import ImageHashIndex
+from tools.tools_saver import (
+    SAVE_DELAY,
+    WriteBehindSaver
 )
 
 ###############
@@ -36,16 +75,55 @@ from tools.tools_image import (
 ###############
 
 
+class Side(IntEnum):
+    """
+    Codes of the sides of the tramway stored in the images.
+    """
+    NONE = 0
+    LEFT = 1
+    RIGHT = 2
+
+
+class Category(IntEnum):
+    """
+    Codes of the categories stored in the images.
+    """
+    NONE = 0
+    GOLD = 1
+    SILVER = 2
+    BRONZE = 3
+
+
+# Names of the sides and categories, indexed by their codes
+LIST_SIDE_NAMES = [None] + LIST_SIDES
+LIST_CATEGORY_NAMES = [None] + LIST_CATEGORIES
+DICT_SIDE_CODES = {name: Side(code) for code, name in enumerate(LIST_SIDE_NAMES)}
+DICT_CATEGORY_CODES = {
+    name: Category(code) for code, name in enumerate(LIST_CATEGORY_NAMES)}
+
+# Bits of the flags of the images
+FLAG_DEFAULT = 1
+FLAG_PLUS_PLUS = 2
+FLAG_STORED = 4
+
+
 class TramwayImage():
     """
     Class representing the image of a tramway
 
+    The attributes are stored in slots: the side and the category as small
+    integer codes, the default and plus_plus booleans as bits of a flag, and
+    the source of the images stored in the collection folder as their file
+    name only, the full path being built when it is accessed.
+
     ...
 
     Attributes
     ----------
     source : str
         the path of the image
+    image_name : str
+        the name of the image file, as saved in the collection
     side : str
         the side of the tramway: it may take "left" or "right" as values
     category : str
@@ -54,22 +132,150 @@ class TramwayImage():
         boolean according to which the image as been defined as the default image of the gallery
     plus_plus : bool
         boolean according to which the image is a favorite one <3
+    gallery : Gallery | None
+        the gallery containing the image, whose indexes are updated when
+        the side, the category or the default attribute change
+    gallery_order : int
+        the order of addition of the image in its gallery
+    version : int
+        counter increased at each modification of the image and of the
+        versions of its gallery and collection, for the screens to only
+        update what has changed since their last display
 
     Methods
     -------
+    update_version()
+        increase the version of the image, its gallery and its collection
+    get_source(pixel_size=None)
+        get the path of the smallest variant of the image covering the given size
     get_default_badge()
         get the image if the badge associated to the default attribute
     get_plus_plus_badge()
         get the image if the badge associated to the plus_plus attribute
     """
 
-    def __init__(self, source=EMPTY_IMAGE_SOURCE, side: Union[Literal["left", "right"], None] = None, category=None, default=True, plus_plus=False) -> None:
-        self.source = source
-        self.side = side
-        self.category = category
+    __slots__ = ("_name", "_side", "_category", "_flags",
+                 "gallery", "gallery_order", "version")
+
+    def __init__(self, source=EMPTY_IMAGE_SOURCE, side: Union[Literal["left", "right"], None] = None, category=None, default=True, plus_plus=False, image_name=None) -> None:
+        self.gallery: Union["Gallery", None] = None
+        self.gallery_order = 0
+        self.version = 0
+        self._flags = 0
+        if image_name is not None:
+            self.image_name = image_name
+        else:
+            self.source = source
+        self._side = DICT_SIDE_CODES[side]
+        self._category = DICT_CATEGORY_CODES[category]
         self.default = default
         self.plus_plus = plus_plus
 
+    @property
+    def source(self):
+        if self._flags & FLAG_STORED:
+            return get_image_path(self._name)
+        return self._name
+
+    @source.setter
+    def source(self, source):
+        if source.startswith(PATH_TRAMWAY_IMAGES):
+            self.image_name = os.path.basename(source)
+        else:
+            self._name = source
+            self._flags &= ~FLAG_STORED
+            self.update_version()
+
+    @property
+    def image_name(self):
+        if self._flags & FLAG_STORED:
+            return self._name
+        return os.path.basename(self._name)
+
+    @image_name.setter
+    def image_name(self, image_name):
+        self._name = sys.intern(image_name)
+        self._flags |= FLAG_STORED
+        self.update_version()
+
+    def update_version(self):
+        self.version += 1
+        if self.gallery is not None:
+            self.gallery.update_version()
+
+    def check_is_stored(self) -> bool:
+        return bool(self._flags & FLAG_STORED)
+
+    def get_source(self, pixel_size=None) -> str:
+        """
+        Get the path of the smallest variant of the image covering the size of its widget.
+
+        Parameters
+        ----------
+        pixel_size : float, optional (default is None)
+            size in pixels of the widget displaying the image
+
+        Returns
+        -------
+        str
+            path of the variant of the image
+        """
+        if self._flags & FLAG_STORED:
+            return get_image_source(self._name, pixel_size)
+        return self._name
+
+    @property
+    def side(self):
+        return LIST_SIDE_NAMES[self._side]
+
+    @side.setter
+    def side(self, side):
+        if self.gallery is None:
+            self._side = DICT_SIDE_CODES[side]
+        else:
+            self.gallery.set_indexed_attribute(
+                self, "_side", DICT_SIDE_CODES[side])
+        self.update_version()
+
+    @property
+    def category(self):
+        return LIST_CATEGORY_NAMES[self._category]
+
+    @category.setter
+    def category(self, category):
+        if self.gallery is None:
+            self._category = DICT_CATEGORY_CODES[category]
+        else:
+            self.gallery.set_indexed_attribute(
+                self, "_category", DICT_CATEGORY_CODES[category])
+        self.update_version()
+
+    @property
+    def default(self):
+        return bool(self._flags & FLAG_DEFAULT)
+
+    @default.setter
+    def default(self, default):
+        if self.gallery is not None and default != self.default:
+            self.gallery.update_default_index(self, default)
+        if default:
+            self._flags |= FLAG_DEFAULT
+        else:
+            self._flags &= ~FLAG_DEFAULT
+        self.update_version()
+
+    @property
+    def plus_plus(self):
+        return bool(self._flags & FLAG_PLUS_PLUS)
+
+    @plus_plus.setter
+    def plus_plus(self, plus_plus):
+        if plus_plus:
+            self._flags |= FLAG_PLUS_PLUS
+        else:
+            self._flags &= ~FLAG_PLUS_PLUS
+        self.update_version()
+
     def get_default_badge(self):
         if self.default:
             return DICT_BADGES_IMAGES["default"][0]
@@ -93,39 +299,232 @@ class TramwayImage():
 
 
 class Gallery():
+    """
+    Class representing a gallery of images of the same tramway
+
+    The images are also indexed by side, by side and category, and the
+    default images by side, so that the queries used by the screens do not
+    need to go through all the images.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the name of the gallery
+    list_images : List[TramwayImage]
+        the images of the gallery, in their order of addition
+    collection : Collection | None
+        the collection containing the gallery
+    dict_side_images : Dict[str, List[TramwayImage]]
+        the images of each side
+    dict_category_images : Dict[Tuple[str, str], List[TramwayImage]]
+        the images of each side and category
+    dict_default_images : Dict[str, List[TramwayImage]]
+        the default images of each side
+    version : int
+        counter increased at each modification of the gallery or of its images
+    """
+
     def __init__(self, name="", list_images=[]) -> None:
         self.name = name
-        self.list_images: List[TramwayImage] = list_images
+        self.version = 0
+        self.list_images: List[TramwayImage] = list(list_images)
+        self.collection: Union["Collection", None] = None
+        self.dict_side_images: Dict[str, List[TramwayImage]] = {}
+        self.dict_category_images: Dict[Tuple[str, str],
+                                        List[TramwayImage]] = {}
+        self.dict_default_images: Dict[str, List[TramwayImage]] = {}
+        self.next_gallery_order = 0
+        for tramway_image in self.list_images:
+            self.attach_image(tramway_image)
+
+    def attach_image(self, tramway_image: TramwayImage):
+        tramway_image.gallery = self
+        tramway_image.gallery_order = self.next_gallery_order
+        self.next_gallery_order += 1
+        self.add_to_indexes(tramway_image)
+
+    def add_to_indexes(self, tramway_image: TramwayImage):
+        side = tramway_image.side
+        insert_in_order(self.dict_side_images.setdefault(side, []),
+                        tramway_image)
+        insert_in_order(self.dict_category_images.setdefault(
+            (side, tramway_image.category), []), tramway_image)
+        if tramway_image.default:
+            insert_in_order(self.dict_default_images.setdefault(
+                side, []), tramway_image)
+
+    def remove_from_indexes(self, tramway_image: TramwayImage):
+        side = tramway_image.side
+        self.dict_side_images[side].remove(tramway_image)
+        self.dict_category_images[(
+            side, tramway_image.category)].remove(tramway_image)
+        if tramway_image.default:
+            self.dict_default_images[side].remove(tramway_image)
+
+    def set_indexed_attribute(self, tramway_image: TramwayImage, attribute: str, value):
+        """
+        Change an attribute of an image used by the indexes, and update them.
+
+        Parameters
+        ----------
+        tramway_image : TramwayImage
+            image of the gallery
+        attribute : str
+            name of the attribute storing the side or the category
+        value : str
+            new value of the attribute
+
+        Returns
+        -------
+        None
+        """
+        self.update_collection_statistics(-1)
+        self.remove_from_indexes(tramway_image)
+        setattr(tramway_image, attribute, value)
+        self.add_to_indexes(tramway_image)
+        self.update_collection_statistics(1)
+
+    def update_collection_statistics(self, sign: int):
+        """
+        Add or remove the contribution of the gallery to the statistics of its collection.
+
+        Parameters
+        ----------
+        sign : int
+            1 to add the contribution, -1 to remove it
+
+        Returns
+        -------
+        None
+        """
+        if self.collection is not None:
+            self.collection.update_statistics(self, sign)
+
+    def update_collection_references(self, list_images: List[TramwayImage], sign: int):
+        if self.collection is not None:
+            self.collection.update_image_references(list_images, sign)
+
+    def update_default_index(self, tramway_image: TramwayImage, default: bool):
+        list_default_images = self.dict_default_images.setdefault(
+            tramway_image.side, [])
+        if default:
+            insert_in_order(list_default_images, tramway_image)
+        else:
+            list_default_images.remove(tramway_image)
+
+    def update_version(self):
+        self.version += 1
+        if self.collection is not None:
+            self.collection.version += 1
+
+    def notify(self, operation, **kwargs):
+        """
+        Notify the collection containing the gallery of a modification.
+
+        Parameters
+        ----------
+        operation : str
+            name of the modification
+
+        Returns
+        -------
+        None
+        """
+        self.version += 1
+        if self.collection is not None:
+            self.collection.notify(operation, gallery=self, **kwargs)
 
     def add_image(self, tramway_image: TramwayImage):
+        self.update_collection_statistics(-1)
         self.list_images.append(tramway_image)
+        self.attach_image(tramway_image)
+        self.update_collection_statistics(1)
+        self.update_collection_references([tramway_image], 1)
+        self.notify("add_image", tramway_image=tramway_image)
 
     def delete_image(self, tramway_image: TramwayImage):
-        self.list_images.remove(tramway_image)
+        index = self.list_images.index(tramway_image)
+        self.update_collection_statistics(-1)
+        del self.list_images[index]
+        self.remove_from_indexes(tramway_image)
+        tramway_image.gallery = None
+        self.update_collection_statistics(1)
+        self.update_collection_references([tramway_image], -1)
+        self.notify("delete_image", index=index)
+
+    def edit_image(self, tramway_image: TramwayImage, side, category, plus_plus):
+        """
+        Change the attributes of an image of the gallery.
+
+        Parameters
+        ----------
+        tramway_image : TramwayImage
+            image to edit, which may not be in the gallery yet
+        side : str
+            new side of the image
+        category : str
+            new category of the image
+        plus_plus : bool
+            new plus_plus attribute of the image
+
+        Returns
+        -------
+        None
+        """
+        tramway_image.side = side
+        tramway_image.category = category
+        tramway_image.plus_plus = plus_plus
+        self.notify("edit_image", tramway_image=tramway_image)
 
     def check_is_empty(self):
         return (len(self.list_images) == 0)
 
+    def get_simple_gallery(self, pixel_size=None) -> dict:
+        tramway_image: TramwayImage = self.get_random_image()
+        return {
+            "name": self.name,
+            "image": tramway_image.get_source(pixel_size)
+        }
+
     def get_list_side_images(self, side):
-        list_side_images = []
-        for tramway_image in self.list_images:
-            if tramway_image.side == side:
-                list_side_images.append(tramway_image)
-        return list_side_images
+        return list(self.dict_side_images.get(side, []))
+
+    def get_sorted_side_images(self, side) -> List[TramwayImage]:
+        """
+        Get the images of a side sorted from the best category to the worst,
+        then by order of addition, from the index of the categories.
+
+        Parameters
+        ----------
+        side : str
+            side of the tramway
+
+        Returns
+        -------
+        List[TramwayImage]
+            the sorted images of the side
+        """
+        list_sorted_images = []
+        for category in LIST_CATEGORY_NAMES[1:] + LIST_CATEGORY_NAMES[:1]:
+            list_sorted_images += self.dict_category_images.get(
+                (side, category), [])
+        return list_sorted_images
 
     def get_default_image(self, side) -> TramwayImage:
-        list_side_images = self.get_list_side_images(side)
-        for tramway_image in list_side_images:
-            if tramway_image.default:
-                return tramway_image
+        list_default_images = self.dict_default_images.get(side)
+        if list_default_images:
+            return list_default_images[0]
         empty_image = TramwayImage(side=side)
         return empty_image
 
     def update_default_image(self, tramway_image: TramwayImage):
         image: TramwayImage
-        for image in self.get_list_side_images(side=tramway_image.side):
+        for image in list(self.dict_default_images.get(tramway_image.side, [])):
             image.default = False
         tramway_image.default = True
+        self.notify("update_default_image", tramway_image=tramway_image)
 
     def assign_default_image(self):
         for side in ["left", "right"]:
@@ -150,6 +549,7 @@ class Gallery():
         best_category, list_best_images = self.get_best_category(side=side)
         best_image = random.choice(list_best_images)
         best_image.default = True
+        self.notify("edit_image", tramway_image=best_image)
 
     def get_best_category(self, side=None):
         """
@@ -168,27 +568,37 @@ class Gallery():
             the list of images with the best categories
         """
 
-        # Use integers to ease the comparison
-        best_category = 0
-        dict_categories = {
-            "gold": 3,
-            "silver": 2,
-            "bronze": 1
-        }
-        dict_categories_reverse = {
-            dict_categories[key]: key for key in (list(dict_categories.keys()))}
-        list_images = self.list_images
-        if side is not None:
-            list_images = self.get_list_side_images(side)
-        for tramway_image in list_images:
-            if best_category < dict_categories[tramway_image.category]:
-                best_category = dict_categories[tramway_image.category]
-        if best_category != 0:
-            list_best_images = [
-                e for e in list_images if e.category == dict_categories_reverse[best_category]]
-            return dict_categories_reverse[best_category], list_best_images
+        list_sides = [side]
+        if side is None:
+            list_sides = list(self.dict_side_images.keys())
+        for category in LIST_CATEGORIES:
+            list_best_images = []
+            for side_images in list_sides:
+                list_best_images += self.dict_category_images.get(
+                    (side_images, category), [])
+            if list_best_images:
+                return category, list_best_images
         return None, [TramwayImage()]
 
+    def get_best_category_name(self, side):
+        """
+        Determine the best category of a side of the gallery.
+
+        Parameters
+        ----------
+        side : str
+            side of the tramway
+
+        Returns
+        -------
+        Literal["gold", "silver", "bronze"] | None
+            the name of the best category
+        """
+        for category in LIST_CATEGORIES:
+            if self.dict_category_images.get((side, category)):
+                return category
+        return None
+
     def get_random_image(self):
         best_category, list_best_images = self.get_best_category()
         return (random.choice(list_best_images))
@@ -203,49 +613,200 @@ class Gallery():
 
 class Collection():
     def __init__(self, list_galleries=[]) -> None:
+        self.list_observers = []
+        # Counter increased at each modification of the collection
+        self.version = 0
+        self.set_galleries(list_galleries)
+
+    def set_galleries(self, list_galleries: List[Gallery]):
+        """
+        Replace all the galleries of the collection, without notifying the observers.
+
+        Parameters
+        ----------
+        list_galleries : List[Gallery]
+            new galleries of the collection
+
+        Returns
+        -------
+        None
+        """
         self.list_galleries: List[Gallery] = list_galleries
+        self.version += 1
+        # Index of the galleries by name, the list keeps the display order
+        self.dict_galleries: Dict[str, Gallery] = {}
+        # Number of images and number of galleries per side and best category
+        self.total_images = 0
+        self.dict_statistics_sides: Dict[str, Dict[str, int]] = {
+            side: {category: 0 for category in LIST_CATEGORIES}
+            for side in LIST_SIDES}
+        # Number of images referencing each stored image file
+        self.dict_image_references: Dict[str, int] = {}
+        for gallery in list_galleries:
+            gallery.collection = self
+            self.dict_galleries[gallery.name] = gallery
+            self.update_statistics(gallery, 1)
+            self.update_image_references(gallery.list_images, 1)
+
+    def add_observer(self, observer):
+        """
+        Add a function called with the name of the operation and its
+        parameters each time the collection or one of its galleries is modified.
+
+        Parameters
+        ----------
+        observer : Callable
+            function to call
+
+        Returns
+        -------
+        None
+        """
+        self.list_observers.append(observer)
+
+    def notify(self, operation, **kwargs):
+        self.version += 1
+        for observer in self.list_observers:
+            observer(operation, **kwargs)
 
     def add_gallery(self, gallery: Gallery):
         # Check that the name doesn't already exist
-        check_if_name_exists(self.list_galleries, gallery.name)
+        check_if_name_exists(self.dict_galleries, gallery.name)
         self.list_galleries.append(gallery)
+        self.dict_galleries[gallery.name] = gallery
+        gallery.collection = self
+        self.update_statistics(gallery, 1)
+        self.update_image_references(gallery.list_images, 1)
+        self.notify("add_gallery", gallery=gallery)
 
     def get_gallery(self, gallery_name: str):
-        for gallery in self.list_galleries:
-            if gallery_name == gallery.name:
-                return gallery
+        if gallery_name in self.dict_galleries:
+            return self.dict_galleries[gallery_name]
         raise ValueError("The gallery under this name does not exist.")
 
     def change_name_gallery(self, my_gallery: Gallery, new_name):
         if my_gallery.name != new_name:
-            check_if_name_exists(list_galleries=self.list_galleries,
+            check_if_name_exists(dict_galleries=self.dict_galleries,
                                  new_name=new_name)
+            old_name = my_gallery.name
             my_gallery.name = new_name
+            del self.dict_galleries[old_name]
+            self.dict_galleries[new_name] = my_gallery
+            self.notify("rename_gallery", gallery=my_gallery, old_name=old_name)
             return True
         return False
 
     def delete_gallery(self, gallery: Gallery):
         self.list_galleries.remove(gallery)
+        del self.dict_galleries[gallery.name]
+        self.update_statistics(gallery, -1)
+        self.update_image_references(gallery.list_images, -1)
+        gallery.collection = None
+        self.notify("delete_gallery", gallery=gallery)
 
-    def get_simple_collection(self) -> list:
-        simple_collection = []
-        for gallery in self.list_galleries:
-            tramway_image: TramwayImage = gallery.get_random_image()
-            simple_collection.append({
-                "name": gallery.name,
-                "image": tramway_image.source
-            })
-        return simple_collection
+    def get_simple_collection(self, pixel_size=None) -> list:
+        return [gallery.get_simple_gallery(pixel_size)
+                for gallery in self.list_galleries]
 
     def get_statistics_side(self, side, list_categories=["gold", "silver", "bronze"]):
         statistics = 0
         for gallery in self.list_galleries:
-            best_category, list_best_images = gallery.get_best_category(side)
+            best_category = gallery.get_best_category_name(side)
             if best_category in list_categories:
                 statistics += 1
         return statistics
 
+    def update_statistics(self, gallery: Gallery, sign: int):
+        """
+        Add or remove the contribution of a gallery to the statistics.
+
+        Parameters
+        ----------
+        gallery : Gallery
+            gallery of the collection
+        sign : int
+            1 to add the contribution, -1 to remove it
+
+        Returns
+        -------
+        None
+        """
+        self.total_images += sign * len(gallery.list_images)
+        for side in LIST_SIDES:
+            best_category = gallery.get_best_category_name(side)
+            if best_category is not None:
+                self.dict_statistics_sides[side][best_category] += sign
+
+    def update_image_references(self, list_images: List[TramwayImage], sign: int):
+        """
+        Add or remove the references of images to their stored files.
+
+        Parameters
+        ----------
+        list_images : List[TramwayImage]
+            images added to or removed from the collection
+        sign : int
+            1 to add the references, -1 to remove them
+
+        Returns
+        -------
+        None
+        """
+        tramway_image: TramwayImage
+        for tramway_image in list_images:
+            if not tramway_image.check_is_stored():
+                continue
+            image_name = tramway_image.image_name
+            number_references = self.dict_image_references.get(
+                image_name, 0) + sign
+            if number_references > 0:
+                self.dict_image_references[image_name] = number_references
+            else:
+                self.dict_image_references.pop(image_name, None)
+
+    def get_number_references(self, image_name: str) -> int:
+        return self.dict_image_references.get(image_name, 0)
+
+    def check_is_referenced(self, image_name: str) -> bool:
+        return image_name in self.dict_image_references
+
     def get_statistics(self):
+        """
+        Get the statistics of the collection, maintained during its modifications.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            the numbers of images and galleries, and for each side the number
+            of galleries whose best category is gold, silver or bronze
+        """
+        dict_statistics = {}
+        dict_statistics["total_images"] = self.total_images
+        dict_statistics["total"] = len(self.list_galleries)
+        dict_statistics["total_sides"] = [
+            sum(self.dict_statistics_sides[side].values()) for side in LIST_SIDES]
+        for category in LIST_CATEGORIES:
+            dict_statistics[category] = [
+                self.dict_statistics_sides[side][category] for side in LIST_SIDES]
+        return dict_statistics
+
+    def compute_statistics(self):
+        """
+        Compute the statistics of the collection by going through all galleries.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            the same dictionary as get_statistics
+        """
         dict_statistics = {}
         dict_statistics["total_images"] = 0
         for gallery in self.list_galleries:
@@ -269,6 +830,21 @@ class Collection():
         ]
         return dict_statistics
 
+    def check_statistics(self) -> bool:
+        """
+        Check that the maintained statistics are equal to the computed ones.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bool
+            True if the statistics are consistent
+        """
+        return self.get_statistics() == self.compute_statistics()
+
     def __str__(self) -> str:
         string_repr = "[\n"
         for gallery in self.list_galleries:
@@ -277,11 +853,129 @@ class Collection():
         return string_repr
 
 
+class CollectionChanges():
+    """
+    Class recording the modifications of a collection notified to its
+    observers, for a screen displaying the collection
+
+    When the screen is opened again, it updates nothing if the version of the
+    collection is the one displayed, and otherwise only the galleries which
+    have been modified. The structural operations, such as the addition of a
+    gallery, and the modifications which are not notified, such as the
+    loading of another collection, require to rebuild the screen.
+
+    ...
+
+    Attributes
+    ----------
+    collection : Collection
+        the collection observed
+    list_structural_operations : List[str]
+        the operations requiring to rebuild the display of their gallery
+    displayed_version : int | None
+        the version of the collection displayed by the screen, None before its first display
+    recorded_version : int | None
+        the version of the collection after the last operation recorded
+    set_changed_galleries : Set[Gallery]
+        the galleries modified since the last display
+    set_outdated_galleries : Set[Gallery]
+        the galleries modified by a structural operation since the last display
+
+    Methods
+    -------
+    record_operation(operation, gallery, **kwargs)
+        record a modification notified by the collection
+    check_is_displayed()
+        check whether the version of the collection is the one displayed
+    check_can_update(gallery=None)
+        check whether the display can be updated instead of being rebuilt
+    set_displayed()
+        mark the current version of the collection as displayed
+    """
+
+    def __init__(self, collection: Collection, list_structural_operations: List[str]) -> None:
+        self.collection = collection
+        self.list_structural_operations = list_structural_operations
+        self.displayed_version: Union[int, None] = None
+        self.recorded_version: Union[int, None] = None
+        self.set_changed_galleries: Set[Gallery] = set()
+        self.set_outdated_galleries: Set[Gallery] = set()
+        collection.add_observer(self.record_operation)
+
+    def record_operation(self, operation, gallery: Gallery, **kwargs):
+        self.set_changed_galleries.add(gallery)
+        if operation in self.list_structural_operations:
+            self.set_outdated_galleries.add(gallery)
+        self.recorded_version = self.collection.version
+
+    def check_is_displayed(self) -> bool:
+        return self.displayed_version == self.collection.version
+
+    def check_can_update(self, gallery: Union[Gallery, None] = None) -> bool:
+        """
+        Check whether all the modifications since the last display have been
+        notified and are not structural, so that the display can be updated.
+
+        Parameters
+        ----------
+        gallery : Gallery | None, optional (default is None)
+            gallery displayed by the screen, None if the screen displays all the galleries
+
+        Returns
+        -------
+        bool
+            True if only the modified galleries need to be updated
+        """
+        if self.displayed_version is None or \
+                self.recorded_version != self.collection.version:
+            return False
+        if gallery is None:
+            return not self.set_outdated_galleries
+        return gallery not in self.set_outdated_galleries
+
+    def set_displayed(self):
+        self.displayed_version = self.collection.version
+        self.recorded_version = self.collection.version
+        self.set_changed_galleries.clear()
+        self.set_outdated_galleries.clear()
+
+
 #################
 ### Functions ###
 #################
 
 
+def insert_in_order(list_images: List[TramwayImage], tramway_image: TramwayImage):
+    """
+    Insert an image in a list of images sorted by order of addition in their gallery.
+
+    Parameters
+    ----------
+    list_images : List[TramwayImage]
+        Sorted list of images
+
+    tramway_image : TramwayImage
+        Image to insert
+
+    Returns
+    -------
+    None
+    """
+    low = 0
+    high = len(list_images)
+    # Most insertions are for new images, which go at the end
+    if high == 0 or list_images[-1].gallery_order < tramway_image.gallery_order:
+        list_images.append(tramway_image)
+        return
+    while low < high:
+        middle = (low + high) // 2
+        if list_images[middle].gallery_order < tramway_image.gallery_order:
+            low = middle + 1
+        else:
+            high = middle
+    list_images.insert(low, tramway_image)
+
+
 def init_collection_image_folder():
     """
     Create the json file for the collection and the folder for the images.
@@ -305,17 +999,16 @@ def init_collection_image_folder():
         os.mkdir(path=PATH_TEMP_FOLDER)
 
     # Json file of the collection
-    collection_file = "collection.json"
-    if collection_file not in os.listdir(PATH_TRAMWAY_IMAGES):
+    if not os.path.exists(PATH_COLLECTION):
         save_json_file(
-            file_path=PATH_TRAMWAY_IMAGES + collection_file,
+            file_path=PATH_COLLECTION,
             dict_to_save={}
         )
 
 
-def update_collection():
+def get_collection_backend() -> str:
     """
-    Update the collection  with the one contained in the json file.
+    Get the storage backend of the collection defined in the settings.
 
     Parameters
     ----------
@@ -323,43 +1016,398 @@ def update_collection():
 
     Returns
     -------
+    str
+        Name of the backend, "json", "sqlite", "journal", "binary" or "sharded"
+    """
+    collection_backend = SETTINGS.get(
+        "collection_backend", DEFAULT_COLLECTION_BACKEND)
+    if collection_backend not in LIST_COLLECTION_BACKENDS:
+        return DEFAULT_COLLECTION_BACKEND
+    return collection_backend
+
+
+def get_dict_image(tramway_image: TramwayImage) -> dict:
+    """
+    Convert a tramway image into the dictionary saved in the collection.
+
+    Parameters
+    ----------
+    tramway_image : TramwayImage
+        Image to convert
+
+    Returns
+    -------
+    dict
+        Dictionary of the image
+    """
+    return {
+        "source": tramway_image.image_name,
+        "side": tramway_image.side,
+        "category": tramway_image.category,
+        "default": tramway_image.default,
+        "plus_plus": tramway_image.plus_plus
+    }
+
+
+def get_dict_collection() -> dict:
+    """
+    Convert the collection into the dictionary saved in the json file.
+
+    Parameters
+    ----------
     None
+
+    Returns
+    -------
+    dict
+        Dictionary of the collection, with the list of images of each gallery
     """
+    dict_collection = {}
+    gallery: Gallery
+    for gallery in my_collection.list_galleries:
+        dict_collection[gallery.name] = [
+            get_dict_image(tramway_image) for tramway_image in gallery.list_images]
+    return dict_collection
 
-    # Open the json file of the collection
-    dict_collection = load_json_file(
-        file_path=PATH_COLLECTION
+
+def load_database_collection() -> dict:
+    """
+    Load the collection from the database.
+    The json file is migrated into it the first time the database is opened.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    dict
+        Dictionary of the collection, with the same structure as the json file
+    """
+    is_new_database = collection_database.connect()
+    if is_new_database and os.path.exists(PATH_COLLECTION):
+        collection_database.migrate_json_collection(
+            load_json_file(file_path=PATH_COLLECTION))
+    return collection_database.load_collection()
+
+
+def load_sharded_collection() -> dict:
+    """
+    Load the collection from the shards of the galleries.
+    The json file is split into shards the first time they are opened.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    dict
+        Dictionary of the collection, with the same structure as the json file
+    """
+    if not collection_shards.check_exists():
+        collection_shards.write_collection(load_json_file(PATH_COLLECTION))
+    return collection_shards.load_collection()
+
+
+def get_list_dict_images(gallery_name: str) -> List[dict]:
+    return [get_dict_image(tramway_image) for tramway_image
+            in my_collection.get_gallery(gallery_name).list_images]
+
+
+def load_binary_galleries() -> List[Gallery]:
+    """
+    Create the galleries from the binary file, decoding them one by one from
+    the mapped file. The json file is converted the first time it is opened.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    List[Gallery]
+        Galleries of the collection
+    """
+    if not os.path.exists(PATH_COLLECTION_BINARY):
+        convert_json_to_binary(PATH_COLLECTION, PATH_COLLECTION_BINARY)
+    with BinaryCollection(PATH_COLLECTION_BINARY) as binary_collection:
+        return [create_gallery(
+            gallery_name=binary_collection.get_gallery_name(gallery_index),
+            list_dict_images=binary_collection.read_gallery(gallery_index)
+        ) for gallery_index in range(binary_collection.number_galleries)]
+
+
+def record_journal_operation(operation, gallery: Gallery, **kwargs):
+    """
+    Convert a modification of the collection into a record of the journal.
+    It is used as observer of the collection when the journal backend is selected.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the modification
+
+    gallery : Gallery
+        Gallery modified
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() != "journal":
+        return
+    record = {"operation": operation, "gallery": gallery.name}
+    if operation == "add_gallery":
+        record["images"] = [get_dict_image(tramway_image)
+                            for tramway_image in gallery.list_images]
+    elif operation == "rename_gallery":
+        record["gallery"] = kwargs["old_name"]
+        record["new_name"] = gallery.name
+    elif operation == "add_image":
+        record["image"] = get_dict_image(kwargs["tramway_image"])
+    elif operation == "delete_image":
+        record["index"] = kwargs["index"]
+    elif operation in ["edit_image", "update_default_image"]:
+        tramway_image: TramwayImage = kwargs["tramway_image"]
+        # Images not added yet in the gallery are recorded with add_image
+        index = -1
+        if tramway_image in gallery.list_images:
+            index = gallery.list_images.index(tramway_image)
+        if operation == "edit_image":
+            if index < 0:
+                return
+            record["image"] = get_dict_image(tramway_image)
+        else:
+            record["side"] = tramway_image.side
+        record["index"] = index
+    collection_journal.add_record(record)
+
+
+def record_shard_operation(operation, gallery: Gallery, **kwargs):
+    """
+    Mark the shards and the manifest to rewrite after a modification of the collection.
+    It is used as observer of the collection when the sharded backend is selected.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the modification
+
+    gallery : Gallery
+        Gallery modified
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() != "sharded":
+        return
+    if operation == "add_gallery":
+        collection_shards.add_gallery(gallery.name)
+    elif operation == "rename_gallery":
+        collection_shards.rename_gallery(kwargs["old_name"], gallery.name)
+    elif operation == "delete_gallery":
+        collection_shards.delete_gallery(gallery.name)
+    else:
+        collection_shards.mark_gallery_dirty(gallery.name)
+
+
+def record_database_operation(operation, gallery: Gallery, **kwargs):
+    """
+    Mark the galleries to save in the database after a modification of the collection.
+    It is used as observer of the collection when the SQLite backend is selected.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the modification
+
+    gallery : Gallery
+        Gallery modified
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() != "sqlite":
+        return
+    if operation == "delete_gallery":
+        collection_database.delete_gallery(gallery)
+    else:
+        collection_database.mark_gallery_dirty(gallery)
+
+
+def close_collection_storage():
+    """
+    Close the files of the collection, for instance before they are replaced by an import.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    collection_saver.cancel()
+    image_hash_index.saver.cancel()
+    # No image is deleted or re-encoded while the folder is replaced
+    image_collector.stop()
+    if image_reencoder is not None:
+        image_reencoder.cancel()
+    collection_database.close()
+    collection_journal.close()
+
+
+def create_gallery(gallery_name: str, list_dict_images: List[dict]) -> Gallery:
+    """
+    Create a gallery from the dictionaries of its images.
+
+    Parameters
+    ----------
+    gallery_name : str
+        Name of the gallery
+
+    list_dict_images : List[dict]
+        Images of the gallery, with the same structure as in the json file
+
+    Returns
+    -------
+    Gallery
+        Gallery created
+    """
+
+    # Create the list of images, of type TramwayImage
+    list_images = []
+    for dict_image in list_dict_images:
+        image = TramwayImage(
+            image_name=dict_image["source"],
+            side=dict_image["side"],
+            category=dict_image["category"],
+            default=dict_image["default"],
+            plus_plus=dict_image["plus_plus"]
+        )
+        list_images.append(image)
+
+    return Gallery(
+        name=gallery_name,
+        list_images=list_images
     )
 
-    # Create the list of galleries, of type Gallery
-    list_galleries = []
-    for gallery_name in dict_collection:
-
-        # Create the list of images, of type TramwayImage
-        list_images = []
-        for dict_image in dict_collection[gallery_name]:
-            image = TramwayImage(
-                source=PATH_TRAMWAY_IMAGES + dict_image["source"],
-                side=dict_image["side"],
-                category=dict_image["category"],
-                default=dict_image["default"],
-                plus_plus=dict_image["plus_plus"]
+
+def migrate_image_names(list_galleries: List[Gallery]) -> bool:
+    """
+    Rename the images stored in the former flat layout after the hash of
+    their content, for the collections created when they were named with
+    random integers. The files are not moved yet, and nothing is checked
+    once the migration of the layout has been completed.
+
+    Parameters
+    ----------
+    list_galleries : List[Gallery]
+        Galleries of the collection, not added to the collection yet
+
+    Returns
+    -------
+    bool
+        Whether images have been renamed
+    """
+    if os.path.exists(PATH_IMAGE_LAYOUT):
+        return False
+    dict_new_names = {}
+    is_migrated = False
+    for gallery in list_galleries:
+        for tramway_image in gallery.list_images:
+            image_name = tramway_image.image_name
+            if image_name not in dict_new_names:
+                dict_new_names[image_name] = get_migrated_image_name(image_name)
+            if dict_new_names[image_name] != image_name:
+                tramway_image.image_name = dict_new_names[image_name]
+                is_migrated = True
+    return is_migrated
+
+
+def finish_image_migration():
+    """
+    Move the images stored in the former flat layout into their folders, once
+    the collection refers to their new names, and mark the migration of the
+    layout as completed.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    if os.path.exists(PATH_IMAGE_LAYOUT):
+        return
+    migrate_flat_images()
+    save_json_file_atomic(PATH_IMAGE_LAYOUT, {"layout": "hash_folders"})
+
+
+def update_collection():
+    """
+    Update the collection  with the one stored by the backend selected in the settings.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    # Decode the galleries from the binary file
+    if get_collection_backend() == "binary":
+        list_galleries = load_binary_galleries()
+
+    else:
+        # Open the json file or the database of the collection
+        if get_collection_backend() == "sqlite":
+            dict_collection = load_database_collection()
+        elif get_collection_backend() == "journal":
+            dict_collection = collection_journal.load_collection()
+        elif get_collection_backend() == "sharded":
+            dict_collection = load_sharded_collection()
+        else:
+            dict_collection = load_json_file(
+                file_path=PATH_COLLECTION
             )
-            list_images.append(image)
 
-        # Create the gallery
-        gallery = Gallery(
-            name=gallery_name,
-            list_images=list_images
-        )
-        list_galleries.append(gallery)
+        # Create the list of galleries, of type Gallery
+        list_galleries = [
+            create_gallery(gallery_name=gallery_name,
+                           list_dict_images=dict_collection[gallery_name])
+            for gallery_name in dict_collection]
 
-    my_collection.list_galleries = list_galleries
+    is_migrated = migrate_image_names(list_galleries)
+    my_collection.set_galleries(list_galleries)
+    if get_collection_backend() == "sqlite":
+        collection_database.register_galleries(
+            list_galleries, get_dict_image)
+    # The new names are written before the files are moved, so that a stop
+    # in between finds the files of the images at the next start
+    if is_migrated:
+        rewrite_collection()
+    finish_image_migration()
 
 
 def save_collection():
     """
     Save the collection in the corresponding json file.
+    The json file is written in a background thread, once per group of
+    modifications made during the delay of the saver.
+    With the SQLite backend, only the rows of the modified galleries that have
+    changed are written.
+    With the journal backend, only the records of the last modifications are
+    written, and the journal is folded into the json file when it becomes too large.
+    With the binary backend, the binary file is written instead of the json file.
+    With the sharded backend, only the shards of the modified galleries are
+    written, and the manifest when galleries are added, renamed or deleted.
 
     Parameters
     ----------
@@ -370,43 +1418,233 @@ def save_collection():
     None
     """
 
-    dict_collection = {}
-    gallery: Gallery
-    for gallery in my_collection.list_galleries:
-        list_dict_images = []
-        tramway_image: TramwayImage
-        for tramway_image in gallery.list_images:
-            dict_image = {}
-            dict_image["source"] = os.path.basename(tramway_image.source)
-            dict_image["side"] = tramway_image.side
-            dict_image["category"] = tramway_image.category
-            dict_image["default"] = tramway_image.default
-            dict_image["plus_plus"] = tramway_image.plus_plus
-            list_dict_images.append(dict_image)
-        dict_collection[gallery.name] = list_dict_images
-
-    # Save in the json file of the collection
-    save_json_file(
+    # Save only the modified rows of the modified galleries in the database
+    if get_collection_backend() == "sqlite":
+        collection_database.save_dirty_galleries(get_dict_image)
+        return
+
+    # Save only the shards of the modified galleries
+    if get_collection_backend() == "sharded":
+        collection_shards.save(get_list_dict_images)
+        return
+
+    # Append the modifications to the journal
+    if get_collection_backend() == "journal":
+        collection_journal.write_records()
+        if collection_journal.check_compaction_needed():
+            collection_journal.compact(get_dict_collection())
+        return
+
+    # Save in the json file or the binary file of the collection
+    collection_saver.mark_dirty()
+
+
+def add_imported_images(gallery: Gallery, list_image_names: List[str], side, category, plus_plus=False) -> List[TramwayImage]:
+    """
+    Add a batch of stored images to a gallery with the same attributes, and
+    save the collection once for the whole batch.
+
+    Parameters
+    ----------
+    gallery : Gallery
+        Gallery receiving the images, already in the collection
+
+    list_image_names : List[str]
+        Names of the stored images, with their extension
+
+    side : str
+        Side of the images
+
+    category : str
+        Category of the images
+
+    plus_plus : bool, optional (default is False)
+        plus_plus attribute of the images
+
+    Returns
+    -------
+    List[TramwayImage]
+        Images added to the gallery
+    """
+    list_images = []
+    for image_name in list_image_names:
+        tramway_image = TramwayImage(
+            image_name=image_name,
+            side=side,
+            category=category,
+            default=False,
+            plus_plus=plus_plus
+        )
+        gallery.add_image(tramway_image)
+        list_images.append(tramway_image)
+    gallery.assign_default_image()
+    save_collection()
+    return list_images
+
+
+def rewrite_collection():
+    """
+    Write the whole collection with the selected backend, after a
+    modification of the images not notified to the observers. The collection
+    is written before returning, the files of the former names being deleted
+    or moved afterwards.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() == "sqlite":
+        collection_database.save_galleries(
+            my_collection.list_galleries, get_dict_image)
+    elif get_collection_backend() == "journal":
+        collection_journal.compact(get_dict_collection(), wait=True)
+    elif get_collection_backend() == "sharded":
+        collection_shards.write_collection(get_dict_collection())
+    else:
+        collection_saver.mark_dirty()
+        collection_saver.flush()
+
+
+def rename_stored_images(dict_new_names: Dict[str, str]) -> int:
+    """
+    Make the images of the collection refer to new stored files, for
+    instance after their re-encoding, and rewrite the whole collection.
+
+    Parameters
+    ----------
+    dict_new_names : Dict[str, str]
+        New name of the stored images, with their extension
+
+    Returns
+    -------
+    int
+        Number of images renamed
+    """
+    list_renamed_images = [
+        tramway_image for gallery in my_collection.list_galleries
+        for tramway_image in gallery.list_images
+        if tramway_image.check_is_stored()
+        and dict_new_names.get(tramway_image.image_name, tramway_image.image_name)
+        != tramway_image.image_name]
+    if not list_renamed_images:
+        return 0
+    my_collection.update_image_references(list_renamed_images, -1)
+    for tramway_image in list_renamed_images:
+        tramway_image.image_name = dict_new_names[tramway_image.image_name]
+    my_collection.update_image_references(list_renamed_images, 1)
+    image_hash_index.rename_images(dict_new_names)
+    rewrite_collection()
+    return len(list_renamed_images)
+
+
+def get_unhashed_images() -> List[str]:
+    """
+    Get the stored images of the collection without perceptual hash, for
+    instance the ones stored before the index of the hashes existed.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    List[str]
+        Names of the stored images, with their extension
+    """
+    return image_hash_index.get_missing_images(list(my_collection.dict_image_references))
+
+
+def start_image_reencoding() -> bool:
+    """
+    Start the re-encoding of the stored images with the profile defined in
+    the settings, if any.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    bool
+        Whether images have to be re-encoded
+    """
+    if image_reencoder is None:
+        return False
+    return image_reencoder.start(list(my_collection.dict_image_references)) > 0
+
+
+def finish_image_reencoding() -> dict:
+    """
+    Make the collection refer to the re-encoded images, once the re-encoding
+    is finished. The former files are then deleted by the collector.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    dict
+        Report of the re-encoding
+    """
+    rename_stored_images(image_reencoder.dict_new_names)
+    return image_reencoder.dict_report
+
+
+def write_collection_file(dict_collection: dict):
+    """
+    Write the collection in its json file, or in its binary file with the binary backend.
+    It is called by the saver of the collection in a background thread, with
+    the dictionary of the collection built in the main thread.
+
+    Parameters
+    ----------
+    dict_collection : dict
+        Dictionary of the collection, with the list of images of each gallery
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() == "binary":
+        save_binary_collection(
+            file_path=PATH_COLLECTION_BINARY,
+            dict_collection=dict_collection
+        )
+        return
+    save_json_file_atomic(
         file_path=PATH_COLLECTION,
         dict_to_save=dict_collection
     )
 
 
-def clean_unused_images():
-    stored_images_list = os.listdir(PATH_TRAMWAY_IMAGES)
-    saved_images_list = []
-    for gallery_list in my_collection.list_galleries:
-        gallery_images_list = gallery_list.get_list_side_images(
-            "left") + gallery_list.get_list_side_images("right")
-        for image_dict in gallery_images_list:
-            image_name = extract_filename_from_path(
-                image_dict.source, with_extension=True)
-            saved_images_list.append(image_name)
-    for image_name in stored_images_list:
-        if image_name.endswith("json"):
-            continue
-        if not image_name in saved_images_list:
-            delete_stored_image(image_name.split(".")[0])
+def prepare_collection_export():
+    """
+    Write the json file of the collection before it is exported, so that the
+    archive can be imported whatever the backend used on the other device.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    if get_collection_backend() == "journal":
+        collection_journal.compact(get_dict_collection(), wait=True)
+    elif get_collection_backend() != "json":
+        collection_saver.flush()
+        save_json_file(
+            file_path=PATH_COLLECTION,
+            dict_to_save=get_dict_collection()
+        )
+    else:
+        collection_saver.flush()
 
 
 ###############
@@ -416,5 +1654,39 @@ def clean_unused_images():
 
 # Init the load of the collection
 init_collection_image_folder()
+collection_database = CollectionDatabase(PATH_COLLECTION_DATABASE)
+collection_journal = CollectionJournal(
+    snapshot_path=PATH_COLLECTION,
+    journal_path=PATH_COLLECTION_JOURNAL
+)
+collection_shards = ShardedCollection(
+    folder_path=PATH_COLLECTION_SHARDS,
+    manifest_path=PATH_COLLECTION_MANIFEST
+)
+collection_saver = WriteBehindSaver(
+    save_function=write_collection_file,
+    delay=SETTINGS.get("save_delay", SAVE_DELAY),
+    snapshot_function=get_dict_collection
+)
 my_collection = Collection(list_galleries=[])
+my_collection.add_observer(record_journal_operation)
+my_collection.add_observer(record_database_operation)
+my_collection.add_observer(record_shard_operation)
+image_collector = ImageGarbageCollector(
+    folder_path=PATH_TRAMWAY_IMAGES,
+    check_is_referenced=my_collection.check_is_referenced
+)
+image_reencoder = None
+if SETTINGS.get("image_profile") in DICT_IMAGE_PROFILES:
+    image_reencoder = ImageReencoder(
+        manifest_path=PATH_REENCODING_MANIFEST,
+        profile=SETTINGS["image_profile"],
+        quality=SETTINGS.get("image_quality")
+    )
 update_collection()
+# Loaded after the collection, to drop the hashes of the images not used anymore
+image_hash_index = ImageHashIndex(
+    file_path=PATH_IMAGE_HASHES,
+    check_is_referenced=my_collection.check_is_referenced,
+    delay=SETTINGS.get("save_delay", SAVE_DELAY)
+)
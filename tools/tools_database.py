@@ -0,0 +1,426 @@
+"""
+Module tools database of Tramway Collector
+
+It stores the collection in an embedded SQLite database, as an alternative
+to the json file, so that a save only writes the rows that have changed.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import sqlite3
+from typing import (
+    Callable,
+    List
+)
+
+
+#################
+### Constants ###
+#################
+
+
+SQL_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS galleries (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    gallery_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    side TEXT,
+    category TEXT,
+    is_default INTEGER NOT NULL,
+    plus_plus INTEGER NOT NULL,
+    PRIMARY KEY (gallery_id, position)
+);
+"""
+
+SQL_INSERT_GALLERY = "INSERT INTO galleries (name, position) VALUES (?, ?)"
+SQL_RENAME_GALLERY = "UPDATE galleries SET name = ? WHERE id = ?"
+SQL_DELETE_GALLERY = "DELETE FROM galleries WHERE id = ?"
+SQL_REPLACE_IMAGE = "INSERT OR REPLACE INTO images " \
+    "(gallery_id, position, source, side, category, is_default, plus_plus) " \
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+SQL_DELETE_IMAGES = "DELETE FROM images WHERE gallery_id = ? AND position >= ?"
+
+
+#################
+### Functions ###
+#################
+
+
+def get_image_row(dict_image: dict) -> tuple:
+    """
+    Convert the dictionary of an image into the values of its row.
+
+    Parameters
+    ----------
+    dict_image : dict
+        Dictionary of the image, with the same keys as in the json file.
+
+    Returns
+    -------
+    tuple
+        Values of the row, without the gallery id and the position.
+    """
+    return (
+        dict_image["source"],
+        dict_image["side"],
+        dict_image["category"],
+        int(dict_image["default"]),
+        int(dict_image["plus_plus"])
+    )
+
+
+def get_dict_image(row: tuple) -> dict:
+    """
+    Convert the values of a row into the dictionary of an image.
+
+    Parameters
+    ----------
+    row : tuple
+        Values of the row, without the gallery id and the position.
+
+    Returns
+    -------
+    dict
+        Dictionary of the image, with the same keys as in the json file.
+    """
+    return {
+        "source": row[0],
+        "side": row[1],
+        "category": row[2],
+        "default": bool(row[3]),
+        "plus_plus": bool(row[4])
+    }
+
+
+###############
+### Classes ###
+###############
+
+
+class CollectionDatabase():
+    """
+    Class storing the collection in a SQLite database.
+
+    The rows written during the last load or save are kept in memory, so that
+    a save only updates the galleries and the images that have changed. The
+    galleries modified since the last save are marked as dirty, so that a save
+    only builds the rows of these galleries.
+
+    ...
+
+    Attributes
+    ----------
+    file_path : str
+        path of the database file
+    connection : sqlite3.Connection | None
+        connection to the database, None when it is closed
+    dict_saved_galleries : dict
+        state of each saved gallery, indexed by the id of the Gallery object
+    dict_gallery_ids : dict
+        id in the database of each gallery name, filled by the load
+    dict_dirty_galleries : dict
+        galleries to save, indexed by the id of the Gallery object
+    set_deleted_keys : set
+        ids of the Gallery objects deleted since the last save
+    next_position : int
+        position given to the next gallery inserted in the database
+
+    Methods
+    -------
+    connect()
+        open the connection to the database and create the tables
+    close()
+        close the connection to the database
+    migrate_json_collection(dict_collection)
+        insert a whole collection in the database in one transaction
+    load_collection()
+        load the collection with the same structure as in the json file
+    register_galleries(list_galleries, get_dict_image)
+        link the loaded galleries to their rows in the database
+    mark_gallery_dirty(gallery)
+        mark a gallery to save
+    delete_gallery(gallery)
+        mark a gallery to delete from the database
+    save_dirty_galleries(get_dict_image)
+        write in the database the rows of the dirty galleries that have changed
+    save_galleries(list_galleries, get_dict_image)
+        write in the database the rows that have changed since the last save
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.connection = None
+        self.dict_saved_galleries = {}
+        self.dict_gallery_ids = {}
+        self.dict_dirty_galleries = {}
+        self.set_deleted_keys = set()
+        self.next_position = 0
+
+    def connect(self) -> bool:
+        """
+        Open the connection to the database and create the tables if needed.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bool
+            True if the database file has just been created.
+        """
+        self.close()
+        is_new_database = not os.path.exists(self.file_path)
+        self.connection = sqlite3.connect(self.file_path)
+        self.connection.executescript(SQL_CREATE_TABLES)
+        return is_new_database
+
+    def close(self) -> None:
+        """
+        Close the connection to the database, for instance before replacing its file.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.dict_saved_galleries = {}
+        self.dict_gallery_ids = {}
+        self.dict_dirty_galleries = {}
+        self.set_deleted_keys = set()
+
+    def migrate_json_collection(self, dict_collection: dict) -> None:
+        """
+        Insert a whole collection in the database in a single transaction.
+
+        Parameters
+        ----------
+        dict_collection : dict
+            Collection with the same structure as in the json file.
+
+        Returns
+        -------
+        None
+        """
+        with self.connection:
+            for gallery_name in dict_collection:
+                cursor = self.connection.execute(
+                    SQL_INSERT_GALLERY, (gallery_name, self.next_position))
+                self.next_position += 1
+                self.connection.executemany(
+                    SQL_REPLACE_IMAGE,
+                    [(cursor.lastrowid, position) + get_image_row(dict_image)
+                     for position, dict_image in enumerate(dict_collection[gallery_name])]
+                )
+
+    def load_collection(self) -> dict:
+        """
+        Load the collection stored in the database.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            Collection with the same structure as in the json file.
+        """
+        dict_collection = {}
+        dict_gallery_names = {}
+        self.dict_gallery_ids = {}
+        self.next_position = 0
+        for gallery_id, name, position in self.connection.execute(
+                "SELECT id, name, position FROM galleries ORDER BY position"):
+            dict_collection[name] = []
+            dict_gallery_names[gallery_id] = name
+            self.dict_gallery_ids[name] = gallery_id
+            self.next_position = position + 1
+        for row in self.connection.execute(
+                "SELECT gallery_id, source, side, category, is_default, plus_plus "
+                "FROM images ORDER BY gallery_id, position"):
+            gallery_name = dict_gallery_names[row[0]]
+            dict_collection[gallery_name].append(get_dict_image(row[1:]))
+        return dict_collection
+
+    def register_galleries(self, list_galleries: list, get_dict_image: Callable) -> None:
+        """
+        Link the galleries created from the last load to their rows in the database.
+
+        Parameters
+        ----------
+        list_galleries : List[Gallery]
+            Galleries created from the result of load_collection.
+
+        get_dict_image : Callable
+            Function converting a TramwayImage into its dictionary.
+
+        Returns
+        -------
+        None
+        """
+        self.dict_saved_galleries = {}
+        self.dict_dirty_galleries = {}
+        self.set_deleted_keys = set()
+        for gallery in list_galleries:
+            self.dict_saved_galleries[id(gallery)] = {
+                "gallery": gallery,
+                "id": self.dict_gallery_ids[gallery.name],
+                "name": gallery.name,
+                "rows": [get_image_row(get_dict_image(tramway_image))
+                         for tramway_image in gallery.list_images]
+            }
+
+    def mark_gallery_dirty(self, gallery) -> None:
+        self.dict_dirty_galleries[id(gallery)] = gallery
+
+    def delete_gallery(self, gallery) -> None:
+        self.dict_dirty_galleries.pop(id(gallery), None)
+        self.set_deleted_keys.add(id(gallery))
+
+    def save_dirty_galleries(self, get_dict_image: Callable) -> int:
+        """
+        Save the galleries marked as dirty or deleted since the last save,
+        writing only their rows that have changed.
+
+        Parameters
+        ----------
+        get_dict_image : Callable
+            Function converting a TramwayImage into its dictionary.
+
+        Returns
+        -------
+        int
+            Number of rows modified in the database.
+        """
+        total_changes = self.connection.total_changes
+        with self.connection:
+            # Deleted galleries, before the galleries added again
+            for key in self.set_deleted_keys:
+                dict_saved = self.dict_saved_galleries.pop(key, None)
+                if dict_saved is None:
+                    continue
+                self.connection.execute(SQL_DELETE_GALLERY, (dict_saved["id"],))
+                self.connection.execute(
+                    SQL_DELETE_IMAGES, (dict_saved["id"], 0))
+
+            for gallery in self.dict_dirty_galleries.values():
+                self.save_gallery(gallery, get_dict_image)
+
+        self.dict_dirty_galleries = {}
+        self.set_deleted_keys = set()
+        return self.connection.total_changes - total_changes
+
+    def save_galleries(self, list_galleries: list, get_dict_image: Callable) -> int:
+        """
+        Save all the galleries, writing only the rows that have changed since
+        the last save, for instance after a modification not notified.
+
+        Parameters
+        ----------
+        list_galleries : List[Gallery]
+            Galleries of the collection, in the display order.
+
+        get_dict_image : Callable
+            Function converting a TramwayImage into its dictionary.
+
+        Returns
+        -------
+        int
+            Number of rows modified in the database.
+        """
+        set_current_keys = {id(gallery) for gallery in list_galleries}
+        self.set_deleted_keys.update(
+            key for key in self.dict_saved_galleries if key not in set_current_keys)
+        for gallery in list_galleries:
+            self.mark_gallery_dirty(gallery)
+        return self.save_dirty_galleries(get_dict_image)
+
+    def save_gallery(self, gallery, get_dict_image: Callable) -> None:
+        """
+        Write the rows of a gallery that have changed since the last save,
+        inserting the gallery if it is new.
+
+        Parameters
+        ----------
+        gallery : Gallery
+            Gallery to save.
+
+        get_dict_image : Callable
+            Function converting a TramwayImage into its dictionary.
+
+        Returns
+        -------
+        None
+        """
+        key = id(gallery)
+        list_rows = [get_image_row(get_dict_image(tramway_image))
+                     for tramway_image in gallery.list_images]
+        dict_saved = self.dict_saved_galleries.get(key)
+
+        # New gallery
+        if dict_saved is None:
+            cursor = self.connection.execute(
+                SQL_INSERT_GALLERY, (gallery.name, self.next_position))
+            self.next_position += 1
+            dict_saved = {
+                "gallery": gallery,
+                "id": cursor.lastrowid,
+                "name": gallery.name,
+                "rows": []
+            }
+            self.dict_saved_galleries[key] = dict_saved
+
+        # Renamed gallery
+        elif dict_saved["name"] != gallery.name:
+            self.connection.execute(
+                SQL_RENAME_GALLERY, (gallery.name, dict_saved["id"]))
+            dict_saved["name"] = gallery.name
+
+        self.save_image_rows(
+            dict_saved["id"], dict_saved["rows"], list_rows)
+        dict_saved["rows"] = list_rows
+
+    def save_image_rows(self, gallery_id: int, list_saved_rows: List[tuple], list_rows: List[tuple]) -> None:
+        """
+        Write the image rows of a gallery that differ from the saved ones.
+
+        Parameters
+        ----------
+        gallery_id : int
+            Id of the gallery in the database.
+
+        list_saved_rows : List[tuple]
+            Rows currently stored in the database.
+
+        list_rows : List[tuple]
+            Rows to store.
+
+        Returns
+        -------
+        None
+        """
+        list_changed_rows = []
+        for position, row in enumerate(list_rows):
+            if position >= len(list_saved_rows) or list_saved_rows[position] != row:
+                list_changed_rows.append((gallery_id, position) + row)
+        if list_changed_rows:
+            self.connection.executemany(SQL_REPLACE_IMAGE, list_changed_rows)
+        if len(list_rows) < len(list_saved_rows):
+            self.connection.execute(
+                SQL_DELETE_IMAGES, (gallery_id, len(list_rows)))
@@ -0,0 +1,439 @@
+"""
+Module tools duplicates of Tramway Collector
+
+It finds the images of the collection which look like a new photo, for
+instance when the same tramway is shot several times. Each stored image has
+a perceptual hash, the difference hash of its gradients, and the hashes are
+indexed in multi-index hash tables, so that the images within a Hamming
+distance of a photo are found without comparing it to every image of the
+collection.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+from functools import lru_cache
+from itertools import combinations
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Tuple
+)
+
+import numpy as np
+from PIL import Image as PIL_Image
+
+from tools.tools import (
+    load_json_file,
+    save_json_file_atomic
+)
+from tools.tools_image import (
+    open_image,
+    get_image_path,
+    get_thumbnail_path
+)
+from tools.tools_saver import (
+    SAVE_DELAY,
+    WriteBehindSaver
+)
+
+
+#################
+### Constants ###
+#################
+
+
+# Side of the grid of gradients, giving hashes of HASH_SIZE * HASH_SIZE bits
+HASH_SIZE = 8
+# Maximal number of different bits between the hashes of two similar images
+SIMILARITY_RADIUS = 10
+# Chunks of the hashes indexed in their own table
+NUMBER_CHUNKS = 4
+CHUNK_BITS = HASH_SIZE * HASH_SIZE // NUMBER_CHUNKS
+# Size of the thumbnail from which the hash of a stored image is computed
+HASH_THUMBNAIL_SIZE = 128
+HASH_INDEX_VERSION = 1
+
+
+#################
+### Functions ###
+#################
+
+
+def compute_image_hash(image: PIL_Image.Image) -> int:
+    """
+    Compute the difference hash of an image, whose bits tell whether the
+    brightness increases between neighbouring cells of a small grid.
+
+    Parameters
+    ----------
+    image : PIL_Image.Image
+        Image to hash.
+
+    Returns
+    -------
+    int
+        Hash of HASH_SIZE * HASH_SIZE bits.
+    """
+    grid = image.convert("L").resize(
+        (HASH_SIZE + 1, HASH_SIZE), resample=PIL_Image.BOX)
+    pixels = np.asarray(grid, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def compute_stored_image_hash(image_name: str) -> int:
+    """
+    Compute the hash of a stored image from its smallest thumbnail.
+
+    Parameters
+    ----------
+    image_name : str
+        Name of the stored image, with its extension.
+
+    Returns
+    -------
+    int
+        Hash of the image.
+    """
+    image_path = get_thumbnail_path(image_name, HASH_THUMBNAIL_SIZE)
+    if not os.path.exists(image_path):
+        image_path = get_image_path(image_name)
+    return compute_image_hash(open_image(image_path))
+
+
+def compute_stored_image_hashes(list_image_names: List[str]) -> Dict[str, int]:
+    """
+    Compute the hashes of stored images, skipping the ones which cannot be read.
+
+    Parameters
+    ----------
+    list_image_names : List[str]
+        Names of the stored images, with their extension.
+
+    Returns
+    -------
+    Dict[str, int]
+        Hash of each image.
+    """
+    dict_hashes = {}
+    for image_name in list_image_names:
+        try:
+            dict_hashes[image_name] = compute_stored_image_hash(image_name)
+        except OSError:
+            continue
+    return dict_hashes
+
+
+def get_hash_distance(first_hash: int, second_hash: int) -> int:
+    return (first_hash ^ second_hash).bit_count()
+
+
+def split_hash(image_hash: int) -> List[int]:
+    chunk_mask = (1 << CHUNK_BITS) - 1
+    return [(image_hash >> (index * CHUNK_BITS)) & chunk_mask
+            for index in range(NUMBER_CHUNKS)]
+
+
+@lru_cache(maxsize=None)
+def get_chunk_masks(chunk_radius: int) -> List[int]:
+    """
+    Get the masks flipping at most a number of bits of a chunk.
+
+    Parameters
+    ----------
+    chunk_radius : int
+        Maximal number of bits flipped.
+
+    Returns
+    -------
+    List[int]
+        Masks of the bits to flip, starting with the empty mask.
+    """
+    return [sum(1 << bit for bit in list_bits)
+            for number_bits in range(min(chunk_radius, CHUNK_BITS) + 1)
+            for list_bits in combinations(range(CHUNK_BITS), number_bits)]
+
+
+###############
+### Classes ###
+###############
+
+
+class MultiIndexHashTable():
+    """
+    Class indexing hashes in several hash tables, one per chunk of their bits.
+
+    When two hashes differ by at most radius bits, one of their NUMBER_CHUNKS
+    chunks differs by at most radius // NUMBER_CHUNKS bits. A search thus
+    only compares the hashes sharing a bucket with one of the close variants
+    of the chunks of the searched hash, instead of all the hashes.
+
+    ...
+
+    Attributes
+    ----------
+    list_tables : List[Dict[int, List[int]]]
+        hashes indexed by the value of each of their chunks
+    dict_names : Dict[int, List[str]]
+        names of the images of each hash
+
+    Methods
+    -------
+    add(image_hash, image_name)
+        add the hash of an image
+    search(image_hash, radius)
+        find the images within a distance of a hash
+    """
+
+    def __init__(self) -> None:
+        self.list_tables: List[Dict[int, List[int]]] = [{} for _ in range(NUMBER_CHUNKS)]
+        self.dict_names: Dict[int, List[str]] = {}
+
+    def add(self, image_hash: int, image_name: str) -> None:
+        """
+        Add the hash of an image to the tables.
+
+        Parameters
+        ----------
+        image_hash : int
+            Hash of the image.
+
+        image_name : str
+            Name of the image.
+
+        Returns
+        -------
+        None
+        """
+        if image_hash in self.dict_names:
+            if image_name not in self.dict_names[image_hash]:
+                self.dict_names[image_hash].append(image_name)
+            return
+        self.dict_names[image_hash] = [image_name]
+        for table, chunk in zip(self.list_tables, split_hash(image_hash)):
+            table.setdefault(chunk, []).append(image_hash)
+
+    def search(self, image_hash: int, radius: int) -> List[Tuple[int, str]]:
+        """
+        Find the images whose hash is within a distance of a hash.
+
+        Parameters
+        ----------
+        image_hash : int
+            Hash to search.
+
+        radius : int
+            Maximal distance of the hashes.
+
+        Returns
+        -------
+        List[Tuple[int, str]]
+            Distance and name of the images found, from the closest to the farthest.
+        """
+        list_masks = get_chunk_masks(radius // NUMBER_CHUNKS)
+        set_candidates = set()
+        for table, chunk in zip(self.list_tables, split_hash(image_hash)):
+            for mask in list_masks:
+                set_candidates.update(table.get(chunk ^ mask, ()))
+        list_results = []
+        for candidate_hash in set_candidates:
+            distance = get_hash_distance(image_hash, candidate_hash)
+            if distance <= radius:
+                list_results += [(distance, image_name)
+                                 for image_name in self.dict_names[candidate_hash]]
+        list_results.sort()
+        return list_results
+
+
+class ImageHashIndex():
+    """
+    Class keeping the hashes of the stored images and finding the images of
+    the collection similar to a photo.
+
+    The hashes are indexed by name of stored image, the names being derived
+    from the content of the images, and are saved in a json file. The hashes
+    of the images removed from the collection are dropped at the next start.
+
+    ...
+
+    Attributes
+    ----------
+    file_path : str
+        path of the json file of the hashes
+    check_is_referenced : Callable[[str], bool]
+        function telling whether a stored image is used by the collection
+    dict_hashes : Dict[str, int]
+        hash of each stored image
+    table : MultiIndexHashTable
+        tables of the hashes, built at the first search
+
+    Methods
+    -------
+    reload()
+        replace the hashes by the ones of the json file, for instance after an import
+    add_image(image_name, image_hash)
+        add the hash of a stored image
+    add_images(dict_hashes)
+        add the hashes of several stored images
+    rename_images(dict_new_names)
+        move the hashes of stored images to their new names
+    get_missing_images(list_image_names)
+        get the stored images without hash
+    find_similar_images(image_hash, radius=SIMILARITY_RADIUS)
+        find the images of the collection similar to a hash
+    split_similar_images(list_image_names, dict_hashes, radius=SIMILARITY_RADIUS)
+        separate the new images from the ones similar to other images
+    """
+
+    def __init__(self, file_path: str, check_is_referenced: Callable[[str], bool],
+                 delay=SAVE_DELAY) -> None:
+        self.file_path = file_path
+        self.check_is_referenced = check_is_referenced
+        self.dict_hashes: Dict[str, int] = {}
+        self.table = None
+        self.saver = WriteBehindSaver(save_function=self.save, delay=delay)
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.file_path):
+            return
+        dict_content = load_json_file(self.file_path)
+        if dict_content.get("version") != HASH_INDEX_VERSION:
+            return
+        self.dict_hashes = {
+            image_name: int(hex_hash, 16)
+            for image_name, hex_hash in dict_content["hashes"].items()
+            if self.check_is_referenced(image_name)}
+
+    def reload(self) -> None:
+        # The hashes waiting to be saved belong to the previous collection
+        self.saver.cancel()
+        self.dict_hashes = {}
+        self.table = None
+        self.load()
+
+    def save(self) -> None:
+        # The copy is made at once, the hashes being added in the main thread
+        dict_hashes = dict(self.dict_hashes)
+        save_json_file_atomic(self.file_path, {
+            "version": HASH_INDEX_VERSION,
+            "hashes": {image_name: format(image_hash, "x")
+                       for image_name, image_hash in dict_hashes.items()}
+        })
+
+    def get_table(self) -> MultiIndexHashTable:
+        if self.table is None:
+            self.table = MultiIndexHashTable()
+            for image_name, image_hash in self.dict_hashes.items():
+                self.table.add(image_hash, image_name)
+        return self.table
+
+    def add_image(self, image_name: str, image_hash: int) -> None:
+        self.add_images({image_name: image_hash})
+
+    def add_images(self, dict_hashes: Dict[str, int]) -> None:
+        """
+        Add the hashes of stored images to the index.
+
+        Parameters
+        ----------
+        dict_hashes : Dict[str, int]
+            Hash of each stored image.
+
+        Returns
+        -------
+        None
+        """
+        is_modified = False
+        for image_name, image_hash in dict_hashes.items():
+            if image_name in self.dict_hashes:
+                continue
+            self.dict_hashes[image_name] = image_hash
+            if self.table is not None:
+                self.table.add(image_hash, image_name)
+            is_modified = True
+        if is_modified:
+            self.saver.mark_dirty()
+
+    def rename_images(self, dict_new_names: Dict[str, str]) -> None:
+        """
+        Give the hashes of stored images to their new names, the new files
+        having the same content, for instance after their re-encoding.
+
+        Parameters
+        ----------
+        dict_new_names : Dict[str, str]
+            New name of the stored images, with their extension.
+
+        Returns
+        -------
+        None
+        """
+        self.add_images({
+            new_name: self.dict_hashes[image_name]
+            for image_name, new_name in dict_new_names.items()
+            if image_name in self.dict_hashes})
+
+    def get_missing_images(self, list_image_names: List[str]) -> List[str]:
+        return [image_name for image_name in list_image_names
+                if image_name not in self.dict_hashes]
+
+    def find_similar_images(self, image_hash: int, radius=SIMILARITY_RADIUS) -> List[str]:
+        """
+        Find the images of the collection whose hash is within a distance of a hash.
+
+        Parameters
+        ----------
+        image_hash : int
+            Hash of a photo.
+
+        radius : int, optional (default is SIMILARITY_RADIUS)
+            Maximal number of different bits.
+
+        Returns
+        -------
+        List[str]
+            Names of the stored images, from the most similar to the least similar.
+        """
+        return [image_name for _, image_name in self.get_table().search(image_hash, radius)
+                if self.check_is_referenced(image_name)]
+
+    def split_similar_images(self, list_image_names: List[str], dict_hashes: Dict[str, int],
+                             radius=SIMILARITY_RADIUS) -> Tuple[List[str], List[str]]:
+        """
+        Separate imported images into the ones looking new and the ones
+        similar to an image of the collection or to a previous imported image.
+
+        Parameters
+        ----------
+        list_image_names : List[str]
+            Names of the imported images, in the order of the import.
+
+        dict_hashes : Dict[str, int]
+            Hash of each imported image.
+
+        radius : int, optional (default is SIMILARITY_RADIUS)
+            Maximal number of different bits.
+
+        Returns
+        -------
+        Tuple[List[str], List[str]]
+            Names of the new images and names of the similar images.
+        """
+        list_new_images = []
+        list_similar_images = []
+        import_table = MultiIndexHashTable()
+        for image_name in list_image_names:
+            image_hash = dict_hashes[image_name]
+            if self.find_similar_images(image_hash, radius) or \
+                    import_table.search(image_hash, radius):
+                list_similar_images.append(image_name)
+            else:
+                list_new_images.append(image_name)
+            import_table.add(image_hash, image_name)
+        return list_new_images, list_similar_images
@@ -0,0 +1,204 @@
+"""
+Module tools gc of Tramway Collector
+
+It deletes the stored images which are not referenced by the collection
+anymore. The sweep is incremental, so that it can be spread over the frames
+of the application instead of stalling its start or its stop.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List
+)
+
+from tools.tools_image import (
+    IMAGE_EXT,
+    get_original_image_name,
+    iterate_stored_images
+)
+
+
+#################
+### Constants ###
+#################
+
+
+# Maximal duration in seconds of a step of the sweep
+GC_TIME_BUDGET = 0.004
+
+# Age in seconds under which an unreferenced image is kept, since it may be
+# stored by a worker and not registered as pending yet
+GC_GRACE_PERIOD = 60
+
+
+###############
+### Classes ###
+###############
+
+
+class ImageGarbageCollector():
+    """
+    Class sweeping the stored images to delete the ones which are not referenced.
+
+    ...
+
+    Attributes
+    ----------
+    folder_path : str
+        folder of the collection
+    check_is_referenced : Callable[[str], bool]
+        function checking whether the name of an image is referenced by the collection
+    grace_period : float
+        age in seconds under which an unreferenced image is kept
+    dict_pending_images : Dict[str, int]
+        number of holders of each stored image not referenced yet, which
+        must be kept whatever its age
+    dict_report : dict
+        report of the current sweep, with the number of images checked, the
+        names of the unreferenced images and their total size in bytes
+
+    Methods
+    -------
+    add_pending_images(list_image_names)
+        keep stored images until they are referenced or dropped
+    remove_pending_images(list_image_names)
+        release stored images kept by add_pending_images
+    start(dry_run=False)
+        start a new sweep
+    step(time_budget=GC_TIME_BUDGET)
+        continue the current sweep during the given time
+    stop()
+        stop the current sweep
+    sweep(dry_run=False)
+        run a whole sweep and get its report
+    """
+
+    def __init__(self, folder_path: str, check_is_referenced: Callable[[str], bool],
+                 grace_period=GC_GRACE_PERIOD) -> None:
+        self.folder_path = folder_path
+        self.check_is_referenced = check_is_referenced
+        self.grace_period = grace_period
+        self.dict_pending_images: Dict[str, int] = {}
+        self.dry_run = False
+        self.iterator_images = None
+        self.dict_report = {}
+
+    def add_pending_images(self, list_image_names: List[str]) -> None:
+        for image_name in list_image_names:
+            self.dict_pending_images[image_name] = \
+                self.dict_pending_images.get(image_name, 0) + 1
+
+    def remove_pending_images(self, list_image_names: List[str]) -> None:
+        for image_name in list_image_names:
+            number_holders = self.dict_pending_images.get(image_name, 0) - 1
+            if number_holders > 0:
+                self.dict_pending_images[image_name] = number_holders
+            else:
+                self.dict_pending_images.pop(image_name, None)
+
+    def iterate_images(self) -> Iterator[os.DirEntry]:
+        # The images left in the former flat layout come first
+        for image_file in os.scandir(self.folder_path):
+            if image_file.is_file() and image_file.name.endswith(IMAGE_EXT):
+                yield image_file
+        yield from iterate_stored_images(self.folder_path)
+
+    def start(self, dry_run=False) -> None:
+        """
+        Start a new sweep of the stored images.
+
+        Parameters
+        ----------
+        dry_run : bool, optional (default is False)
+            Whether to only report the unreferenced images instead of deleting them.
+
+        Returns
+        -------
+        None
+        """
+        self.dry_run = dry_run
+        self.iterator_images = self.iterate_images()
+        self.dict_report = {
+            "number_images": 0,
+            "list_unused_images": [],
+            "unused_size": 0
+        }
+
+    def step(self, time_budget=GC_TIME_BUDGET) -> bool:
+        """
+        Continue the current sweep until the time budget is spent.
+
+        Parameters
+        ----------
+        time_budget : float, optional (default is GC_TIME_BUDGET)
+            Maximal duration of the step in seconds.
+
+        Returns
+        -------
+        bool
+            Whether the sweep is finished.
+        """
+        if self.iterator_images is None:
+            return True
+        end_time = time.monotonic() + time_budget
+        try:
+            for image_file in self.iterator_images:
+                self.check_image(image_file)
+                if time.monotonic() >= end_time:
+                    return False
+        except FileNotFoundError:
+            # The folder has been deleted during the sweep
+            pass
+        self.iterator_images = None
+        return True
+
+    def stop(self) -> None:
+        self.iterator_images = None
+
+    def check_image(self, image_file: os.DirEntry) -> None:
+        self.dict_report["number_images"] += 1
+        # The thumbnails are kept with their original image
+        image_name = get_original_image_name(image_file.name)
+        if self.check_is_referenced(image_name) or image_name in self.dict_pending_images:
+            return
+        try:
+            stat = image_file.stat()
+        except FileNotFoundError:
+            return
+        if time.time() - stat.st_mtime < self.grace_period:
+            return
+        if not self.dry_run:
+            try:
+                os.remove(image_file.path)
+            except FileNotFoundError:
+                return
+        self.dict_report["list_unused_images"].append(image_file.name)
+        self.dict_report["unused_size"] += stat.st_size
+
+    def sweep(self, dry_run=False) -> dict:
+        """
+        Run a whole sweep of the stored images.
+
+        Parameters
+        ----------
+        dry_run : bool, optional (default is False)
+            Whether to only report the unreferenced images instead of deleting them.
+
+        Returns
+        -------
+        dict
+            Report of the sweep.
+        """
+        self.start(dry_run=dry_run)
+        while not self.step(time_budget=float("inf")):
+            pass
+        return self.dict_report
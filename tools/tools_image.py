@@ -5,8 +5,14 @@
 ### Python imports ###
 
 import os
-import shutil
-import random
+import hashlib
+from concurrent.futures import Future
+from math import ceil
+from typing import (
+    Dict,
+    Iterator,
+    List
+)
 from PIL import Image as PIL_Image
 
 ### Module imports ###
@@ -16,6 +22,7 @@ from tools.tools import (
     PATH_TRAMWAY_IMAGES,
     extract_filename_from_path
 )
+from tools.tools_tasks import collection_worker
 
 #################
 ### Constants ###
@@ -23,6 +30,20 @@ from tools.tools import (
 
 IMAGE_BASE_SIZE = (500, 500)
 IMAGE_EXT = ".jpg"
+# Formats of the stored images, depending on their extension
+DICT_IMAGE_FORMATS = {".jpg": "JPEG", ".webp": "WEBP"}
+# Encoding options of the images stored by default
+DICT_IMAGE_OPTIONS = {"optimize": True, "quality": 90}
+# Ratio between the decoded size and the final size above which the image is
+# first reduced with a cheap filter before the LANCZOS filter
+IMAGE_REDUCING_GAP = 3.0
+# Number of hexadecimal characters of the hash naming the stored images
+IMAGE_HASH_LENGTH = 32
+# Number of characters of the name of the images used by each level of folders
+IMAGE_FOLDER_LENGTH = 2
+# Sizes in pixels of the smaller variants of the stored images
+LIST_THUMBNAIL_SIZES = [128, 256]
+THUMBNAIL_SEPARATOR = "_"
 
 #################
 ### Functions ###
@@ -33,7 +54,35 @@ def open_image(path: str) -> PIL_Image:
     return PIL_Image.open(path)
 
 
-def crop_image_to_square(image: PIL_Image.Image) -> PIL_Image.Image:
+def open_image_reduced(path: str, min_size=IMAGE_BASE_SIZE[0]) -> PIL_Image.Image:
+    """
+    Open an image, the JPEG files being decoded at the lowest resolution
+    whose smallest side still covers the given size. It bounds the memory
+    used to decode large photos and panoramas.
+
+    Parameters
+    ----------
+    path : str
+        Path of the image.
+
+    min_size : int, optional (default is the size of the stored images)
+        Minimal size in pixels of the smallest side of the decoded image.
+
+    Returns
+    -------
+    PIL_Image.Image
+        Image, not decoded yet.
+    """
+    image = PIL_Image.open(path)
+    if image.format == "JPEG":
+        width, height = image.size
+        scale = min_size / min(width, height)
+        if scale < 1:
+            image.draft("RGB", (ceil(width * scale), ceil(height * scale)))
+    return image
+
+
+def crop_image_to_square(image: PIL_Image.Image, reducing_gap=None) -> PIL_Image.Image:
     width, height = image.size
     smallest_dim = min(width, height)
 
@@ -43,30 +92,244 @@ def crop_image_to_square(image: PIL_Image.Image) -> PIL_Image.Image:
     v_rest = height - smallest_dim
     v_offset = v_rest // 2
 
-    image = image.crop((h_offset,
-                        v_offset,
-                        h_offset + smallest_dim,
-                        v_offset + smallest_dim))
-
+    # The crop is done by the resize, without copying the cropped image
     image = image.resize(
         IMAGE_BASE_SIZE,
-        resample=PIL_Image.LANCZOS)
+        resample=PIL_Image.LANCZOS,
+        box=(h_offset,
+             v_offset,
+             h_offset + smallest_dim,
+             v_offset + smallest_dim),
+        reducing_gap=reducing_gap)
 
     return image
 
 
+def prepare_square_image(input_path: str) -> PIL_Image.Image:
+    """
+    Decode a photo and crop it to a square image of the size of the stored
+    images, kept in memory.
+
+    Parameters
+    ----------
+    input_path : str
+        Path of the photo.
+
+    Returns
+    -------
+    PIL_Image.Image
+        Square RGB image, decoded.
+    """
+    image = open_image_reduced(input_path)
+    image = crop_image_to_square(image, reducing_gap=IMAGE_REDUCING_GAP)
+    return image.convert(mode="RGB")
+
+
 def save_temp_image(image: PIL_Image.Image) -> None:
     image = image.convert(mode="RGB")
     image.save(PATH_TEMP_IMAGE, optimize=True, quality=90)
 
 
+def get_image_path(image_file_name: str) -> str:
+    """
+    Get the path of a stored image. The images are spread in two levels of
+    folders named after the first characters of their name, to keep the
+    folders small.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    Returns
+    -------
+    str
+        Path of the image.
+    """
+    return PATH_TRAMWAY_IMAGES + image_file_name[:IMAGE_FOLDER_LENGTH] + "/" + \
+        image_file_name[IMAGE_FOLDER_LENGTH:2 * IMAGE_FOLDER_LENGTH] + "/" + image_file_name
+
+
+def get_image_format(image_path: str) -> str:
+    return DICT_IMAGE_FORMATS[os.path.splitext(image_path)[1]]
+
+
+def add_size_to_path(image_path: str, size: int) -> str:
+    root, ext = os.path.splitext(image_path)
+    return root + THUMBNAIL_SEPARATOR + str(size) + ext
+
+
+def get_thumbnail_path(image_file_name: str, size: int) -> str:
+    return add_size_to_path(get_image_path(image_file_name), size)
+
+
+def get_original_image_name(image_file_name: str) -> str:
+    """
+    Get the name of the stored image from which a thumbnail has been created.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of a stored image or of one of its thumbnails, with its extension.
+
+    Returns
+    -------
+    str
+        Name of the stored image, with its extension.
+    """
+    root, ext = os.path.splitext(image_file_name)
+    image_name, separator, size = root.rpartition(THUMBNAIL_SEPARATOR)
+    if separator and size.isdigit():
+        return image_name + ext
+    return image_file_name
+
+
+def create_thumbnails(image_file_name: str, list_sizes=LIST_THUMBNAIL_SIZES, dict_options=DICT_IMAGE_OPTIONS) -> None:
+    """
+    Create the smaller variants of a stored image.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    list_sizes : List[int], optional (default is LIST_THUMBNAIL_SIZES)
+        Sizes of the variants to create, in pixels.
+
+    dict_options : dict, optional (default is DICT_IMAGE_OPTIONS)
+        Encoding options of the variants, in the format of the stored image.
+
+    Returns
+    -------
+    None
+    """
+    image = open_image(get_image_path(image_file_name))
+    for size in list_sizes:
+        thumbnail_path = get_thumbnail_path(image_file_name, size)
+        thumbnail = image.resize((size, size), resample=PIL_Image.LANCZOS)
+        temp_path = thumbnail_path + ".tmp"
+        thumbnail.convert(mode="RGB").save(
+            temp_path, format=get_image_format(thumbnail_path), **dict_options)
+        os.replace(temp_path, thumbnail_path)
+        SET_THUMBNAIL_PATHS.add(thumbnail_path)
+
+
+def request_thumbnails(image_file_name: str) -> Future:
+    """
+    Create the variants of a stored image in the background, the image being
+    sent once to the worker until its variants are created.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    Returns
+    -------
+    Future
+        Future of the creation of the variants.
+    """
+    if image_file_name in DICT_THUMBNAIL_FUTURES:
+        return DICT_THUMBNAIL_FUTURES[image_file_name]
+    future = collection_worker.submit(create_thumbnails, image_file_name)
+    DICT_THUMBNAIL_FUTURES[image_file_name] = future
+    # The image can be requested again once done, even if the task is cancelled
+    future.add_done_callback(
+        lambda future: DICT_THUMBNAIL_FUTURES.pop(image_file_name, None))
+    return future
+
+
+def get_image_source(image_file_name: str, pixel_size=None) -> str:
+    """
+    Get the path of the smallest variant of a stored image covering the given
+    size. A missing variant is created in the background, the image being
+    displayed in its full size meanwhile.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    pixel_size : float, optional (default is None)
+        Size in pixels of the widget displaying the image, None to get the
+        image in its full size.
+
+    Returns
+    -------
+    str
+        Path of the variant of the image.
+    """
+    if pixel_size is not None:
+        for size in LIST_THUMBNAIL_SIZES:
+            if size < pixel_size:
+                continue
+            thumbnail_path = get_thumbnail_path(image_file_name, size)
+            if thumbnail_path in SET_THUMBNAIL_PATHS or os.path.exists(thumbnail_path):
+                SET_THUMBNAIL_PATHS.add(thumbnail_path)
+                return thumbnail_path
+            request_thumbnails(image_file_name)
+            break
+    return get_image_path(image_file_name)
+
+
+def create_image_folder(image_path: str) -> None:
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+
+
+def iterate_stored_images(folder_path=PATH_TRAMWAY_IMAGES) -> Iterator[os.DirEntry]:
+    """
+    Iterate over the images stored in the folders of the collection, one
+    folder being listed at a time.
+
+    Parameters
+    ----------
+    folder_path : str, optional (default is PATH_TRAMWAY_IMAGES)
+        Folder of the collection.
+
+    Returns
+    -------
+    Iterator[os.DirEntry]
+        Entries of the stored images.
+    """
+    for first_folder in os.scandir(folder_path):
+        if not first_folder.is_dir() or len(first_folder.name) != IMAGE_FOLDER_LENGTH:
+            continue
+        for second_folder in os.scandir(first_folder.path):
+            if not second_folder.is_dir():
+                continue
+            for image_file in os.scandir(second_folder.path):
+                if image_file.name.endswith(tuple(DICT_IMAGE_FORMATS)):
+                    yield image_file
+
+
+def list_stored_images() -> List[str]:
+    """
+    List the names of the images stored in the folders of the collection.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    List[str]
+        Names of the stored images, with their extension.
+    """
+    return [image_file.name for image_file in iterate_stored_images()]
+
+
 def save_image(image: PIL_Image.Image, name: str) -> None:
-    image.save(PATH_TRAMWAY_IMAGES + name + IMAGE_EXT)
+    image_path = get_image_path(name + IMAGE_EXT)
+    create_image_folder(image_path)
+    image.save(image_path)
 
 
-def copy_as_square(input_path: str, temp=False) -> str:
-    image = open_image(input_path)
-    image = crop_image_to_square(image)
+def copy_as_square(input_path: str, temp=False, fast=True) -> str:
+    if fast:
+        image = prepare_square_image(input_path)
+    else:
+        image = open_image(input_path)
+        image = crop_image_to_square(image)
     image_name = extract_filename_from_path(input_path)
     if temp:
         save_temp_image(image)
@@ -76,27 +339,194 @@ def copy_as_square(input_path: str, temp=False) -> str:
         return image_name + IMAGE_EXT
 
 
-def transfer_temp_image(new_image_name: str) -> None:
-    shutil.copy(PATH_TEMP_IMAGE, PATH_TRAMWAY_IMAGES +
-                new_image_name + IMAGE_EXT)
+def get_image_hash(file_path: str) -> str:
+    """
+    Compute the hash of the content of an image, used as its name in the collection.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the image.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash of the image.
+    """
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:IMAGE_HASH_LENGTH]
+
+
+def check_is_hash_name(image_name: str) -> bool:
+    return len(image_name) == IMAGE_HASH_LENGTH and \
+        all(character in "0123456789abcdef" for character in image_name)
+
+
+def store_image(image: PIL_Image.Image, staging_path: str, dict_options=DICT_IMAGE_OPTIONS) -> str:
+    """
+    Store an image in the collection under the hash of its content, with its
+    thumbnails. The files are first written at the staging path, so that
+    several images can be stored in parallel.
+
+    Parameters
+    ----------
+    image : PIL_Image.Image
+        Square image to store.
+
+    staging_path : str
+        Temporary path of the image, used by this image only. Its extension
+        gives the format of the stored image.
+
+    dict_options : dict, optional (default is DICT_IMAGE_OPTIONS)
+        Encoding options of the image and of its thumbnails.
+
+    Returns
+    -------
+    str
+        Name of the stored image, with its extension.
+    """
+    image = image.convert(mode="RGB")
+    image.save(staging_path, format=get_image_format(staging_path), **dict_options)
+    return store_staged_image(image, staging_path, dict_options)
+
 
+def store_staged_image(image: PIL_Image.Image, staging_path: str, dict_options=DICT_IMAGE_OPTIONS) -> str:
+    """
+    Move an image already written at its staging path into the collection,
+    under the hash of its content, and create its thumbnails.
 
-def create_new_image_name():
-    image_names = os.listdir(PATH_TRAMWAY_IMAGES)
-    new_name = str(random.randint(0, 1e9))
-    while new_name + IMAGE_EXT in image_names:
-        new_name = str(random.randint(0, 1e9))
-    return new_name
+    Parameters
+    ----------
+    image : PIL_Image.Image
+        Square image written at the staging path, in RGB mode.
+
+    staging_path : str
+        Temporary path of the image, used by this image only.
+
+    dict_options : dict, optional (default is DICT_IMAGE_OPTIONS)
+        Encoding options of the thumbnails.
+
+    Returns
+    -------
+    str
+        Name of the stored image, with its extension.
+    """
+    image_format = get_image_format(staging_path)
+    image_file_name = get_image_hash(staging_path) + os.path.splitext(staging_path)[1]
+    image_path = get_image_path(image_file_name)
+    if os.path.exists(image_path):
+        os.remove(staging_path)
+        # Give the unreferenced files the grace period of the new files
+        for path in [image_path] + [get_thumbnail_path(image_file_name, size)
+                                    for size in LIST_THUMBNAIL_SIZES]:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+        return image_file_name
+    create_image_folder(image_path)
+    # The thumbnails are moved first, so that a stored image always has them
+    for size in LIST_THUMBNAIL_SIZES:
+        thumbnail_staging_path = add_size_to_path(staging_path, size)
+        thumbnail = image.resize((size, size), resample=PIL_Image.LANCZOS)
+        thumbnail.save(thumbnail_staging_path, format=image_format, **dict_options)
+        os.replace(thumbnail_staging_path, get_thumbnail_path(image_file_name, size))
+    os.replace(staging_path, image_path)
+    return image_file_name
+
+
+def get_migrated_image_name(image_file_name: str) -> str:
+    """
+    Get the name of an image stored directly in the folder of the collection
+    once moved into its folders, which is the hash of its content if it is
+    not named this way yet. The image is not moved.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    Returns
+    -------
+    str
+        New name of the stored image, with its extension.
+    """
+    image_path = PATH_TRAMWAY_IMAGES + image_file_name
+    if not image_file_name.endswith(IMAGE_EXT) or not os.path.isfile(image_path):
+        return image_file_name
+    if check_is_hash_name(image_file_name[:-len(IMAGE_EXT)]):
+        return image_file_name
+    return get_image_hash(image_path) + IMAGE_EXT
+
+
+def migrate_image_name(image_file_name: str) -> str:
+    """
+    Move an image stored directly in the folder of the collection into its
+    folders, renaming it after the hash of its content if it is not named
+    this way yet.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    Returns
+    -------
+    str
+        New name of the stored image, with its extension.
+    """
+    image_path = PATH_TRAMWAY_IMAGES + image_file_name
+    if not image_file_name.endswith(IMAGE_EXT) or not os.path.isfile(image_path):
+        return image_file_name
+    new_image_file_name = get_migrated_image_name(image_file_name)
+    new_image_path = get_image_path(new_image_file_name)
+    # The file of a duplicate image is replaced by the one already stored
+    if os.path.exists(new_image_path):
+        os.remove(image_path)
+    else:
+        create_image_folder(new_image_path)
+        os.replace(image_path, new_image_path)
+    return new_image_file_name
+
+
+def migrate_flat_images() -> int:
+    """
+    Move all the images stored directly in the folder of the collection into
+    their folders.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    int
+        Number of images moved.
+    """
+    # The names are listed first, the folder being modified by the moves
+    list_image_file_names = [
+        image_file.name for image_file in os.scandir(PATH_TRAMWAY_IMAGES)
+        if image_file.is_file() and image_file.name.endswith(IMAGE_EXT)]
+    for image_file_name in list_image_file_names:
+        migrate_image_name(image_file_name)
+    return len(list_image_file_names)
 
 
 def delete_stored_image(image_name):
-    os.remove(PATH_TRAMWAY_IMAGES + image_name + IMAGE_EXT)
+    os.remove(get_image_path(image_name + IMAGE_EXT))
+    for size in LIST_THUMBNAIL_SIZES:
+        thumbnail_path = get_thumbnail_path(image_name + IMAGE_EXT, size)
+        SET_THUMBNAIL_PATHS.discard(thumbnail_path)
+        if os.path.exists(thumbnail_path):
+            os.remove(thumbnail_path)
 
 
-def compress_images_in_folder(folder_path):
-    images_list = os.listdir(folder_path)
-    for image_name in images_list:
-        image = open_image(folder_path + image_name)
-        # os.remove(folder_path + image_name)
-        image = crop_image_to_square(image)
-        image.save(folder_path + image_name.replace(".png", ".jpg"))
+###############
+### Process ###
+###############
+
+
+# Paths of the thumbnails known to exist, to avoid checking the disk each time
+SET_THUMBNAIL_PATHS = set()
+# Creations of thumbnails in progress in the background, per image
+DICT_THUMBNAIL_FUTURES: Dict[str, Future] = {}
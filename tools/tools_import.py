@@ -0,0 +1,287 @@
+"""
+Module tools import of Tramway Collector
+
+It imports several photos at once into the collection. The photos are
+decoded, cropped, encoded and stored by a pool of worker processes, each
+photo being written in its own staging slot, so that the throughput grows
+with the number of cores. Where the processes cannot be forked, the photos
+are processed by threads, Pillow releasing the GIL while it decodes and
+encodes.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed
+)
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union
+)
+
+from tools.tools import (
+    ALLOWED_PICTURES_EXTENSIONS,
+    MOBILE_MODE,
+    PATH_TEMP_FOLDER
+)
+from tools.tools_image import (
+    IMAGE_EXT,
+    prepare_square_image,
+    store_image
+)
+from tools.tools_duplicates import compute_image_hash
+
+
+#################
+### Constants ###
+#################
+
+
+STAGING_PREFIX = "import_"
+
+
+#################
+### Functions ###
+#################
+
+
+def list_image_files(list_paths: List[str]) -> List[str]:
+    """
+    List the photos to import from a selection of files and folders. The
+    photos of a folder are sorted by name, and each photo is listed once.
+
+    Parameters
+    ----------
+    list_paths : List[str]
+        Paths of the selected files and folders.
+
+    Returns
+    -------
+    List[str]
+        Paths of the photos.
+    """
+    list_image_paths = []
+    set_image_paths = set()
+    for path in list_paths:
+        if os.path.isdir(path):
+            list_folder_paths = sorted(
+                os.path.join(path, file_name) for file_name in os.listdir(path))
+        else:
+            list_folder_paths = [path]
+        for image_path in list_folder_paths:
+            real_path = os.path.realpath(image_path)
+            if not os.path.isfile(image_path) or real_path in set_image_paths:
+                continue
+            if os.path.splitext(image_path)[1].lower() in ALLOWED_PICTURES_EXTENSIONS:
+                set_image_paths.add(real_path)
+                list_image_paths.append(image_path)
+    return list_image_paths
+
+
+def import_image_file(input_path: str, staging_path: str) -> Tuple[str, int]:
+    """
+    Crop a photo to a square, store it in the collection and compute its
+    perceptual hash. This function is run by the workers of the import.
+
+    Parameters
+    ----------
+    input_path : str
+        Path of the photo.
+
+    staging_path : str
+        Temporary path of the image, used by this photo only.
+
+    Returns
+    -------
+    Tuple[str, int]
+        Name of the stored image, with its extension, and hash of the image.
+    """
+    square_image = prepare_square_image(input_path)
+    return store_image(square_image, staging_path), compute_image_hash(square_image)
+
+
+def create_executor(max_workers=None) -> Executor:
+    """
+    Create a pool of workers for the processing of images, with processes
+    when they are forked and with threads otherwise. A spawned process would
+    import the whole application again before its first image, and Android
+    cannot fork, while Pillow releases the GIL while it decodes and encodes.
+
+    Parameters
+    ----------
+    max_workers : int, optional (default is None)
+        Number of workers, None to use one worker per core.
+
+    Returns
+    -------
+    Executor
+        Pool of workers.
+    """
+    if not MOBILE_MODE and multiprocessing.get_start_method() == "fork":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def import_images(list_paths: List[str], progress_callback: Union[Callable[[int, int], None], None] = None,
+                  max_workers=None) -> Tuple[List[str], List[str]]:
+    """
+    Import photos into the collection, waiting for the end of the import.
+
+    Parameters
+    ----------
+    list_paths : List[str]
+        Paths of the selected files and folders.
+
+    progress_callback : Callable[[int, int], None], optional (default is None)
+        Function called with the number of photos imported and the total
+        number of photos, each time a photo is imported.
+
+    max_workers : int, optional (default is None)
+        Number of workers, None to use one worker per core.
+
+    Returns
+    -------
+    Tuple[List[str], List[str]]
+        Names of the stored images in the order of the photos, and paths of
+        the photos which could not be imported.
+    """
+    bulk_import = BulkImport(list_paths, max_workers=max_workers)
+    bulk_import.start()
+    for _ in as_completed(bulk_import.list_futures):
+        if progress_callback is not None:
+            progress_callback(bulk_import.count_done(), bulk_import.number_images)
+    bulk_import.poll()
+    return bulk_import.list_image_names, bulk_import.list_failed_paths
+
+
+###############
+### Classes ###
+###############
+
+
+class BulkImport():
+    """
+    Class importing several photos in parallel, polled by the interface to
+    follow its progress without blocking.
+
+    ...
+
+    Attributes
+    ----------
+    list_image_paths : List[str]
+        paths of the photos to import
+    number_images : int
+        number of photos to import
+    number_done : int
+        number of photos processed, imported or not
+    list_image_names : List[str]
+        names of the stored images, in the order of the photos, once the import is finished
+    dict_image_hashes : Dict[str, int]
+        perceptual hash of each stored image
+    list_failed_paths : List[str]
+        paths of the photos which could not be imported
+
+    Methods
+    -------
+    start()
+        send the photos to the workers
+    poll()
+        update the progress and check whether the import is finished
+    get_stored_image_names()
+        get the names of the images already stored
+    cancel()
+        cancel the photos not processed yet
+    """
+
+    def __init__(self, list_paths: List[str], max_workers=None) -> None:
+        self.list_image_paths = list_image_files(list_paths)
+        self.number_images = len(self.list_image_paths)
+        self.number_done = 0
+        self.max_workers = max_workers
+        self.executor: Union[Executor, None] = None
+        self.staging_folder = ""
+        self.list_futures: List[Future] = []
+        self.list_image_names: List[str] = []
+        self.dict_image_hashes: Dict[str, int] = {}
+        self.list_failed_paths: List[str] = []
+
+    def start(self) -> None:
+        """
+        Send the photos to the workers, each one with its own staging slot.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        os.makedirs(PATH_TEMP_FOLDER, exist_ok=True)
+        self.staging_folder = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=PATH_TEMP_FOLDER)
+        self.executor = create_executor(self.max_workers)
+        self.list_futures = [
+            self.executor.submit(
+                import_image_file,
+                image_path,
+                os.path.join(self.staging_folder, str(index) + IMAGE_EXT))
+            for index, image_path in enumerate(self.list_image_paths)]
+
+    def count_done(self) -> int:
+        return sum(future.done() for future in self.list_futures)
+
+    def poll(self) -> bool:
+        """
+        Update the number of photos processed and collect the results once
+        all the photos are processed.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bool
+            Whether the import is finished.
+        """
+        if self.executor is None:
+            return True
+        self.number_done = self.count_done()
+        if self.number_done < self.number_images:
+            return False
+        for image_path, future in zip(self.list_image_paths, self.list_futures):
+            if future.cancelled() or future.exception() is not None:
+                self.list_failed_paths.append(image_path)
+            else:
+                image_name, image_hash = future.result()
+                self.list_image_names.append(image_name)
+                self.dict_image_hashes[image_name] = image_hash
+        self.close()
+        return True
+
+    def get_stored_image_names(self) -> List[str]:
+        return [future.result()[0] for future in self.list_futures
+                if future.done() and not future.cancelled() and future.exception() is None]
+
+    def cancel(self) -> None:
+        for future in self.list_futures:
+            future.cancel()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
@@ -0,0 +1,338 @@
+"""
+Module tools journal of Tramway Collector
+
+It stores the modifications of the collection in an append-only journal,
+replayed at startup on top of the last snapshot of the collection.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import json
+import hashlib
+import threading
+from typing import List
+
+
+#################
+### Constants ###
+#################
+
+
+# Size of the journal in bytes above which it is folded into a new snapshot
+JOURNAL_COMPACTION_THRESHOLD = 64 * 1024
+
+# Suffix of the journal being folded into the snapshot
+OLD_JOURNAL_SUFFIX = ".old"
+
+
+#################
+### Functions ###
+#################
+
+
+def apply_record(dict_collection: dict, record: dict) -> dict:
+    """
+    Apply a record of the journal on the collection.
+
+    Parameters
+    ----------
+    dict_collection : dict
+        Collection with the same structure as in the json file.
+
+    record : dict
+        Record of the journal, containing the operation and its parameters.
+
+    Returns
+    -------
+    dict
+        The collection modified.
+    """
+    operation = record["operation"]
+    gallery_name = record["gallery"]
+
+    if operation == "add_gallery":
+        dict_collection[gallery_name] = record["images"]
+    elif operation == "rename_gallery":
+        # Rebuild the dictionary to keep the order of the galleries
+        dict_collection = {
+            (record["new_name"] if key == gallery_name else key): value
+            for key, value in dict_collection.items()}
+    elif operation == "delete_gallery":
+        dict_collection.pop(gallery_name, None)
+    elif operation == "add_image":
+        dict_collection[gallery_name].append(record["image"])
+    elif operation == "delete_image":
+        del dict_collection[gallery_name][record["index"]]
+    elif operation == "edit_image":
+        dict_collection[gallery_name][record["index"]] = record["image"]
+    elif operation == "update_default_image":
+        list_images = dict_collection[gallery_name]
+        for dict_image in list_images:
+            if dict_image["side"] == record["side"]:
+                dict_image["default"] = False
+        if record["index"] >= 0:
+            list_images[record["index"]]["default"] = True
+    return dict_collection
+
+
+def read_records(file_path: str) -> List[dict]:
+    """
+    Read the records of a journal.
+    A last line truncated by a crash during its writing is ignored.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the journal.
+
+    Returns
+    -------
+    List[dict]
+        Records of the journal.
+    """
+    list_records = []
+    if not os.path.exists(file_path):
+        return list_records
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                list_records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return list_records
+
+
+def append_lines(file_path: str, list_lines: List[str]) -> None:
+    """
+    Append lines at the end of a file and force their writing on the disk.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    list_lines : List[str]
+        Lines to append, without their line break.
+
+    Returns
+    -------
+    None
+    """
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write("".join(line + "\n" for line in list_lines))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def get_file_hash(file_path: str) -> str:
+    """
+    Compute the hash of the content of a file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash of the file.
+    """
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+###############
+### Classes ###
+###############
+
+
+class CollectionJournal():
+    """
+    Class storing the modifications of the collection in an append-only journal.
+
+    When the journal is compacted, it is renamed and folded into a new snapshot
+    in a background thread. Before replacing the snapshot, a last record
+    containing the hash of the new snapshot is appended to the renamed journal,
+    so that after a crash the journal is replayed only if the snapshot does not
+    already contain it.
+
+    ...
+
+    Attributes
+    ----------
+    snapshot_path : str
+        path of the json file containing the last snapshot of the collection
+    journal_path : str
+        path of the journal
+    compaction_threshold : int
+        size of the journal in bytes above which a compaction is needed
+    list_pending_records : List[dict]
+        records not written yet in the journal
+    compaction_thread : threading.Thread | None
+        thread of the running compaction
+
+    Methods
+    -------
+    add_record(record)
+        add a record to write during the next call of write_records
+    write_records()
+        append the pending records at the end of the journal
+    load_collection()
+        load the snapshot and replay the journal on it
+    check_compaction_needed()
+        check whether the journal has exceeded the compaction threshold
+    compact(dict_collection, wait=False)
+        fold the journal into a new snapshot of the collection
+    close()
+        wait for the end of the running compaction
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: str,
+                 compaction_threshold=JOURNAL_COMPACTION_THRESHOLD) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.old_journal_path = journal_path + OLD_JOURNAL_SUFFIX
+        self.compaction_threshold = compaction_threshold
+        self.list_pending_records = []
+        self.compaction_thread = None
+
+    def add_record(self, record: dict) -> None:
+        self.list_pending_records.append(record)
+
+    def write_records(self) -> int:
+        """
+        Append the pending records at the end of the journal.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        int
+            Number of records written.
+        """
+        number_records = len(self.list_pending_records)
+        if number_records > 0:
+            append_lines(
+                self.journal_path,
+                [json.dumps(record) for record in self.list_pending_records])
+            self.list_pending_records = []
+        return number_records
+
+    def load_collection(self) -> dict:
+        """
+        Load the last snapshot and replay the journal on it.
+        A compaction interrupted by a crash is finished first.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            Collection with the same structure as in the json file.
+        """
+        self.close()
+        self.list_pending_records = []
+        with open(self.snapshot_path, "r", encoding="utf-8") as file:
+            dict_collection = json.load(file)
+
+        # Finish the compaction interrupted by a crash
+        if os.path.exists(self.old_journal_path):
+            list_records = read_records(self.old_journal_path)
+            if list_records and list_records[-1]["operation"] == "compacted" \
+                    and list_records[-1]["snapshot"] == get_file_hash(self.snapshot_path):
+                os.remove(self.old_journal_path)
+            else:
+                for record in list_records:
+                    if record["operation"] != "compacted":
+                        dict_collection = apply_record(dict_collection, record)
+                self.write_snapshot(dict_collection)
+
+        for record in read_records(self.journal_path):
+            dict_collection = apply_record(dict_collection, record)
+        return dict_collection
+
+    def check_compaction_needed(self) -> bool:
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return False
+        return os.path.exists(self.journal_path) and \
+            os.path.getsize(self.journal_path) > self.compaction_threshold
+
+    def compact(self, dict_collection: dict, wait=False) -> None:
+        """
+        Fold the journal into a new snapshot of the collection.
+
+        Parameters
+        ----------
+        dict_collection : dict
+            Current collection, it must not be modified afterwards.
+
+        wait : bool, optional (default is False)
+            Whether to wait for the end of the compaction.
+
+        Returns
+        -------
+        None
+        """
+        self.close()
+        self.write_records()
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.old_journal_path)
+        self.compaction_thread = threading.Thread(
+            target=self.write_snapshot, args=(dict_collection,), daemon=True)
+        self.compaction_thread.start()
+        if wait:
+            self.close()
+
+    def write_snapshot(self, dict_collection: dict) -> None:
+        """
+        Replace atomically the snapshot and delete the old journal it contains.
+
+        Parameters
+        ----------
+        dict_collection : dict
+            Collection to write in the snapshot.
+
+        Returns
+        -------
+        None
+        """
+        content = json.dumps(dict_collection).encode("utf-8")
+        if os.path.exists(self.old_journal_path):
+            append_lines(self.old_journal_path, [json.dumps({
+                "operation": "compacted",
+                "gallery": None,
+                "snapshot": hashlib.sha1(content).hexdigest()
+            })])
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        if os.path.exists(self.old_journal_path):
+            os.remove(self.old_journal_path)
+
+    def close(self) -> None:
+        """
+        Wait for the end of the running compaction.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+            self.compaction_thread = None
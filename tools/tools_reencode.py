@@ -0,0 +1,376 @@
+"""
+Module tools reencode of Tramway Collector
+
+It re-encodes the stored images of the collection with another format or
+quality, to reduce the size of the collection on the disk and of its
+exports. The images are re-encoded by the pool of workers of the import,
+and the progress is kept in a manifest so that an interrupted run resumes
+where it stopped. The re-encoded images are stored under new names, the former files
+being deleted by the collector once the collection refers to the new ones.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import (
+    Executor,
+    Future
+)
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union
+)
+
+from tools.tools import (
+    PATH_TEMP_FOLDER,
+    load_json_file,
+    save_json_file_atomic
+)
+from tools.tools_image import (
+    open_image,
+    get_image_path,
+    get_image_format,
+    store_staged_image
+)
+from tools.tools_import import create_executor
+
+
+#################
+### Constants ###
+#################
+
+
+MANIFEST_VERSION = 1
+STAGING_PREFIX = "reencode_"
+
+# Extension and encoding options of the stored images for each profile
+DICT_IMAGE_PROFILES = {
+    "jpeg": {
+        "ext": ".jpg",
+        "options": {"optimize": True, "progressive": True, "quality": 85}
+    },
+    "webp": {
+        "ext": ".webp",
+        "options": {"method": 6, "quality": 80}
+    }
+}
+
+# Number of images re-encoded between two saves of the manifest
+MANIFEST_SAVE_INTERVAL = 16
+
+
+#################
+### Functions ###
+#################
+
+
+def get_profile_options(profile: str, quality=None) -> dict:
+    """
+    Get the encoding options of a profile, with the given quality if any.
+
+    Parameters
+    ----------
+    profile : str
+        Name of the profile, "jpeg" or "webp".
+
+    quality : int, optional (default is None)
+        Quality of the encoding, from 0 to 100, None to keep the one of the profile.
+
+    Returns
+    -------
+    dict
+        Encoding options for Pillow.
+    """
+    if profile not in DICT_IMAGE_PROFILES:
+        raise ValueError(f"The image profile {profile} does not exist.")
+    dict_options = dict(DICT_IMAGE_PROFILES[profile]["options"])
+    if quality is not None:
+        dict_options["quality"] = quality
+    return dict_options
+
+
+def reencode_image(image_file_name: str, staging_path: str, dict_options: dict) -> Tuple[str, int, int]:
+    """
+    Re-encode a stored image with its thumbnails. This function is run by
+    the workers of the re-encoding.
+
+    Parameters
+    ----------
+    image_file_name : str
+        Name of the stored image, with its extension.
+
+    staging_path : str
+        Temporary path of the re-encoded image, used by this image only.
+        Its extension gives the new format of the image.
+
+    dict_options : dict
+        Encoding options for Pillow.
+
+    Returns
+    -------
+    Tuple[str, int, int]
+        Name of the image to use, with its extension, and size in bytes of
+        the image before and after the re-encoding. The former image is kept
+        when the re-encoded one is not smaller.
+    """
+    image_path = get_image_path(image_file_name)
+    original_size = os.path.getsize(image_path)
+    with open_image(image_path) as image:
+        image = image.convert(mode="RGB")
+    image.save(staging_path, format=get_image_format(staging_path), **dict_options)
+
+    # The sizes are compared before storing, to leave no unused file in the collection
+    new_size = os.path.getsize(staging_path)
+    if new_size >= original_size:
+        os.remove(staging_path)
+        return image_file_name, original_size, original_size
+    return store_staged_image(image, staging_path, dict_options), original_size, new_size
+
+
+def reencode_images(reencoder: "ImageReencoder", list_image_names: List[str],
+                    progress_callback: Union[Callable[[int, int], None], None] = None) -> dict:
+    """
+    Re-encode stored images, waiting for the end of the re-encoding.
+
+    Parameters
+    ----------
+    reencoder : ImageReencoder
+        Re-encoder with the profile to use.
+
+    list_image_names : List[str]
+        Names of the stored images, with their extension.
+
+    progress_callback : Callable[[int, int], None], optional (default is None)
+        Function called with the number of images processed and the number
+        of images to process, after each step of the re-encoding.
+
+    Returns
+    -------
+    dict
+        Report of the re-encoding.
+    """
+    reencoder.start(list_image_names)
+    while not reencoder.poll(timeout=None):
+        if progress_callback is not None:
+            progress_callback(reencoder.number_done, reencoder.number_images)
+    return reencoder.dict_report
+
+
+###############
+### Classes ###
+###############
+
+
+class ImageReencoder():
+    """
+    Class re-encoding the stored images in parallel, polled by the
+    application to follow its progress without blocking.
+
+    The manifest contains the profile, the quality and the new name of each
+    image already re-encoded. A run with the same profile and quality skips
+    these images, so that an interrupted run resumes where it stopped.
+
+    ...
+
+    Attributes
+    ----------
+    manifest_path : str
+        path of the manifest of the re-encoding
+    profile : str
+        name of the profile of the re-encoding, "jpeg" or "webp"
+    quality : int | None
+        quality of the encoding, None to keep the one of the profile
+    number_images : int
+        number of images to re-encode during this run
+    number_done : int
+        number of images processed during this run
+    dict_new_names : Dict[str, str]
+        new name of each image already re-encoded, with their extension
+    dict_report : dict
+        report of the re-encoding, with the number of images re-encoded, the
+        sizes of the images before and after in bytes, the number of bytes
+        saved and the names of the images which could not be re-encoded
+
+    Methods
+    -------
+    start(list_image_names)
+        send the images not re-encoded yet to the workers
+    poll(timeout=0)
+        collect the re-encoded images and check whether the re-encoding is finished
+    stop()
+        cancel the images not re-encoded yet and save the manifest
+    cancel()
+        stop the re-encoding and forget the re-encoded images
+    """
+
+    def __init__(self, manifest_path: str, profile: str, quality=None, max_workers=None) -> None:
+        self.manifest_path = manifest_path
+        self.profile = profile
+        self.quality = quality
+        self.dict_options = get_profile_options(profile, quality)
+        self.max_workers = max_workers
+        self.executor: Union[Executor, None] = None
+        self.staging_folder = ""
+        self.dict_futures: Dict[Future, str] = {}
+        self.number_images = 0
+        self.number_done = 0
+        self.number_unsaved = 0
+        self.dict_new_names: Dict[str, str] = {}
+        self.set_new_names = set()
+        self.dict_report = {}
+
+    def load_manifest(self) -> None:
+        self.dict_new_names = {}
+        self.dict_report = {
+            "number_images": 0,
+            "number_reencoded": 0,
+            "original_size": 0,
+            "new_size": 0,
+            "saved_size": 0,
+            "list_failed_images": []
+        }
+        if not os.path.exists(self.manifest_path):
+            return
+        manifest = load_json_file(self.manifest_path)
+        # A manifest of another profile is replaced
+        if manifest.get("version") != MANIFEST_VERSION or manifest["profile"] != self.profile \
+                or manifest["quality"] != self.quality:
+            return
+        # The images deleted since the former run are re-encoded again
+        self.dict_new_names = {
+            image_name: new_image_name
+            for image_name, new_image_name in manifest["images"].items()
+            if os.path.exists(get_image_path(new_image_name))}
+        for key in ["number_reencoded", "original_size", "new_size"]:
+            self.dict_report[key] = manifest[key]
+
+    def save_manifest(self) -> None:
+        self.dict_report["saved_size"] = self.dict_report["original_size"] - \
+            self.dict_report["new_size"]
+        save_json_file_atomic(
+            file_path=self.manifest_path,
+            dict_to_save={
+                "version": MANIFEST_VERSION,
+                "profile": self.profile,
+                "quality": self.quality,
+                "images": self.dict_new_names,
+                "number_reencoded": self.dict_report["number_reencoded"],
+                "original_size": self.dict_report["original_size"],
+                "new_size": self.dict_report["new_size"]
+            }
+        )
+        self.number_unsaved = 0
+
+    def check_is_done(self, image_name: str) -> bool:
+        return image_name in self.dict_new_names or image_name in self.set_new_names
+
+    def start(self, list_image_names: List[str]) -> int:
+        """
+        Send the images not re-encoded yet to the workers, each one with its
+        own staging slot.
+
+        Parameters
+        ----------
+        list_image_names : List[str]
+            Names of the stored images, with their extension.
+
+        Returns
+        -------
+        int
+            Number of images to re-encode.
+        """
+        self.load_manifest()
+        self.set_new_names = set(self.dict_new_names.values())
+        list_image_names = [image_name for image_name in dict.fromkeys(list_image_names)
+                            if not self.check_is_done(image_name)]
+        self.number_images = len(list_image_names)
+        self.number_done = 0
+        self.dict_report["number_images"] = self.number_images
+        self.dict_futures = {}
+        if self.number_images == 0:
+            return 0
+        os.makedirs(PATH_TEMP_FOLDER, exist_ok=True)
+        self.staging_folder = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=PATH_TEMP_FOLDER)
+        self.executor = create_executor(self.max_workers)
+        ext = DICT_IMAGE_PROFILES[self.profile]["ext"]
+        for index, image_name in enumerate(list_image_names):
+            future = self.executor.submit(
+                reencode_image,
+                image_name,
+                os.path.join(self.staging_folder, str(index) + ext),
+                self.dict_options)
+            self.dict_futures[future] = image_name
+        return self.number_images
+
+    def collect_future(self, future: Future) -> None:
+        image_name = self.dict_futures.pop(future)
+        self.number_done += 1
+        if future.cancelled() or future.exception() is not None:
+            self.dict_report["list_failed_images"].append(image_name)
+            return
+        new_image_name, original_size, new_size = future.result()
+        self.dict_new_names[image_name] = new_image_name
+        self.set_new_names.add(new_image_name)
+        if new_image_name != image_name:
+            self.dict_report["number_reencoded"] += 1
+            self.dict_report["original_size"] += original_size
+            self.dict_report["new_size"] += new_size
+        self.number_unsaved += 1
+
+    def poll(self, timeout=0) -> bool:
+        """
+        Collect the re-encoded images and save the manifest regularly.
+
+        Parameters
+        ----------
+        timeout : float | None, optional (default is 0)
+            Maximal duration in seconds to wait for an image, None to wait
+            until the next image is re-encoded.
+
+        Returns
+        -------
+        bool
+            Whether the re-encoding is finished.
+        """
+        if self.executor is None:
+            return True
+        if timeout != 0 and self.dict_futures:
+            next(iter(self.dict_futures)).exception(timeout=timeout)
+        for future in [future for future in self.dict_futures if future.done()]:
+            self.collect_future(future)
+        if self.number_unsaved >= MANIFEST_SAVE_INTERVAL:
+            self.save_manifest()
+        if self.dict_futures:
+            return False
+        self.save_manifest()
+        self.close()
+        return True
+
+    def stop(self) -> None:
+        if self.executor is None:
+            return
+        for future in self.dict_futures:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        for future in list(self.dict_futures):
+            self.collect_future(future)
+        self.save_manifest()
+        self.close()
+
+    def cancel(self) -> None:
+        # The collection is replaced, its images are not renamed anymore
+        self.stop()
+        self.dict_new_names = {}
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
@@ -0,0 +1,228 @@
+"""
+Module tools saver of Tramway Collector
+
+It delays and groups the saves of the files, which are then written in a
+background thread instead of the main thread of Kivy. The content to save
+can be copied in the main thread once per group of modifications, so that
+the background thread never reads the objects while they are modified.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import atexit
+import threading
+from typing import (
+    Any,
+    Callable,
+    List,
+    Union
+)
+
+from kivy.clock import Clock
+
+
+#################
+### Constants ###
+#################
+
+
+# Time in seconds during which the modifications are grouped in a single save
+SAVE_DELAY = 0.5
+
+
+###############
+### Classes ###
+###############
+
+
+class WriteBehindSaver():
+    """
+    Class calling a save function in a background thread, once per group of modifications.
+
+    The first modification starts a window of delay seconds, and all the
+    modifications made during this window are written by a single save.
+    With a snapshot function, the content to save is copied in the main
+    thread when the window closes, and the save function only writes this
+    copy in the background thread.
+
+    ...
+
+    Attributes
+    ----------
+    save_function : Callable
+        function building the content to save and writing it, or writing the
+        snapshot given as argument
+    snapshot_function : Union[Callable[[], Any], None]
+        function copying the content to save, called in the main thread
+    delay : float
+        duration of the window grouping the modifications, in seconds
+    schedule : Callable
+        function scheduling the end of the window in the main thread
+    is_dirty : bool
+        whether modifications are waiting for the end of their window
+    is_pending : bool
+        whether a snapshot is waiting to be written by the background thread
+    number_saves : int
+        number of calls of the save function
+
+    Methods
+    -------
+    mark_dirty()
+        notify a modification to save
+    flush()
+        save immediately the pending modifications in the calling thread
+    cancel()
+        forget the pending modifications
+    """
+
+    def __init__(self, save_function: Callable, delay=SAVE_DELAY,
+                 snapshot_function: Union[Callable[[], Any], None] = None,
+                 schedule=Clock.schedule_once) -> None:
+        self.save_function = save_function
+        self.snapshot_function = snapshot_function
+        self.delay = delay
+        self.schedule = schedule
+        self.is_dirty = False
+        self.is_pending = False
+        self.snapshot = None
+        self.number_saves = 0
+        self.condition = threading.Condition()
+        self.save_lock = threading.Lock()
+        self.thread = None
+        LIST_SAVERS.append(self)
+
+    def mark_dirty(self) -> None:
+        """
+        Notify a modification, which will be saved at the end of the current window.
+        It is called in the main thread, like the modifications.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.is_dirty:
+            return
+        self.is_dirty = True
+        self.schedule(self.close_window, self.delay)
+
+    def take_snapshot(self) -> Any:
+        if self.snapshot_function is None:
+            return None
+        return self.snapshot_function()
+
+    def close_window(self, *args) -> None:
+        # The window may have been flushed or cancelled in the meantime
+        if not self.is_dirty:
+            return
+        self.is_dirty = False
+        snapshot = self.take_snapshot()
+        with self.condition:
+            self.snapshot = snapshot
+            self.is_pending = True
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.is_pending:
+                    self.condition.wait()
+                snapshot = self.snapshot
+                self.snapshot = None
+                self.is_pending = False
+                self.save_lock.acquire()
+            try:
+                self.save(snapshot)
+            finally:
+                self.save_lock.release()
+
+    def save(self, snapshot=None) -> None:
+        if self.snapshot_function is None:
+            self.save_function()
+        else:
+            self.save_function(snapshot)
+        self.number_saves += 1
+
+    def flush(self) -> None:
+        """
+        Save immediately the pending modifications, waiting for the save in progress.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self.condition:
+            is_pending = self.is_pending
+            snapshot = self.snapshot
+            self.is_pending = False
+            self.snapshot = None
+        # The modifications of the current window replace the snapshot not written yet
+        if self.is_dirty:
+            self.is_dirty = False
+            is_pending = True
+            snapshot = self.take_snapshot()
+        with self.save_lock:
+            if is_pending:
+                self.save(snapshot)
+
+    def cancel(self) -> None:
+        """
+        Forget the pending modifications and wait for the save in progress.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.is_dirty = False
+        with self.condition:
+            self.is_pending = False
+            self.snapshot = None
+        with self.save_lock:
+            pass
+
+
+#################
+### Functions ###
+#################
+
+
+def flush_all_savers() -> None:
+    """
+    Save the pending modifications of all savers, for instance when the application stops.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    for saver in LIST_SAVERS:
+        saver.flush()
+
+
+###############
+### Process ###
+###############
+
+
+LIST_SAVERS: List[WriteBehindSaver] = []
+atexit.register(flush_all_savers)
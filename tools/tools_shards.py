@@ -0,0 +1,254 @@
+"""
+Module tools shards of Tramway Collector
+
+It stores each gallery of the collection in its own shard file, listed in
+order by a small manifest, so that a save only rewrites the shards of the
+galleries that have changed. Renaming or deleting a gallery only rewrites
+the manifest.
+"""
+
+###############
+### Imports ###
+###############
+
+
+import os
+from typing import (
+    Callable,
+    Dict,
+    List
+)
+
+from tools.tools import (
+    load_json_file,
+    save_json_file_atomic
+)
+
+
+#################
+### Constants ###
+#################
+
+
+MANIFEST_VERSION = 1
+SHARD_PREFIX = "gallery_"
+SHARD_EXT = ".json"
+
+
+#################
+### Functions ###
+#################
+
+
+def get_shard_id(shard_name: str) -> int:
+    """
+    Get the identifier contained in the name of a shard.
+
+    Parameters
+    ----------
+    shard_name : str
+        Name of the shard file.
+
+    Returns
+    -------
+    int
+        Identifier of the shard, -1 if the file is not a shard.
+    """
+    shard_id = shard_name[len(SHARD_PREFIX):-len(SHARD_EXT)]
+    if shard_name.startswith(SHARD_PREFIX) and shard_name.endswith(SHARD_EXT) \
+            and shard_id.isdigit():
+        return int(shard_id)
+    return -1
+
+
+###############
+### Classes ###
+###############
+
+
+class ShardedCollection():
+    """
+    Class storing the collection in one shard file per gallery and a manifest.
+
+    The new shards are written before the manifest referencing them, and the
+    deleted shards are removed after the manifest, so that the manifest always
+    refers to complete shards.
+
+    ...
+
+    Attributes
+    ----------
+    folder_path : str
+        path of the folder containing the shards
+    manifest_path : str
+        path of the manifest, containing the names of the galleries and of their shards
+    dict_shards : Dict[str, str]
+        name of the shard of each gallery, in the order of the collection
+    set_dirty_galleries : set
+        names of the galleries whose shard must be rewritten
+    is_manifest_dirty : bool
+        whether the manifest must be rewritten
+
+    Methods
+    -------
+    check_exists()
+        check whether the manifest exists
+    load_collection()
+        load the galleries listed in the manifest
+    write_collection(dict_collection)
+        rewrite all the shards and the manifest
+    add_gallery(gallery_name)
+        create the shard of a new gallery
+    rename_gallery(old_name, new_name)
+        rename a gallery in the manifest
+    delete_gallery(gallery_name)
+        remove a gallery from the manifest
+    mark_gallery_dirty(gallery_name)
+        mark the shard of a gallery to rewrite
+    save(get_list_dict_images)
+        write the dirty shards and the manifest
+    """
+
+    def __init__(self, folder_path: str, manifest_path: str) -> None:
+        self.folder_path = folder_path
+        self.manifest_path = manifest_path
+        self.dict_shards: Dict[str, str] = {}
+        self.set_dirty_galleries = set()
+        self.list_deleted_shards: List[str] = []
+        self.is_manifest_dirty = False
+        self.next_shard_id = 0
+
+    def check_exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def get_shard_path(self, shard_name: str) -> str:
+        return os.path.join(self.folder_path, shard_name)
+
+    def create_shard_name(self) -> str:
+        shard_name = SHARD_PREFIX + str(self.next_shard_id) + SHARD_EXT
+        self.next_shard_id += 1
+        return shard_name
+
+    def reset(self) -> None:
+        self.dict_shards = {}
+        self.set_dirty_galleries = set()
+        self.list_deleted_shards = []
+        self.is_manifest_dirty = False
+        self.next_shard_id = 0
+
+    def load_collection(self) -> Dict[str, List[dict]]:
+        """
+        Load the galleries listed in the manifest from their shards.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Dict[str, List[dict]]
+            Collection with the same structure as in the json file.
+        """
+        self.reset()
+        manifest = load_json_file(self.manifest_path)
+        self.next_shard_id = manifest["next_shard_id"]
+        dict_collection = {}
+        for dict_entry in manifest["galleries"]:
+            self.dict_shards[dict_entry["name"]] = dict_entry["shard"]
+            dict_collection[dict_entry["name"]] = load_json_file(
+                self.get_shard_path(dict_entry["shard"]))
+        return dict_collection
+
+    def write_collection(self, dict_collection: Dict[str, List[dict]]) -> None:
+        """
+        Rewrite all the shards and the manifest, for instance to migrate a json file.
+
+        Parameters
+        ----------
+        dict_collection : Dict[str, List[dict]]
+            Collection with the same structure as in the json file.
+
+        Returns
+        -------
+        None
+        """
+        list_old_shards = []
+        if os.path.exists(self.folder_path):
+            list_old_shards = [
+                shard_name for shard_name in os.listdir(self.folder_path)
+                if get_shard_id(shard_name) >= 0]
+        self.reset()
+        self.list_deleted_shards = list_old_shards
+        # The new shards must not overwrite the old ones before the manifest is written
+        self.next_shard_id = 1 + max(
+            [get_shard_id(shard_name) for shard_name in list_old_shards], default=-1)
+        for gallery_name in dict_collection:
+            self.add_gallery(gallery_name)
+        self.save(lambda gallery_name: dict_collection[gallery_name])
+
+    def add_gallery(self, gallery_name: str) -> None:
+        self.dict_shards[gallery_name] = self.create_shard_name()
+        self.set_dirty_galleries.add(gallery_name)
+        self.is_manifest_dirty = True
+
+    def rename_gallery(self, old_name: str, new_name: str) -> None:
+        # Rebuild the dictionary to keep the order of the galleries
+        self.dict_shards = {
+            (new_name if gallery_name == old_name else gallery_name): shard_name
+            for gallery_name, shard_name in self.dict_shards.items()}
+        if old_name in self.set_dirty_galleries:
+            self.set_dirty_galleries.remove(old_name)
+            self.set_dirty_galleries.add(new_name)
+        self.is_manifest_dirty = True
+
+    def delete_gallery(self, gallery_name: str) -> None:
+        self.list_deleted_shards.append(self.dict_shards.pop(gallery_name))
+        self.set_dirty_galleries.discard(gallery_name)
+        self.is_manifest_dirty = True
+
+    def mark_gallery_dirty(self, gallery_name: str) -> None:
+        self.set_dirty_galleries.add(gallery_name)
+
+    def save(self, get_list_dict_images: Callable[[str], List[dict]]) -> int:
+        """
+        Write the shards of the modified galleries, then the manifest if needed.
+
+        Parameters
+        ----------
+        get_list_dict_images : Callable[[str], List[dict]]
+            Function giving the images of a gallery from its name, with the
+            same structure as in the json file.
+
+        Returns
+        -------
+        int
+            Number of shards written.
+        """
+        if self.set_dirty_galleries and not os.path.exists(self.folder_path):
+            os.makedirs(self.folder_path)
+        number_shards = len(self.set_dirty_galleries)
+        for gallery_name in self.set_dirty_galleries:
+            save_json_file_atomic(
+                file_path=self.get_shard_path(self.dict_shards[gallery_name]),
+                dict_to_save=get_list_dict_images(gallery_name)
+            )
+        self.set_dirty_galleries = set()
+
+        if self.is_manifest_dirty:
+            save_json_file_atomic(
+                file_path=self.manifest_path,
+                dict_to_save={
+                    "version": MANIFEST_VERSION,
+                    "next_shard_id": self.next_shard_id,
+                    "galleries": [{"name": gallery_name, "shard": shard_name}
+                                  for gallery_name, shard_name in self.dict_shards.items()]
+                }
+            )
+            self.is_manifest_dirty = False
+
+        # The deleted shards are not referenced by the manifest anymore
+        for shard_name in self.list_deleted_shards:
+            if os.path.exists(self.get_shard_path(shard_name)):
+                os.remove(self.get_shard_path(shard_name))
+        self.list_deleted_shards = []
+        return number_shards
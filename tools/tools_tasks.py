@@ -0,0 +1,136 @@
+"""
+Module tools tasks of Tramway Collector
+
+It runs the long processing of images, such as the decoding and the
+resizing of large photos, in a background thread, so that the interface
+keeps drawing its frames meanwhile. The results are given back to the
+interface in the main thread through the Kivy clock.
+"""
+
+###############
+### Imports ###
+###############
+
+
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor
+)
+from functools import partial
+from typing import (
+    Callable,
+    Union
+)
+
+from kivy.clock import Clock
+
+
+#################
+### Constants ###
+#################
+
+
+THREAD_NAME_PREFIX = "image_processing"
+
+
+###############
+### Classes ###
+###############
+
+
+class BackgroundWorker():
+    """
+    Class running functions in background threads and calling their
+    callbacks in the main thread.
+
+    The functions cannot be interrupted once started, so cancelling the
+    tasks drops their results instead: the callbacks of the tasks submitted
+    before the cancellation are never called.
+
+    ...
+
+    Attributes
+    ----------
+    executor : ThreadPoolExecutor
+        pool of the background threads
+    schedule : Callable
+        function scheduling a callback in the main thread
+    set_futures : set
+        futures of the tasks not cancelled whose callbacks have not been called yet
+
+    Methods
+    -------
+    submit(function, *args, on_done=None, on_error=None, **kwargs)
+        run a function in the background
+    cancel()
+        cancel the tasks in progress
+    check_is_busy()
+        check whether tasks are in progress
+    """
+
+    def __init__(self, max_workers=1, schedule=Clock.schedule_once) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=THREAD_NAME_PREFIX)
+        self.schedule = schedule
+        self.set_futures = set()
+        self.generation = 0
+
+    def submit(self, function: Callable, *args, on_done: Union[Callable, None] = None,
+               on_error: Union[Callable, None] = None, **kwargs) -> Future:
+        """
+        Run a function in a background thread.
+
+        Parameters
+        ----------
+        function : Callable
+            Function to run, with the given arguments.
+
+        on_done : Callable, optional (default is None)
+            Function called in the main thread with the result of the function.
+
+        on_error : Callable, optional (default is None)
+            Function called in the main thread with the exception raised by the function.
+
+        Returns
+        -------
+        Future
+            Future of the result of the function.
+        """
+        generation = self.generation
+        future = self.executor.submit(function, *args, **kwargs)
+        self.set_futures.add(future)
+        # The callback is marshalled to the main thread by the clock
+        future.add_done_callback(lambda future: self.schedule(partial(
+            self.dispatch, future, generation, on_done, on_error)))
+        return future
+
+    def dispatch(self, future: Future, generation: int, on_done, on_error, *args) -> None:
+        self.set_futures.discard(future)
+        if future.cancelled() or generation != self.generation:
+            return
+        exception = future.exception()
+        if exception is not None:
+            if on_error is not None:
+                on_error(exception)
+        elif on_done is not None:
+            on_done(future.result())
+
+    def cancel(self) -> None:
+        self.generation += 1
+        for future in self.set_futures:
+            future.cancel()
+        self.set_futures = set()
+
+    def check_is_busy(self) -> bool:
+        return bool(self.set_futures)
+
+
+###############
+### Process ###
+###############
+
+
+# A single thread processes the images in their order of submission
+image_worker = BackgroundWorker()
+# Thread of the long tasks on the whole collection, not cancelled by the screens
+collection_worker = BackgroundWorker()
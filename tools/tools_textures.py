@@ -0,0 +1,243 @@
+"""
+Module tools textures of Tramway Collector
+
+It keeps the textures of the images of the collection in memory within a
+budget of bytes, so that going back to a screen displays its images without
+reading them again, while the memory used stays bounded when browsing large
+galleries. The least recently used textures are evicted first.
+"""
+
+###############
+### Imports ###
+###############
+
+
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Union
+)
+
+from tools.tools import SETTINGS
+
+
+#################
+### Constants ###
+#################
+
+
+# Budget of the cache, in megabytes
+DEFAULT_TEXTURE_CACHE_SIZE = 64
+# Part of the budget kept when leaving a screen, with the textures used the most recently
+SCREEN_LEAVE_CACHE_RATIO = 0.5
+DICT_COLORFMT_BYTES = {
+    "rgba": 4,
+    "bgra": 4,
+    "rgb": 3,
+    "bgr": 3,
+    "luminance_alpha": 2,
+    "luminance": 1,
+    "alpha": 1
+}
+
+
+#################
+### Functions ###
+#################
+
+
+def load_texture(source: str):
+    """
+    Load the texture of an image, without keeping it in the cache of Kivy.
+
+    Parameters
+    ----------
+    source : str
+        Path of the image.
+
+    Returns
+    -------
+    Texture | None
+        Texture of the image, None if it cannot be loaded.
+    """
+    # Imported here, to use the cache without a graphic context
+    from kivy.core.image import Image as CoreImage
+
+    try:
+        return CoreImage(source, nocache=True).texture
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def get_texture_size(texture) -> int:
+    """
+    Get the size in memory of a texture.
+
+    Parameters
+    ----------
+    texture : Texture
+        Texture of an image.
+
+    Returns
+    -------
+    int
+        Number of bytes of the pixels of the texture.
+    """
+    width, height = texture.size
+    return width * height * DICT_COLORFMT_BYTES.get(texture.colorfmt, 4)
+
+
+def release_screen_textures() -> int:
+    """
+    Reduce the texture cache when leaving a screen, keeping the textures used
+    the most recently to display the screen again at once when going back.
+
+    Returns
+    -------
+    int
+        Number of textures evicted.
+    """
+    return texture_cache.trim(texture_cache.max_size * SCREEN_LEAVE_CACHE_RATIO)
+
+
+###############
+### Classes ###
+###############
+
+
+class TextureCache():
+    """
+    Class keeping the textures of the images within a budget of bytes,
+    evicting the least recently used ones first.
+
+    ...
+
+    Attributes
+    ----------
+    max_size : int
+        budget of the cache, in bytes
+    size : int
+        number of bytes of the textures in the cache
+    number_hits : int
+        number of textures found in the cache
+    number_misses : int
+        number of textures loaded
+    number_evictions : int
+        number of textures evicted
+
+    Methods
+    -------
+    get(source)
+        get the texture of an image, loading it if needed
+    evict(source)
+        remove the texture of an image from the cache
+    trim(max_size)
+        evict the least recently used textures until the cache fits in a size
+    clear()
+        remove all textures from the cache
+    get_stats()
+        get the counters of the cache
+    """
+
+    def __init__(self, max_size: int, load_function: Callable = load_texture,
+                 size_function: Callable = get_texture_size) -> None:
+        self.max_size = max_size
+        self.load_function = load_function
+        self.size_function = size_function
+        self.dict_textures = OrderedDict()
+        self.size = 0
+        self.number_hits = 0
+        self.number_misses = 0
+        self.number_evictions = 0
+
+    def get(self, source: str):
+        """
+        Get the texture of an image, loading it if it is not in the cache.
+
+        Parameters
+        ----------
+        source : str
+            Path of the image.
+
+        Returns
+        -------
+        Texture | None
+            Texture of the image, None if it cannot be loaded.
+        """
+        if source in self.dict_textures:
+            self.number_hits += 1
+            self.dict_textures.move_to_end(source)
+            return self.dict_textures[source][0]
+        self.number_misses += 1
+        texture = self.load_function(source)
+        if texture is None:
+            return None
+        texture_size = self.size_function(texture)
+        self.dict_textures[source] = (texture, texture_size)
+        self.size += texture_size
+        # The new texture is kept even if it exceeds the budget alone
+        self.trim(max(self.max_size, texture_size))
+        return texture
+
+    def evict(self, source: str) -> bool:
+        """
+        Remove the texture of an image from the cache.
+
+        Parameters
+        ----------
+        source : str
+            Path of the image.
+
+        Returns
+        -------
+        bool
+            Whether the texture was in the cache.
+        """
+        if source not in self.dict_textures:
+            return False
+        _, texture_size = self.dict_textures.pop(source)
+        self.size -= texture_size
+        self.number_evictions += 1
+        return True
+
+    def trim(self, max_size: Union[int, float]) -> int:
+        """
+        Evict the least recently used textures until the cache fits in a size.
+
+        Parameters
+        ----------
+        max_size : int | float
+            Size in bytes to fit in.
+
+        Returns
+        -------
+        int
+            Number of textures evicted.
+        """
+        number_evicted = 0
+        while self.size > max_size and self.dict_textures:
+            self.evict(next(iter(self.dict_textures)))
+            number_evicted += 1
+        return number_evicted
+
+    def clear(self) -> int:
+        return self.trim(0)
+
+    def get_stats(self) -> dict:
+        return {
+            "number_textures": len(self.dict_textures),
+            "size": self.size,
+            "max_size": self.max_size,
+            "number_hits": self.number_hits,
+            "number_misses": self.number_misses,
+            "number_evictions": self.number_evictions
+        }
+
+
+###############
+### Process ###
+###############
+
+
+texture_cache = TextureCache(
+    max_size=SETTINGS.get("texture_cache_size", DEFAULT_TEXTURE_CACHE_SIZE) * 1024 * 1024)